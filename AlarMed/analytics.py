@@ -0,0 +1,231 @@
+"""
+AlarMed - Adherence Analytics
+Vectorized adherence statistics over one or more profiles' dose history
+
+Records and resolved scheduled doses are loaded once into flat columns
+(day index, minute of day, medicine id) and every statistic is a single
+pass over those columns. NumPy is used when it is installed; otherwise the
+same numbers come from plain Python loops. Rates with nothing scheduled
+are NaN.
+"""
+
+import math
+from datetime import date, datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MINUTES_PER_DAY = 24 * 60
+RADIANS_PER_MINUTE = 2 * math.pi / MINUTES_PER_DAY
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+class AdherenceAnalytics:
+    """Adherence statistics for the days start..end (inclusive).
+
+    Results are NumPy arrays when NumPy is available and lists otherwise;
+    matrices are indexed [day][medicine], with medicine ids indexing
+    `self.medicines`.
+    """
+
+    def __init__(self, start, end, medicines, records, doses, use_numpy=None):
+        self.start = _as_date(start)
+        self.end = _as_date(end)
+        self.n_days = max(0, (self.end - self.start).days + 1)
+        self.medicines = list(medicines)
+        self.use_numpy = np is not None if use_numpy is None else use_numpy and np is not None
+
+        # Column-oriented data: record_* per logged dose, dose_* per resolved scheduled dose
+        record_day, record_minute, record_medicine = records
+        dose_day, dose_medicine, dose_taken = doses
+        if self.use_numpy:
+            self.record_day = np.asarray(record_day, dtype=np.int64)
+            self.record_minute = np.asarray(record_minute, dtype=np.int64)
+            self.record_medicine = np.asarray(record_medicine, dtype=np.int64)
+            self.dose_day = np.asarray(dose_day, dtype=np.int64)
+            self.dose_medicine = np.asarray(dose_medicine, dtype=np.int64)
+            self.dose_taken = np.asarray(dose_taken, dtype=np.float64)
+        else:
+            self.record_day = list(record_day)
+            self.record_minute = list(record_minute)
+            self.record_medicine = list(record_medicine)
+            self.dose_day = list(dose_day)
+            self.dose_medicine = list(dose_medicine)
+            self.dose_taken = list(dose_taken)
+
+    @classmethod
+    def from_database(cls, database, profile_ids, start, end, use_numpy=None):
+        """Load the given profile(s) for start..end in two queries"""
+        if isinstance(profile_ids, int):
+            profile_ids = [profile_ids]
+        start, end = _as_date(start), _as_date(end)
+        start_str, end_str = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+        medicine_ids = {}
+        record_day, record_minute, record_medicine = [], [], []
+        for day, minute, medicine in database.get_record_points(profile_ids, start_str, end_str):
+            record_day.append(day)
+            record_minute.append(minute)
+            record_medicine.append(medicine_ids.setdefault(medicine, len(medicine_ids)))
+
+        dose_day, dose_medicine, dose_taken = [], [], []
+        for day, medicine, taken in database.get_scheduled_dose_points(profile_ids, start_str, end_str):
+            dose_day.append(day)
+            dose_medicine.append(medicine_ids.setdefault(medicine, len(medicine_ids)))
+            dose_taken.append(taken)
+
+        return cls(
+            start,
+            end,
+            medicine_ids,
+            (record_day, record_minute, record_medicine),
+            (dose_day, dose_medicine, dose_taken),
+            use_numpy,
+        )
+
+    # Per-day matrices
+    def daily_counts(self):
+        """Logged doses per [day][medicine]"""
+        return self._count_matrix(self.record_day, self.record_medicine)
+
+    def adherence_matrix(self):
+        """(taken, scheduled, rate) per [day][medicine] from the dose ledger"""
+        taken = self._count_matrix(self.dose_day, self.dose_medicine, self.dose_taken)
+        scheduled = self._count_matrix(self.dose_day, self.dose_medicine)
+        if self.use_numpy:
+            rate = np.full(taken.shape, np.nan)
+            np.divide(taken, scheduled, out=rate, where=scheduled > 0)
+        else:
+            rate = [
+                [t / s if s else math.nan for t, s in zip(taken_row, scheduled_row)]
+                for taken_row, scheduled_row in zip(taken, scheduled)
+            ]
+        return taken, scheduled, rate
+
+    def _count_matrix(self, days, medicines, weights=None):
+        width = len(self.medicines)
+        if self.use_numpy:
+            cells = days * width + medicines
+            counts = np.bincount(cells, weights=weights, minlength=self.n_days * width)
+            return counts[: self.n_days * width].reshape(self.n_days, width)
+        matrix = [[0] * width for _ in range(self.n_days)]
+        if weights is None:
+            for day, medicine in zip(days, medicines):
+                matrix[day][medicine] += 1
+        else:
+            for day, medicine, weight in zip(days, medicines, weights):
+                matrix[day][medicine] += weight
+        return matrix
+
+    # Rolling rates
+    def rolling_rate(self, window):
+        """Share of scheduled doses taken in the `window` days ending on each day"""
+        if self.use_numpy:
+            taken = np.bincount(self.dose_day, weights=self.dose_taken, minlength=self.n_days)[: self.n_days]
+            scheduled = np.bincount(self.dose_day, minlength=self.n_days)[: self.n_days]
+            taken_sums = np.concatenate(([0.0], np.cumsum(taken)))
+            scheduled_sums = np.concatenate(([0], np.cumsum(scheduled)))
+            upper = np.arange(1, self.n_days + 1)
+            lower = np.maximum(upper - window, 0)
+            taken_window = taken_sums[upper] - taken_sums[lower]
+            scheduled_window = scheduled_sums[upper] - scheduled_sums[lower]
+            rate = np.full(self.n_days, np.nan)
+            np.divide(taken_window, scheduled_window, out=rate, where=scheduled_window > 0)
+            return rate
+
+        taken = [0.0] * self.n_days
+        scheduled = [0] * self.n_days
+        for day, was_taken in zip(self.dose_day, self.dose_taken):
+            taken[day] += was_taken
+            scheduled[day] += 1
+        rates = []
+        taken_window = scheduled_window = 0
+        for day in range(self.n_days):
+            taken_window += taken[day]
+            scheduled_window += scheduled[day]
+            if day >= window:
+                taken_window -= taken[day - window]
+                scheduled_window -= scheduled[day - window]
+            rates.append(taken_window / scheduled_window if scheduled_window else math.nan)
+        return rates
+
+    def rolling_rates(self):
+        """7- and 30-day rolling rates"""
+        return {7: self.rolling_rate(7), 30: self.rolling_rate(30)}
+
+    # Time of day
+    def time_of_day_stats(self):
+        """Per medicine: (mean minute of day, spread in minutes, count).
+
+        Times are treated as angles on a 24-hour clock, so doses at 23:50
+        and 00:10 average to midnight with a spread of about ten minutes.
+        """
+        width = len(self.medicines)
+        if self.use_numpy:
+            valid = self.record_minute >= 0
+            medicines = self.record_medicine[valid]
+            angles = self.record_minute[valid] * RADIANS_PER_MINUTE
+            counts = np.bincount(medicines, minlength=width)
+            sin_sums = np.bincount(medicines, weights=np.sin(angles), minlength=width)
+            cos_sums = np.bincount(medicines, weights=np.cos(angles), minlength=width)
+        else:
+            counts = [0] * width
+            sin_sums = [0.0] * width
+            cos_sums = [0.0] * width
+            for minute, medicine in zip(self.record_minute, self.record_medicine):
+                if minute >= 0:
+                    angle = minute * RADIANS_PER_MINUTE
+                    counts[medicine] += 1
+                    sin_sums[medicine] += math.sin(angle)
+                    cos_sums[medicine] += math.cos(angle)
+
+        stats = {}
+        for medicine, medicine_id in self.medicines_by_id():
+            count = int(counts[medicine_id])
+            if not count:
+                continue
+            sin_sum, cos_sum = float(sin_sums[medicine_id]), float(cos_sums[medicine_id])
+            mean = (math.atan2(sin_sum, cos_sum) / RADIANS_PER_MINUTE) % MINUTES_PER_DAY
+            if mean >= MINUTES_PER_DAY:  # A tiny negative angle rounds up to 1440.0
+                mean = 0.0
+            length = min(1.0, math.hypot(sin_sum, cos_sum) / count)
+            spread = math.sqrt(-2 * math.log(length)) / RADIANS_PER_MINUTE if length > 0 else math.inf
+            stats[medicine] = (mean, spread, count)
+        return stats
+
+    # Trends
+    def medicine_trends(self):
+        """Per medicine: least-squares change in logged doses per day, per day"""
+        counts = self.daily_counts()
+        if self.n_days < 2:
+            return {medicine: 0.0 for medicine in self.medicines}
+
+        if self.use_numpy:
+            x = np.arange(self.n_days) - (self.n_days - 1) / 2
+            slopes = x @ (counts - counts.mean(axis=0)) / (x @ x)
+        else:
+            centre = (self.n_days - 1) / 2
+            x = [day - centre for day in range(self.n_days)]
+            sxx = sum(v * v for v in x)
+            slopes = [0.0] * len(self.medicines)
+            for offset, row in zip(x, counts):
+                for medicine_id, count in enumerate(row):
+                    # The mean term drops out because sum(x) == 0
+                    slopes[medicine_id] += offset * count
+            slopes = [s / sxx for s in slopes]
+        return {medicine: float(slopes[medicine_id]) for medicine, medicine_id in self.medicines_by_id()}
+
+    def medicines_by_id(self):
+        return ((medicine, medicine_id) for medicine_id, medicine in enumerate(self.medicines))
+
+    def day(self, index):
+        return self.start + timedelta(days=index)
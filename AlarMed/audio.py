@@ -0,0 +1,158 @@
+"""
+AlarMed - Audio Manager
+Process-wide cache of decoded alarm sounds, loaded once in the background
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import startup_trace
+from config import (
+    ALARM_SOUND_CACHE_SIZE,
+    ALARM_ESCALATE_START_VOLUME,
+    ALARM_ESCALATE_STEP,
+    ALARM_ESCALATE_INTERVAL,
+)
+
+DEFAULT_RINGTONE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "ringtone.mp3")
+
+
+class AudioManager:
+    """Loads each tone once off the UI thread and reuses the decoded sound.
+
+    Tones are keyed by file path, so per-profile or per-reminder tones share
+    the same LRU cache; the least recently played tone is unloaded first.
+    """
+
+    def __init__(self, max_sounds=ALARM_SOUND_CACHE_SIZE):
+        self.max_sounds = max_sounds
+        self._sounds = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+        self._alarm_sound = None
+        self._escalate_event = None
+        self._pending_play = None
+
+    def preload(self, path=DEFAULT_RINGTONE):
+        """Start decoding a tone in the background; returns its ready event"""
+        with self._lock:
+            if path in self._sounds:
+                ready = threading.Event()
+                ready.set()
+                return ready
+            if path in self._loading:
+                return self._loading[path]
+            ready = self._loading[path] = threading.Event()
+
+        threading.Thread(target=self._load, args=(path, ready), name="audio-preload", daemon=True).start()
+        return ready
+
+    def _load(self, path, ready):
+        from kivy.core.audio import SoundLoader
+        try:
+            # Shows in the startup trace only if decoding began before the first frame
+            with startup_trace.asset("sound", os.path.basename(path)):
+                sound = SoundLoader.load(path)
+        except Exception as e:
+            print(f"Error loading sound {path}: {e}")
+            sound = None
+
+        evicted = []
+        with self._lock:
+            self._loading.pop(path, None)
+            if sound:
+                self._sounds[path] = sound
+                while len(self._sounds) > self.max_sounds:
+                    # Never evict the new tone or one that is ringing
+                    victim = next(
+                        (p for p, s in self._sounds.items() if p != path and s is not self._alarm_sound),
+                        None,
+                    )
+                    if victim is None:
+                        break
+                    evicted.append(self._sounds.pop(victim))
+        for old_sound in evicted:
+            old_sound.unload()
+        ready.set()
+
+    def get(self, path=DEFAULT_RINGTONE):
+        """Return the decoded sound, or None if it is not loaded yet"""
+        with self._lock:
+            sound = self._sounds.get(path)
+            if sound:
+                self._sounds.move_to_end(path)
+            return sound
+
+    def play_alarm(self, path=DEFAULT_RINGTONE, repeat=False, escalate=False, on_start=None):
+        """Play an alarm tone from the cache.
+
+        repeat loops the tone until stop_alarm(); escalate also starts
+        quietly and raises the volume step by step. Neither re-decodes.
+        If the tone is still loading, playback starts as soon as it is ready;
+        on_start is called at the moment the tone actually starts. A later
+        play_alarm() or stop_alarm() cancels a playback still waiting to start.
+        """
+        from kivy.clock import Clock
+
+        self._cancel_pending_play()
+        sound = self.get(path)
+        if not sound:
+            ready = self.preload(path)
+
+            def play_when_ready(dt):
+                if ready.is_set():
+                    self._pending_play = None
+                    if self.get(path):
+                        self.play_alarm(path, repeat, escalate, on_start)
+                    return False
+
+            self._pending_play = Clock.schedule_interval(play_when_ready, 0.1)
+            return
+
+        self.stop_alarm()
+        self._alarm_sound = sound
+        sound.loop = repeat or escalate
+        sound.volume = ALARM_ESCALATE_START_VOLUME if escalate else 1.0
+        sound.play()
+        if on_start:
+            on_start()
+
+        if escalate:
+            self._escalate_event = Clock.schedule_interval(self._raise_volume, ALARM_ESCALATE_INTERVAL)
+
+    def _raise_volume(self, dt):
+        sound = self._alarm_sound
+        if not sound or sound.state != "play":
+            self._escalate_event = None
+            return False
+        sound.volume = min(1.0, sound.volume + ALARM_ESCALATE_STEP)
+        if sound.volume >= 1.0:
+            self._escalate_event = None
+            return False
+
+    def _cancel_pending_play(self):
+        if self._pending_play:
+            self._pending_play.cancel()
+            self._pending_play = None
+
+    def stop_alarm(self):
+        self._cancel_pending_play()
+        if self._escalate_event:
+            self._escalate_event.cancel()
+            self._escalate_event = None
+        if self._alarm_sound:
+            self._alarm_sound.loop = False
+            self._alarm_sound.stop()
+            self._alarm_sound = None
+
+
+_audio_manager = None
+
+
+def get_audio_manager():
+    """Shared AudioManager for the whole process"""
+    global _audio_manager
+    if _audio_manager is None:
+        _audio_manager = AudioManager()
+    return _audio_manager
@@ -0,0 +1,61 @@
+"""
+AlarMed - Background Worker
+Runs database work off the UI thread and posts the results back to it
+"""
+
+import queue
+import threading
+
+from database import Database
+
+
+class BackgroundWorker:
+    """One daemon thread with its own database connection.
+
+    submit(task, callback) runs task(db) on the worker thread, then
+    callback(result) on the UI thread on the next frame. Tasks run one at a
+    time in submission order. The thread and its connection are created on
+    the first submit.
+    """
+
+    def __init__(self, db_path, name="background"):
+        self.db_path = db_path
+        self.name = name
+        self._tasks = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, task, callback=None, on_error=None):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        self._tasks.put((task, callback, on_error))
+
+    def stop(self):
+        with self._lock:
+            if self._thread is not None:
+                self._tasks.put(None)
+                self._thread = None
+
+    def _run(self):
+        from kivy.clock import Clock
+
+        db = Database(self.db_path)
+        try:
+            while True:
+                item = self._tasks.get()
+                if item is None:
+                    return
+                task, callback, on_error = item
+                try:
+                    result = task(db)
+                except Exception as e:
+                    print(f"Error in background task: {e}")
+                    if on_error:
+                        Clock.schedule_once(lambda dt, e=e: on_error(e))
+                    continue
+                if callback:
+                    Clock.schedule_once(lambda dt, result=result, callback=callback: callback(result))
+        finally:
+            db.close()
@@ -0,0 +1,140 @@
+"""
+AlarMed - Analytics Benchmark
+Compares per-metric SQL queries with the vectorized analytics module
+
+Builds (or reuses) a database with --rows medicine records and half as many
+resolved scheduled doses, then computes the same metrics both ways: daily
+counts, rolling 7/30-day dose rates, time-of-day spread and per-medicine
+trends.
+
+Usage:
+    python benchmarks/bench_analytics.py [--rows 1000000] [--db bench.db]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import AdherenceAnalytics, np  # noqa: E402
+from database import Database  # noqa: E402
+
+MEDICINES = [f"Medicine {i}" for i in range(12)]
+STATUSES = ["taken", "taken", "taken", "late", "missed"]
+
+
+def build_database(path, rows, days, seed=1):
+    db = Database(path)
+    profile_id = db.create_profile("Benchmark", 40, "Other", "#1f6aa5", "👤")
+    start = date.today() - timedelta(days=days - 1)
+    dates = [(start + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(days)]
+    rng = random.Random(seed)
+
+    batch = 100000
+    for offset in range(0, rows, batch):
+        db.cursor.executemany(
+            'INSERT INTO medicine_records (profile_id, medicine_name, dosage, time_taken, date_taken, notes) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            [
+                (profile_id, rng.choice(MEDICINES), "1", f"{rng.randrange(24):02d}:{rng.randrange(60):02d}",
+                 rng.choice(dates), "")
+                for _ in range(min(batch, rows - offset))
+            ],
+        )
+    for offset in range(0, rows // 2, batch):
+        db.cursor.executemany(
+            'INSERT OR IGNORE INTO scheduled_doses '
+            '(profile_id, reminder_id, medicine_name, dosage, scheduled_date, scheduled_time, status) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [
+                (profile_id, i % 400, MEDICINES[i % len(MEDICINES)], "1", dates[(i // 400) % days],
+                 f"{(i // (400 * days)) % 24:02d}:00", rng.choice(STATUSES))
+                for i in range(offset, min(rows // 2, offset + batch))
+            ],
+        )
+    db.conn.commit()
+    return db, profile_id, start, start + timedelta(days=days - 1)
+
+
+def per_metric_queries(db, profile_id, start, end):
+    """The same metrics the way the reports screen computes numbers: one query each"""
+    cursor = db.cursor
+    start_str, end_str = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+    results = {"daily": {}, "rolling": {7: [], 30: []}, "time_of_day": {}, "trend": {}}
+
+    for medicine in MEDICINES:
+        cursor.execute(
+            'SELECT date_taken, COUNT(*) FROM medicine_records WHERE profile_id = ? AND medicine_name = ? '
+            'AND date_taken BETWEEN ? AND ? GROUP BY date_taken',
+            (profile_id, medicine, start_str, end_str),
+        )
+        results["daily"][medicine] = cursor.fetchall()
+        cursor.execute(
+            "SELECT AVG(CAST(substr(time_taken, 1, 2) AS INTEGER) * 60 + CAST(substr(time_taken, 4, 2) AS INTEGER)), "
+            "COUNT(*) FROM medicine_records WHERE profile_id = ? AND medicine_name = ? AND date_taken BETWEEN ? AND ?",
+            (profile_id, medicine, start_str, end_str),
+        )
+        results["time_of_day"][medicine] = cursor.fetchone()
+
+    day = start
+    while day <= end:
+        for window in (7, 30):
+            cursor.execute(
+                "SELECT SUM(status IN ('taken', 'late')), COUNT(*) FROM scheduled_doses "
+                "WHERE profile_id = ? AND status != 'pending' AND scheduled_date BETWEEN ? AND ?",
+                (profile_id, (day - timedelta(days=window - 1)).strftime("%Y-%m-%d"), day.strftime("%Y-%m-%d")),
+            )
+            results["rolling"][window].append(cursor.fetchone())
+        day += timedelta(days=1)
+    return results
+
+
+def vectorized(db, profile_id, start, end, use_numpy):
+    analytics = AdherenceAnalytics.from_database(db, profile_id, start, end, use_numpy=use_numpy)
+    loaded = time.perf_counter()
+    analytics.daily_counts()
+    analytics.adherence_matrix()
+    analytics.rolling_rates()
+    analytics.time_of_day_stats()
+    analytics.medicine_trends()
+    return loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark adherence analytics")
+    parser.add_argument("--rows", type=int, default=1000000, help="medicine records to generate")
+    parser.add_argument("--days", type=int, default=365 * 3, help="days of history")
+    parser.add_argument("--db", help="database to create (a temporary file by default)")
+    args = parser.parse_args(argv)
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "bench_analytics.db")
+    started = time.perf_counter()
+    db, profile_id, start, end = build_database(path, args.rows, args.days)
+    print(f"built {args.rows:,} records over {args.days} days in {time.perf_counter() - started:.1f}s ({path})")
+
+    started = time.perf_counter()
+    per_metric_queries(db, profile_id, start, end)
+    print(f"{'per-metric SQL queries':<28} {time.perf_counter() - started:8.2f}s")
+
+    backends = [("pure Python", False)] + ([("NumPy", True)] if np is not None else [])
+    for label, use_numpy in backends:
+        started = time.perf_counter()
+        loaded = vectorized(db, profile_id, start, end, use_numpy)
+        finished = time.perf_counter()
+        print(
+            f"{'analytics (' + label + ')':<28} {finished - started:8.2f}s"
+            f"  (load {loaded - started:.2f}s, compute {finished - loaded:.3f}s)"
+        )
+    if np is None:
+        print("NumPy is not installed; only the pure-Python fallback was measured")
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
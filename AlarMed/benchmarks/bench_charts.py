@@ -0,0 +1,116 @@
+"""
+AlarMed - Chart Benchmark
+A year-long heatmap as one canvas widget vs a widget per day
+
+Times drawing a 365-day heatmap the first time, redrawing after one day
+changes, and laying it out again after a resize, for the CalendarHeatmap
+chart and for a grid of 365 coloured MDBoxLayouts. Each step includes the
+redraw or layout the next frame would do, to compare against the 16.7ms
+of a 60 fps frame. Needs Kivy, KivyMD and a display (or a virtual one
+such as xvfb-run).
+
+Usage:
+    python benchmarks/bench_charts.py
+"""
+
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kivy.clock import Clock  # noqa: E402
+from kivy.metrics import dp  # noqa: E402
+from kivymd.app import MDApp  # noqa: E402
+from kivymd.uix.boxlayout import MDBoxLayout  # noqa: E402
+from kivymd.uix.gridlayout import MDGridLayout  # noqa: E402
+
+from screens.charts import HEATMAP_COLORS, CalendarHeatmap  # noqa: E402
+
+DAYS = 365
+FRAME_BUDGET_MS = 1000 / 60
+
+
+def shade(count, top_count):
+    return HEATMAP_COLORS[0 if not count else min(4, max(1, math.ceil(4 * count / top_count)))]
+
+
+class WidgetHeatmap(MDGridLayout):
+    """The heatmap built the widget way: one coloured box per day"""
+
+    def __init__(self, **kwargs):
+        super().__init__(rows=7, orientation='tb-lr', spacing=dp(1), **kwargs)
+        self.boxes = []
+
+    def set_data(self, counts, start=None):
+        top_count = max(counts) or 1
+        if len(self.boxes) != len(counts):
+            self.clear_widgets()
+            self.boxes = [MDBoxLayout() for _ in counts]
+            for box in self.boxes:
+                self.add_widget(box)
+        for box, count in zip(self.boxes, counts):
+            box.md_bg_color = shade(count, top_count)
+
+
+def flush(chart):
+    """Do the work the next frame would do for the chart"""
+    if isinstance(chart, CalendarHeatmap):
+        chart._trigger.cancel()
+        chart._redraw(0)
+    else:
+        chart.do_layout()
+
+
+class ChartBenchmarkApp(MDApp):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        rng = random.Random(1)
+        self.start = date.today() - timedelta(days=DAYS - 1)
+        self.counts = [rng.choice((0, 1, 2, 2, 3, 3, 3, 4)) for _ in range(DAYS)]
+        self.results = []
+
+    def build(self):
+        self.theme_cls.theme_style = "Dark"
+        self.root_box = MDBoxLayout(padding=dp(20))
+        return self.root_box
+
+    def on_start(self):
+        Clock.schedule_once(lambda dt: self.run(), 0.5)
+
+    def run(self):
+        # Today's count changes; the busiest day (and so every shade) does not
+        changed = list(self.counts)
+        changed[-1] = 0 if changed[-1] else 1
+        steps = [
+            ("first draw", lambda chart: chart.set_data(self.counts, self.start)),
+            ("one day changed", lambda chart: chart.set_data(changed, self.start)),
+            ("resize", lambda chart: setattr(chart, "width", chart.width - dp(20))),
+        ]
+        for label, chart_class in (("canvas chart", CalendarHeatmap), ("widget grid", WidgetHeatmap)):
+            chart = chart_class(size_hint=(None, None), size=(dp(370), dp(56)))
+            self.root_box.add_widget(chart)
+            timings = {}
+            for name, step in steps:
+                started = time.perf_counter()
+                step(chart)
+                flush(chart)
+                timings[name] = (time.perf_counter() - started) * 1000
+            self.results.append((label, timings, sum(1 for _ in chart.walk())))
+            self.root_box.clear_widgets()
+        self.report([name for name, step in steps])
+        self.stop()
+
+    def report(self, steps):
+        print(f"{DAYS}-day heatmap, work per step (a 60 fps frame is {FRAME_BUDGET_MS:.1f}ms)")
+        print(f"{'version':<14} " + " ".join(f"{step:>16}" for step in steps) + f" {'widgets':>8}")
+        for label, timings, widgets in self.results:
+            print(f"{label:<14} " + " ".join(f"{timings[step]:14.2f}ms" for step in steps) + f" {widgets:8,}")
+
+
+if __name__ == "__main__":
+    ChartBenchmarkApp().run()
@@ -0,0 +1,103 @@
+"""
+AlarMed - Dashboard Snapshot Latency Budget
+Checks Database.get_dashboard_snapshot against DASHBOARD_SNAPSHOT_BUDGET_MS
+
+Builds (or reuses) a large database, times the snapshot query and the
+separate per-figure calls it replaced, and exits with status 1 when the
+snapshot's p95 latency is over budget.
+
+Usage:
+    python benchmarks/bench_dashboard_snapshot.py [--records 1000000] [--budget-ms 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DASHBOARD_SNAPSHOT_BUDGET_MS  # noqa: E402
+from database import Database  # noqa: E402
+
+
+def build_database(path, records, days, reminders, profiles=4, seed=1):
+    db = Database(path)
+    profile_ids = [db.create_profile(f"Profile {i}", 40, "Other", "#1f6aa5", "👤") for i in range(profiles)]
+    rng = random.Random(seed)
+    today = date.today()
+    dates = [(today - timedelta(days=d)).strftime("%Y-%m-%d") for d in range(days)]
+
+    batch = 100000
+    for offset in range(0, records, batch):
+        db.cursor.executemany(
+            'INSERT INTO medicine_records (profile_id, medicine_name, dosage, time_taken, date_taken, notes) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            [
+                (rng.choice(profile_ids), f"Medicine {rng.randrange(20)}", "1",
+                 f"{rng.randrange(24):02d}:{rng.randrange(60):02d}", rng.choice(dates), "")
+                for _ in range(min(batch, records - offset))
+            ],
+        )
+    db.conn.commit()
+    for i in range(reminders):
+        db.add_reminder(profile_ids[i % profiles], f"Medicine {i}", "1", "Daily", "08:00, 20:00")
+    return db, profile_ids[0], today.strftime("%Y-%m-%d")
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+def time_calls(func, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return percentiles(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dashboard snapshot latency budget")
+    parser.add_argument("--records", type=int, default=1000000, help="medicine records to generate")
+    parser.add_argument("--days", type=int, default=365 * 5, help="days of history")
+    parser.add_argument("--reminders", type=int, default=400, help="reminders to generate")
+    parser.add_argument("--runs", type=int, default=200, help="timed runs per variant")
+    parser.add_argument("--budget-ms", type=float, default=DASHBOARD_SNAPSHOT_BUDGET_MS, help="p95 budget")
+    parser.add_argument("--db", help="database to create (a temporary file by default)")
+    args = parser.parse_args(argv)
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "bench_dashboard.db")
+    started = time.perf_counter()
+    db, profile_id, today = build_database(path, args.records, args.days, args.reminders)
+    print(f"built {args.records:,} records in {time.perf_counter() - started:.1f}s ({path})")
+
+    def separate_calls():
+        db.get_today_medicine_count(profile_id, today)
+        db.get_active_reminder_count(profile_id)
+        db.get_streak_summary(profile_id, today)
+        db.get_active_reminders(profile_id)
+        db.get_table_version("medicine_records")
+        db.get_table_version("reminders")
+
+    old_p50, old_p95 = time_calls(separate_calls, args.runs)
+    new_p50, new_p95 = time_calls(lambda: db.get_dashboard_snapshot(profile_id, today), args.runs)
+    print(f"{'variant':<18} {'p50':>9} {'p95':>9}")
+    print(f"{'separate calls':<18} {old_p50:7.2f}ms {old_p95:7.2f}ms")
+    print(f"{'snapshot':<18} {new_p50:7.2f}ms {new_p95:7.2f}ms")
+    db.close()
+
+    if new_p95 > args.budget_ms:
+        print(f"FAIL: snapshot p95 {new_p95:.2f}ms is over the {args.budget_ms:g}ms budget")
+        return 1
+    print(f"OK: snapshot p95 within the {args.budget_ms:g}ms budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+AlarMed - Dialog Benchmark
+Compares a new MDDialog per popup with the pooled DialogManager
+
+Opens and closes --popups info and confirm dialogs each way and reports
+the time from the request to the dialog being on screen (construction plus
+open) and the peak Python memory traced over the run. Needs Kivy, KivyMD and a
+display (or a virtual one such as xvfb-run).
+
+Usage:
+    python benchmarks/bench_dialogs.py [--popups 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kivy.clock import Clock  # noqa: E402
+from kivymd.app import MDApp  # noqa: E402
+from kivymd.uix.button import MDFlatButton, MDRaisedButton  # noqa: E402
+from kivymd.uix.dialog import MDDialog  # noqa: E402
+from kivymd.uix.screen import MDScreen  # noqa: E402
+
+from dialogs import DANGER_COLOR, DialogManager  # noqa: E402
+
+
+def open_fresh(index):
+    """A popup the way the screens built them before the dialog manager"""
+    if index % 2:
+        dialog = MDDialog(
+            title="Delete Reminder",
+            text="Are you sure you want to delete this reminder?",
+            buttons=[
+                MDRaisedButton(text="DELETE", md_bg_color=DANGER_COLOR, on_release=lambda x: dialog.dismiss()),
+                MDFlatButton(text="CANCEL", on_release=lambda x: dialog.dismiss()),
+            ],
+        )
+    else:
+        dialog = MDDialog(
+            title="Success",
+            text="Reminder created successfully!",
+            buttons=[MDFlatButton(text="OK", on_release=lambda x: dialog.dismiss())],
+        )
+    dialog.open()
+    return dialog
+
+
+class DialogBenchmarkApp(MDApp):
+    def __init__(self, popups, **kwargs):
+        super().__init__(**kwargs)
+        self.popups = popups
+        self.results = []
+
+    def build(self):
+        self.theme_cls.theme_style = "Dark"
+        return MDScreen()
+
+    def on_start(self):
+        Clock.schedule_once(lambda dt: self.run("new MDDialog", open_fresh), 0.5)
+
+    def open_pooled(self, index):
+        if index % 2:
+            self.manager.confirm(
+                "Delete Reminder", "Are you sure you want to delete this reminder?", None,
+                confirm_text="DELETE", danger=True,
+            )
+        else:
+            self.manager.info("Success", "Reminder created successfully!")
+        return self.manager._shown[-1]
+
+    def run(self, label, open_popup):
+        self.manager = DialogManager()
+        samples = []
+        tracemalloc.start()
+        for index in range(self.popups):
+            started = time.perf_counter()
+            dialog = open_popup(index)
+            samples.append(time.perf_counter() - started)
+            dialog.dismiss(animation=False)
+            Clock.tick()  # Let the pool take the dialog back
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.results.append((label, samples, peak))
+
+        if label == "new MDDialog":
+            Clock.schedule_once(lambda dt: self.run("DialogManager", self.open_pooled), 0.5)
+        else:
+            self.report()
+            self.stop()
+
+    def report(self):
+        print(f"{self.popups} popups (alternating info / confirm)")
+        print(f"{'version':<14} {'first open':>11} {'median open':>12} {'peak memory':>12}")
+        for label, samples, peak in self.results:
+            median = sorted(samples)[len(samples) // 2]
+            print(f"{label:<14} {samples[0] * 1000:9.1f}ms {median * 1000:10.2f}ms {peak / 1e6:10.2f}MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dialog creation")
+    parser.add_argument("--popups", type=int, default=50, help="popups to open each way")
+    args = parser.parse_args(argv)
+    DialogBenchmarkApp(args.popups).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
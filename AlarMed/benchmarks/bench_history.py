@@ -0,0 +1,174 @@
+"""
+AlarMed - History List Benchmark
+Compares the old widget-per-record history with the RecycleView list
+
+Generates --records records in a temporary database, then for each version
+measures the time to build the list and lay it out (until the next frame),
+the number of widgets created and the Python memory allocated. Needs Kivy,
+KivyMD and a display (or a virtual one such as xvfb-run).
+
+Usage:
+    python benchmarks/bench_history.py [--records 10000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kivy.clock import Clock  # noqa: E402
+from kivy.metrics import dp  # noqa: E402
+from kivymd.app import MDApp  # noqa: E402
+from kivymd.uix.boxlayout import MDBoxLayout  # noqa: E402
+from kivymd.uix.card import MDCard  # noqa: E402
+from kivymd.uix.label import MDLabel  # noqa: E402
+from kivymd.uix.scrollview import MDScrollView  # noqa: E402
+
+from database import Database  # noqa: E402
+from screens.history import HistoryScreen  # noqa: E402
+from time_source import system_clock  # noqa: E402
+from utils import display_time  # noqa: E402
+
+
+def fill_database(db, records, days=730, seed=1):
+    profile_id = db.create_profile("Benchmark", 40, "Other", "#1f6aa5", "👤")
+    rng = random.Random(seed)
+    today = datetime.now()
+    db.add_medicine_records(
+        profile_id,
+        [
+            (
+                f"Medicine {rng.randrange(12)}",
+                "1 tablet",
+                f"{rng.randrange(24):02d}:{rng.randrange(60):02d}",
+                (today - timedelta(days=rng.randrange(days))).strftime("%Y-%m-%d"),
+                "With food" if rng.random() < 0.3 else "",
+            )
+            for _ in range(records)
+        ],
+    )
+    return profile_id
+
+
+def build_legacy(records, today_str):
+    """The history list as it was built before RecycleView: every widget up front"""
+    scroll = MDScrollView()
+    layout = MDBoxLayout(orientation='vertical', spacing=dp(15), padding=dp(20), size_hint_y=None)
+    layout.bind(minimum_height=layout.setter('height'))
+    scroll.add_widget(layout)
+
+    records_by_date = {}
+    for record in records:
+        records_by_date.setdefault(record[5], []).append(record)
+
+    for date in sorted(records_by_date.keys(), reverse=True):
+        is_today = date == today_str
+        date_card = MDCard(
+            orientation='vertical', padding=dp(20), spacing=dp(15), size_hint_y=None,
+            md_bg_color=[0.12, 0.42, 0.65, 1] if is_today else [0.1, 0.1, 0.1, 1],
+            radius=[15, 15, 15, 15],
+        )
+        date_card.add_widget(MDLabel(
+            text=datetime.strptime(date, "%Y-%m-%d").strftime("%A, %B %d, %Y"),
+            font_style="Subtitle1", bold=True, size_hint_y=None, height=dp(30),
+        ))
+        for record in records_by_date[date]:
+            record_box = MDBoxLayout(orientation='vertical', size_hint_y=None, padding=[0, dp(10)], spacing=dp(8))
+            record_box.add_widget(MDLabel(
+                text=display_time(record[4]), font_style="Caption", theme_text_color='Secondary',
+                size_hint_y=None, height=dp(20),
+            ))
+            record_box.add_widget(MDLabel(
+                text=f"{record[2]} - {record[3]}", font_style="Body1", size_hint_y=None, height=dp(25),
+            ))
+            if record[6]:
+                notes_label = MDLabel(
+                    text=record[6], font_style="Caption", theme_text_color='Secondary', size_hint_y=None,
+                )
+                notes_label.bind(texture_size=notes_label.setter('size'))
+                record_box.add_widget(notes_label)
+            record_box.add_widget(MDBoxLayout(size_hint_y=None, height=dp(1), md_bg_color=[0.2, 0.2, 0.2, 1]))
+            record_box.bind(minimum_height=record_box.setter('height'))
+            date_card.add_widget(record_box)
+        date_card.bind(minimum_height=date_card.setter('height'))
+        layout.add_widget(date_card)
+    return scroll
+
+
+def count_widgets(widget):
+    return sum(1 for _ in widget.walk())
+
+
+class HistoryBenchmarkApp(MDApp):
+    def __init__(self, records, **kwargs):
+        super().__init__(**kwargs)
+        self.records = records
+        self.clock = system_clock
+        self.db = Database(os.path.join(tempfile.mkdtemp(), "bench_history.db"))
+        self.current_profile_id = fill_database(self.db, records)
+        self.results = []
+
+    def build(self):
+        self.theme_cls.theme_style = "Dark"
+        self.container = MDBoxLayout()
+        return self.container
+
+    def go_to_screen(self, screen_name):
+        pass
+
+    def on_start(self):
+        Clock.schedule_once(lambda dt: self.measure("legacy", self.build_legacy_view), 0.5)
+
+    def build_legacy_view(self):
+        records = self.db.get_medicine_records(self.current_profile_id)
+        return build_legacy(records, self.clock.now().strftime("%Y-%m-%d"))
+
+    def build_recycle_view(self):
+        screen = HistoryScreen(name="history")
+        screen.set_filter(9999)
+        return screen
+
+    def measure(self, label, build):
+        tracemalloc.start()
+        started = time.perf_counter()
+        view = build()
+        self.container.add_widget(view)
+
+        def after_layout(dt):
+            elapsed = time.perf_counter() - started
+            allocated = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            self.results.append((label, elapsed, count_widgets(view), allocated))
+            self.container.clear_widgets()
+            if label == "legacy":
+                Clock.schedule_once(lambda dt: self.measure("recycleview", self.build_recycle_view), 0.5)
+            else:
+                self.report()
+                self.stop()
+
+        Clock.schedule_once(after_layout, 0)
+
+    def report(self):
+        print(f"{self.records:,} records")
+        print(f"{'version':<14} {'build+layout':>13} {'widgets':>9} {'python memory':>14}")
+        for label, elapsed, widgets, allocated in self.results:
+            print(f"{label:<14} {elapsed * 1000:11.0f}ms {widgets:9,} {allocated / 1e6:12.1f}MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the history list")
+    parser.add_argument("--records", type=int, default=10000, help="records to generate")
+    args = parser.parse_args(argv)
+    HistoryBenchmarkApp(args.records).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+AlarMed - History Summary Benchmark
+Opening the history screen: every record vs one aggregate query of day summaries
+
+Builds (or reuses) a large database and times the data work of opening the
+history screen for each filter. "records" reads every record in the range
+and formats a heading per day, as the screen did before day summaries;
+"summaries" is Database.get_daily_summaries. Widget work is not included
+(see bench_history.py).
+
+Usage:
+    python benchmarks/bench_history_summary.py [--records 1000000] [--days 7 30 90 9999]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_dashboard_snapshot import build_database, percentiles  # noqa: E402
+
+
+def open_with_records(db, profile_id, cutoff):
+    """The old refresh_history data path: all records, a heading per day"""
+    records = db.get_medicine_records(profile_id, cutoff) if cutoff else db.get_medicine_records(profile_id)
+    headings = {}
+    for record in records:
+        if record[5] not in headings:
+            headings[record[5]] = datetime.strptime(record[5], "%Y-%m-%d").strftime("%A, %B %d, %Y")
+    return len(records)
+
+
+def open_with_summaries(db, profile_id, cutoff):
+    return len(db.get_daily_summaries(profile_id, cutoff))
+
+
+def time_calls(func, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return percentiles(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark history day summaries")
+    parser.add_argument("--records", type=int, default=1000000, help="medicine records to generate")
+    parser.add_argument("--history-days", type=int, default=365 * 5, help="days of history")
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 30, 90, 9999], help="filters to time")
+    parser.add_argument("--runs", type=int, default=20, help="timed runs per variant")
+    parser.add_argument("--db", help="database to create (a temporary file by default)")
+    args = parser.parse_args(argv)
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "bench_history_summary.db")
+    started = time.perf_counter()
+    db, profile_id, today = build_database(path, args.records, args.history_days, reminders=0)
+    print(f"built {args.records:,} records in {time.perf_counter() - started:.1f}s ({path})")
+
+    print(f"{'filter':<9} {'records':>10} {'records p50':>12} {'summaries p50':>14} {'days':>7}")
+    for days in args.days:
+        cutoff = None if days == 9999 else (date.today() - timedelta(days=days)).strftime("%Y-%m-%d")
+        record_rows = open_with_records(db, profile_id, cutoff)
+        summary_rows = open_with_summaries(db, profile_id, cutoff)
+        old_p50, _ = time_calls(lambda: open_with_records(db, profile_id, cutoff), args.runs)
+        new_p50, _ = time_calls(lambda: open_with_summaries(db, profile_id, cutoff), args.runs)
+        label = "all" if days == 9999 else f"{days}d"
+        print(f"{label:<9} {record_rows:10,} {old_p50:10.1f}ms {new_p50:12.1f}ms {summary_rows:7,}")
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
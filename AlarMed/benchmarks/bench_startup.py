@@ -0,0 +1,110 @@
+"""
+AlarMed - Cold Start Benchmark
+Time to first frame and import time, lazy vs eager screens, against the startup budget
+
+Each run is a fresh Python process traced with startup_trace, from the
+import of main.py to the first frame. It works on a throwaway database
+with one profile, so startup goes straight to the dashboard. "eager"
+builds all eight screens in build(), as the app did before the screen
+registry; "lazy" is the app as shipped. Needs Kivy, KivyMD and a display (or a virtual one such as
+xvfb-run).
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_app(mode, trace_path):
+    """Child process: start the app, trace it to the first frame, and quit"""
+    os.environ.setdefault("KIVY_NO_ARGS", "1")
+    os.environ["ALARMED_STARTUP_TRACE"] = trace_path
+    sys.path.insert(0, APP_DIR)
+
+    # main.py opens alarmed.db and fonts/ relative to the working directory
+    workdir = tempfile.mkdtemp()
+    os.symlink(os.path.join(APP_DIR, "fonts"), os.path.join(workdir, "fonts"))
+    os.chdir(workdir)
+
+    from database import Database
+
+    db = Database()
+    profile_id = db.create_profile("Benchmark", 40, "Other", "#1f6aa5", "👤")
+    db.update_profile_last_active(profile_id)
+    db.close()
+
+    from main import AlarMedApp
+
+    class StartupApp(AlarMedApp):
+        def build(self):
+            root = super().build()
+            if mode == "eager":
+                self.screen_registry.build_all()
+            return root
+
+        def on_first_frame(self, *args):
+            super().on_first_frame(*args)
+            self.stop()
+
+    StartupApp().run()
+
+
+def measure(mode, runs):
+    """(first frame ms, import ms) per cold start"""
+    samples = []
+    for _ in range(runs):
+        trace_path = os.path.join(tempfile.mkdtemp(), "startup_trace.json")
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", mode, "--trace", trace_path],
+            capture_output=True, check=True,
+        )
+        with open(trace_path, encoding="utf-8") as f:
+            report = json.load(f)
+        samples.append((report["first_frame_ms"], report["import_ms"]))
+    return samples
+
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark time to first frame")
+    parser.add_argument("--runs", type=int, default=5, help="cold starts per mode")
+    parser.add_argument("--child", choices=["lazy", "eager"], help=argparse.SUPPRESS)
+    parser.add_argument("--trace", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_app(args.child, args.trace)
+        return 0
+
+    sys.path.insert(0, APP_DIR)
+    from config import STARTUP_FIRST_FRAME_TARGET_MS, STARTUP_IMPORT_BUDGET_MS
+
+    print(f"{'mode':<8} {'first frame':>12} {'imports':>9}   (median of {args.runs})")
+    results = {}
+    for mode in ("eager", "lazy"):
+        samples = measure(mode, args.runs)
+        results[mode] = (median([s[0] for s in samples]), median([s[1] for s in samples]))
+        print(f"{mode:<8} {results[mode][0]:10.0f}ms {results[mode][1]:7.0f}ms")
+
+    first_frame_ms, import_ms = results["lazy"]
+    within = first_frame_ms <= STARTUP_FIRST_FRAME_TARGET_MS and import_ms <= STARTUP_IMPORT_BUDGET_MS
+    print(
+        f"budget: first frame {STARTUP_FIRST_FRAME_TARGET_MS}ms, imports {STARTUP_IMPORT_BUDGET_MS}ms - "
+        f"{'within budget' if within else 'OVER BUDGET'}"
+    )
+    return 0 if within else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
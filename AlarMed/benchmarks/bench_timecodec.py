@@ -0,0 +1,71 @@
+"""
+AlarMed - Time Codec Benchmark
+Compares the strptime/strftime conversions utils used to do with timecodec
+
+Usage:
+    python benchmarks/bench_timecodec.py [--number 20000]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timecodec import format_24h, format_ampm, parse_24h, parse_ampm  # noqa: E402
+
+SAMPLE_24H = [f"{h:02d}:{m:02d}" for h in range(24) for m in (0, 15, 30, 45)]
+SAMPLE_AMPM = [format_ampm(parse_24h(t)) for t in SAMPLE_24H]
+# Non-canonical input ("8:15") misses the table and runs the hand-written parser
+SAMPLE_LENIENT = [f"{h}:{m:02d}" for h in range(24) for m in (0, 15, 30, 45)]
+
+
+def strptime_to_ampm(time_24):
+    return datetime.strptime(time_24, "%H:%M").strftime("%I:%M %p")
+
+
+def strptime_to_24h(time_ampm):
+    return datetime.strptime(time_ampm, "%I:%M %p").strftime("%H:%M")
+
+
+def codec_to_ampm(time_24):
+    return format_ampm(parse_24h(time_24))
+
+
+def codec_to_24h(time_ampm):
+    return format_24h(parse_ampm(time_ampm))
+
+
+def run(label, func, samples, number):
+    per_call = min(timeit.repeat(lambda: [func(s) for s in samples], number=number // len(samples), repeat=3))
+    per_call = per_call / (number // len(samples) * len(samples)) * 1e9
+    print(f"{label:<28} {per_call:8.0f} ns/call")
+    return per_call
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark time string conversions")
+    parser.add_argument("--number", type=int, default=20000, help="conversions per measurement")
+    args = parser.parse_args(argv)
+
+    for func_a, func_b, samples in (
+        (strptime_to_ampm, codec_to_ampm, SAMPLE_24H),
+        (strptime_to_24h, codec_to_24h, SAMPLE_AMPM),
+    ):
+        assert [func_a(s) for s in samples] == [func_b(s) for s in samples]
+
+    print(f"{'conversion':<28} {'time':>8}")
+    old = run("strptime 24h -> AM/PM", strptime_to_ampm, SAMPLE_24H, args.number)
+    new = run("timecodec 24h -> AM/PM", codec_to_ampm, SAMPLE_24H, args.number)
+    run("timecodec lenient -> AM/PM", codec_to_ampm, SAMPLE_LENIENT, args.number)
+    print(f"  speedup: {old / new:.1f}x")
+    old = run("strptime AM/PM -> 24h", strptime_to_24h, SAMPLE_AMPM, args.number)
+    new = run("timecodec AM/PM -> 24h", codec_to_24h, SAMPLE_AMPM, args.number)
+    print(f"  speedup: {old / new:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+AlarMed - Frame Report Comparison
+Compares two frame monitor reports (see frame_monitor.py), e.g. from two builds
+
+Prints the share of slow frames and the worst frame per screen, and the
+slowest call per traced method, before and after. Exits with status 1 when
+any screen's share of slow frames went up by more than --tolerance points.
+
+Usage:
+    python benchmarks/compare_frames.py before.json after.json [--tolerance 1.0]
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def slow_share(stats):
+    """Percentage of frames over the threshold"""
+    return 100.0 * stats["slow_frames"] / stats["frames"] if stats and stats["frames"] else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two frame monitor reports")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--tolerance", type=float, default=1.0, help="allowed rise in slow frames (points)")
+    args = parser.parse_args(argv)
+    before, after = load(args.before), load(args.after)
+
+    if before["threshold_ms"] != after["threshold_ms"]:
+        print(f"warning: thresholds differ ({before['threshold_ms']}ms vs {after['threshold_ms']}ms)")
+
+    print(f"{'screen':<18} {'slow before':>12} {'slow after':>11} {'max before':>11} {'max after':>10}")
+    regressed = []
+    for screen in sorted(set(before["screens"]) | set(after["screens"])):
+        old, new = before["screens"].get(screen), after["screens"].get(screen)
+        old_share, new_share = slow_share(old), slow_share(new)
+        old_max = f"{old['max_ms']:.0f}ms" if old else "-"
+        new_max = f"{new['max_ms']:.0f}ms" if new else "-"
+        print(f"{screen:<18} {old_share:11.1f}% {new_share:10.1f}% {old_max:>11} {new_max:>10}")
+        if old and new and new_share - old_share > args.tolerance:
+            regressed.append(screen)
+
+    print(f"\n{'method':<40} {'max before':>11} {'max after':>10}")
+    for method in sorted(set(before["methods"]) | set(after["methods"])):
+        old, new = before["methods"].get(method), after["methods"].get(method)
+        old_max = f"{old['max_ms']:.1f}ms" if old else "-"
+        new_max = f"{new['max_ms']:.1f}ms" if new else "-"
+        print(f"{method:<40} {old_max:>11} {new_max:>10}")
+
+    if regressed:
+        print(f"\nFAIL: more slow frames on {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,7 +4,10 @@ package.name = alarmed
 package.domain = org.alarmed
 
 source.dir = .
-source.include_exts = py,png,jpg,kv,atlas,db
+source.include_exts = py,png,jpg,kv,atlas,ttf,mp3,txt
+source.exclude_dirs = benchmarks,venv
+# Only the Poppins weights registered in main.py (Regular, Bold) are packaged
+source.exclude_patterns = fonts/Poppins-*Italic.ttf,fonts/Poppins-Black.ttf,fonts/Poppins-ExtraBold.ttf,fonts/Poppins-ExtraLight.ttf,fonts/Poppins-Light.ttf,fonts/Poppins-Medium.ttf,fonts/Poppins-SemiBold.ttf,fonts/Poppins-Thin.ttf
 
 version = 1.0
 
@@ -50,3 +50,56 @@ DB_NAME = "alarmed.db"
 
 # Reminder check interval (seconds)
 REMINDER_CHECK_INTERVAL = 60
+
+# Dose ledger: days expanded ahead of today, and how far (minutes) a logged
+# record may be from its scheduled time to count as taken / late
+DOSE_LEDGER_WINDOW_DAYS = 7
+DOSE_ON_TIME_TOLERANCE = 30
+DOSE_LATE_TOLERANCE = 180
+
+# Alarm audio
+ALARM_SOUND_CACHE_SIZE = 4        # decoded tones kept in memory (LRU)
+ALARM_ESCALATE_START_VOLUME = 0.3
+ALARM_ESCALATE_STEP = 0.1         # volume added per step
+ALARM_ESCALATE_INTERVAL = 5       # seconds between steps
+# Defaults for profiles without their own alarm settings: the tone file
+# (None for the bundled ringtone) and whether the alarm rings until answered,
+# getting louder, rather than playing once
+ALARM_TONE = None
+ALARM_ESCALATE = False
+
+# Minutes before a snoozed reminder alert rings again
+REMINDER_SNOOZE_MINUTES = 10
+
+# Reminder dispatch metrics, written to the app's user data directory
+REMINDER_METRICS_FILE = "reminder_metrics.json"
+REMINDER_METRICS_WINDOW_HOURS = 24
+
+# How far ahead the dashboard's upcoming-dose timeline looks
+TIMELINE_HORIZON_HOURS = 24
+
+# Latency budget for Database.get_dashboard_snapshot (milliseconds, p95)
+DASHBOARD_SNAPSHOT_BUDGET_MS = 20
+
+# Screens are built on first visit; likely next screens are prefetched once
+# the app has been idle this long (seconds) after a navigation
+SCREEN_PREFETCH_DELAY = 1.5
+
+# Startup budget (milliseconds): launch to first rendered frame, and the
+# part of it spent importing modules (see startup_trace.py)
+STARTUP_FIRST_FRAME_TARGET_MS = 1500
+STARTUP_IMPORT_BUDGET_MS = 900
+
+# Seconds a computed report stays cached when nothing it depends on changed
+# (dose statuses still move from pending to missed as time passes)
+REPORT_CACHE_MAX_AGE = 600
+
+# Debug frame monitor (see frame_monitor.py): frames longer than this
+# (milliseconds) count as slow, and the histogram's bucket upper bounds
+FRAME_JANK_THRESHOLD_MS = 32
+FRAME_HISTOGRAM_BUCKETS_MS = (8, 16, 32, 50, 100, 250, 500, 1000)
+
+# Record screen medicine suggestions: seconds of typing pause before a
+# lookup, and how many matches to show
+MEDICINE_SEARCH_DEBOUNCE = 0.25
+MEDICINE_SUGGESTION_LIMIT = 5
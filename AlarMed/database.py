@@ -8,11 +8,24 @@ import json
 import os
 from datetime import datetime
 
+from recurrence import rule_from_legacy
+
+# Tables whose writes bump a version counter (for UPDATE, only these columns)
+VERSIONED_TABLES = {
+    "reminders": "medicine_name, dosage, schedule_type, time_schedule, days_schedule, active, rrule",
+    "medicine_records": "medicine_name, dosage, time_taken, date_taken, notes, completed",
+    "medicine_library": "medicine_name, common_dosage, usage_count, last_used",
+}
+
 
 class Database:
     def __init__(self, db_name='alarmed.db'):
+        self.path = db_name
         self.conn = sqlite3.connect(db_name, check_same_thread=False)
         self.cursor = self.conn.cursor()
+        # WAL with full sync: a committed reminder transition survives a crash
+        self.cursor.execute('PRAGMA journal_mode=WAL')
+        self.cursor.execute('PRAGMA synchronous=FULL')
         self.init_tables()
     
     def init_tables(self):
@@ -28,9 +41,12 @@ class Database:
                 profile_color TEXT DEFAULT '#1f6aa5',
                 avatar_emoji TEXT DEFAULT '👤',
                 created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                last_active TEXT DEFAULT CURRENT_TIMESTAMP
+                last_active TEXT DEFAULT CURRENT_TIMESTAMP,
+                alarm_tone TEXT,
+                alarm_escalate INTEGER
             )
         ''')
+        self.migrate_profile_alarm_settings()
         
         # Medicine records table
         self.cursor.execute('''
@@ -61,9 +77,11 @@ class Database:
                 active INTEGER DEFAULT 1,
                 last_reminded TEXT,
                 snoozed_until TEXT,
+                rrule TEXT,
                 FOREIGN KEY (profile_id) REFERENCES user_profiles(id)
             )
         ''')
+        self.migrate_reminder_rules()
         
         # Emergency contacts table
         self.cursor.execute('''
@@ -90,6 +108,90 @@ class Database:
             )
         ''')
         
+        # Scheduled doses ledger (reminder schedules expanded into occurrences)
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scheduled_doses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                profile_id INTEGER NOT NULL,
+                reminder_id INTEGER NOT NULL,
+                medicine_name TEXT NOT NULL,
+                dosage TEXT NOT NULL,
+                scheduled_date TEXT NOT NULL,
+                scheduled_time TEXT NOT NULL,
+                status TEXT DEFAULT 'pending',
+                record_id INTEGER,
+                FOREIGN KEY (profile_id) REFERENCES user_profiles(id),
+                FOREIGN KEY (reminder_id) REFERENCES reminders(id),
+                FOREIGN KEY (record_id) REFERENCES medicine_records(id),
+                UNIQUE(reminder_id, scheduled_date, scheduled_time)
+            )
+        ''')
+        
+        # How far each reminder has been expanded into the ledger
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS dose_ledger_state (
+                reminder_id INTEGER PRIMARY KEY,
+                anchor_date TEXT NOT NULL,
+                expanded_through TEXT NOT NULL,
+                FOREIGN KEY (reminder_id) REFERENCES reminders(id)
+            )
+        ''')
+        
+        # One row per reminder occurrence that has fired (idempotency key)
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS reminder_fires (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                reminder_id INTEGER NOT NULL,
+                occurrence_ts TEXT NOT NULL,
+                fired_at TEXT NOT NULL,
+                status TEXT DEFAULT 'fired',
+                snoozed_until TEXT,
+                responded_at TEXT,
+                FOREIGN KEY (reminder_id) REFERENCES reminders(id),
+                UNIQUE(reminder_id, occurrence_ts)
+            )
+        ''')
+        
+        # Days with at least one completed record, kept in step by triggers
+        self.init_record_days()
+        
+        # Indexes for date-range lookups and dose matching
+        # (medicine_name makes it covering for the history's day summaries;
+        # it replaces the older profile/date index)
+        self.cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_records_profile_date_name '
+            'ON medicine_records(profile_id, date_taken, medicine_name)'
+        )
+        self.cursor.execute('DROP INDEX IF EXISTS idx_records_profile_date')
+        self.cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_doses_profile_date ON scheduled_doses(profile_id, status, scheduled_date)'
+        )
+        self.cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_doses_record ON scheduled_doses(record_id)'
+        )
+        self.cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_fires_snoozed ON reminder_fires(status, snoozed_until)'
+        )
+        
+        # Version counters kept current by triggers, so caches built from a
+        # table can tell (with one read) whether any connection changed it
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS table_versions (
+                table_name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        for table, columns in VERSIONED_TABLES.items():
+            self.cursor.execute('INSERT OR IGNORE INTO table_versions (table_name) VALUES (?)', (table,))
+            for event in ("INSERT", "DELETE", f"UPDATE OF {columns}"):
+                self.cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS bump_{table}_{event.split()[0].lower()}
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+                    END
+                ''')
+        
         # Add default emergency contacts
         self.cursor.execute('SELECT COUNT(*) FROM emergency_contacts')
         if self.cursor.fetchone()[0] == 0:
@@ -118,14 +220,39 @@ class Database:
         self.cursor.execute('SELECT * FROM user_profiles WHERE id = ?', (profile_id,))
         return self.cursor.fetchone()
     
-    def create_profile(self, name, age, gender, color, emoji):
+    def create_profile(self, name, age, gender, color, emoji, alarm_tone=None, alarm_escalate=None):
         self.cursor.execute('''
-            INSERT INTO user_profiles (profile_name, age, gender, profile_color, avatar_emoji)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (name, age, gender, color, emoji))
+            INSERT INTO user_profiles (profile_name, age, gender, profile_color, avatar_emoji, alarm_tone, alarm_escalate)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (name, age, gender, color, emoji, alarm_tone,
+              None if alarm_escalate is None else int(alarm_escalate)))
         self.conn.commit()
         return self.cursor.lastrowid
     
+    def migrate_profile_alarm_settings(self):
+        """Add the per-profile alarm columns to older databases"""
+        self.cursor.execute('PRAGMA table_info(user_profiles)')
+        columns = [row[1] for row in self.cursor.fetchall()]
+        if 'alarm_tone' not in columns:
+            self.cursor.execute('ALTER TABLE user_profiles ADD COLUMN alarm_tone TEXT')
+        if 'alarm_escalate' not in columns:
+            self.cursor.execute('ALTER TABLE user_profiles ADD COLUMN alarm_escalate INTEGER')
+        self.conn.commit()
+    
+    def get_profile_alarm_settings(self, profile_id):
+        """(tone path, escalate) for the profile; None where it uses the default"""
+        self.cursor.execute(
+            'SELECT alarm_tone, alarm_escalate FROM user_profiles WHERE id = ?', (profile_id,)
+        )
+        return self.cursor.fetchone() or (None, None)
+    
+    def update_profile_alarm_settings(self, profile_id, tone, escalate):
+        self.cursor.execute(
+            'UPDATE user_profiles SET alarm_tone = ?, alarm_escalate = ? WHERE id = ?',
+            (tone, None if escalate is None else int(escalate), profile_id)
+        )
+        self.conn.commit()
+    
     def update_profile(self, profile_id, name, age, gender, color, emoji):
         self.cursor.execute('''
             UPDATE user_profiles 
@@ -136,6 +263,15 @@ class Database:
     
     def delete_profile(self, profile_id):
         self.cursor.execute('DELETE FROM medicine_records WHERE profile_id = ?', (profile_id,))
+        self.cursor.execute(
+            'DELETE FROM dose_ledger_state WHERE reminder_id IN (SELECT id FROM reminders WHERE profile_id = ?)',
+            (profile_id,)
+        )
+        self.cursor.execute('DELETE FROM scheduled_doses WHERE profile_id = ?', (profile_id,))
+        self.cursor.execute(
+            'DELETE FROM reminder_fires WHERE reminder_id IN (SELECT id FROM reminders WHERE profile_id = ?)',
+            (profile_id,)
+        )
         self.cursor.execute('DELETE FROM reminders WHERE profile_id = ?', (profile_id,))
         self.cursor.execute('DELETE FROM medicine_library WHERE profile_id = ?', (profile_id,))
         self.cursor.execute('DELETE FROM user_profiles WHERE id = ?', (profile_id,))
@@ -173,6 +309,25 @@ class Database:
         ''', (profile_id, medicine_name, dosage, time_taken, date_taken, notes))
         self.conn.commit()
     
+    def add_medicine_records(self, profile_id, records):
+        """Insert several records and update the library in one transaction.
+
+        records holds (medicine_name, dosage, time_taken, date_taken, notes) rows.
+        """
+        with self.conn:
+            self.cursor.executemany('''
+                INSERT INTO medicine_records (profile_id, medicine_name, dosage, time_taken, date_taken, notes)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(profile_id, *record) for record in records])
+            self.cursor.executemany('''
+                INSERT INTO medicine_library (profile_id, medicine_name, common_dosage, usage_count, last_used)
+                VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT(profile_id, medicine_name) DO UPDATE SET
+                    usage_count = usage_count + 1,
+                    common_dosage = excluded.common_dosage,
+                    last_used = excluded.last_used
+            ''', [(profile_id, name, dosage, date_taken) for name, dosage, _, date_taken, _ in records])
+    
     def get_medicine_records(self, profile_id, date_filter=None):
         if date_filter:
             self.cursor.execute('''
@@ -187,7 +342,31 @@ class Database:
                 ORDER BY date_taken DESC, time_taken DESC
             ''', (profile_id,))
         return self.cursor.fetchall()
-    
+
+    def get_daily_summaries(self, profile_id, date_filter=None):
+        """One row per day with records, newest first: (date_taken, doses,
+        distinct medicines, their names joined with ", ")"""
+        self.cursor.execute('''
+            SELECT date_taken, SUM(doses), COUNT(*), group_concat(medicine_name, ', ')
+            FROM (
+                SELECT date_taken, medicine_name, COUNT(*) AS doses
+                FROM medicine_records
+                WHERE profile_id = ? AND date_taken >= ?
+                GROUP BY date_taken, medicine_name
+            )
+            GROUP BY date_taken
+            ORDER BY date_taken DESC
+        ''', (profile_id, date_filter or ''))
+        return self.cursor.fetchall()
+
+    def get_medicine_records_for_day(self, profile_id, date_taken):
+        self.cursor.execute('''
+            SELECT * FROM medicine_records
+            WHERE profile_id = ? AND date_taken = ?
+            ORDER BY time_taken DESC
+        ''', (profile_id, date_taken))
+        return self.cursor.fetchall()
+
     def get_today_medicine_count(self, profile_id, today_date):
         self.cursor.execute(
             'SELECT COUNT(*) FROM medicine_records WHERE date_taken = ? AND profile_id = ?',
@@ -195,23 +374,146 @@ class Database:
         )
         return self.cursor.fetchone()[0]
     
-    def get_streak_dates(self, profile_id):
+    def get_dashboard_snapshot(self, profile_id, today):
+        """Every dashboard figure in one statement (so one consistent read):
+        (today's records, active reminders, current streak, medicine_records
+        version, reminders version).
+
+        The streak CTE numbers logged days newest first; day + n - 1 stays
+        equal to the newest day exactly while the days are consecutive.
+        """
         self.cursor.execute('''
-            SELECT DISTINCT date_taken 
-            FROM medicine_records 
-            WHERE completed = 1 AND profile_id = ?
-            ORDER BY date_taken DESC
-        ''', (profile_id,))
-        return [row[0] for row in self.cursor.fetchall()]
+            WITH recent_days AS (
+                SELECT day, ROW_NUMBER() OVER (ORDER BY day DESC) AS n
+                FROM record_days
+                WHERE profile_id = :profile_id
+            ),
+            latest AS (
+                SELECT MAX(day) AS day FROM record_days WHERE profile_id = :profile_id
+            ),
+            current_streak AS (
+                SELECT CASE WHEN CAST(julianday(:today) AS INTEGER) - latest.day IN (0, 1)
+                            THEN (SELECT COUNT(*) FROM recent_days WHERE day + n - 1 = latest.day)
+                            ELSE 0 END AS days
+                FROM latest
+            )
+            SELECT
+                (SELECT COUNT(*) FROM medicine_records WHERE date_taken = :today AND profile_id = :profile_id),
+                (SELECT COUNT(*) FROM reminders WHERE active = 1 AND profile_id = :profile_id),
+                (SELECT COALESCE(days, 0) FROM current_streak),
+                (SELECT version FROM table_versions WHERE table_name = 'medicine_records'),
+                (SELECT version FROM table_versions WHERE table_name = 'reminders')
+        ''', {"profile_id": profile_id, "today": today})
+        return self.cursor.fetchone()
+    
+    def get_streak_summary(self, profile_id, today):
+        """Current streak, longest streak and every streak as (start, end, days).
+
+        Gaps and islands: consecutive day numbers minus their row number are
+        constant within a run, so grouping by that difference yields each
+        streak. It reads record_days, one row per logged day, so its cost
+        does not depend on how many records there are. No log yet today does
+        not end the current streak.
+        """
+        self.cursor.execute('''
+            WITH islands AS (
+                SELECT day, day - ROW_NUMBER() OVER (ORDER BY day) AS island
+                FROM record_days
+                WHERE profile_id = ?
+            )
+            SELECT date(MIN(day) + 0.5), date(MAX(day) + 0.5), COUNT(*),
+                   CAST(julianday(?) AS INTEGER) - MAX(day)
+            FROM islands
+            GROUP BY island
+            ORDER BY MIN(day)
+        ''', (profile_id, today))
+        rows = self.cursor.fetchall()
+        intervals = [(start, end, length) for start, end, length, _ in rows]
+        longest = max((length for _, _, length in intervals), default=0)
+        
+        # Days since the last streak ended: 0 if today is logged, 1 if yesterday
+        current = rows[-1][2] if rows and rows[-1][3] in (0, 1) else 0
+        return current, longest, intervals
     
     # Reminder operations
-    def add_reminder(self, profile_id, medicine_name, dosage, schedule_type, time_schedule, days_schedule=""):
+    def add_reminder(self, profile_id, medicine_name, dosage, schedule_type, time_schedule, days_schedule="", rrule=None):
+        if rrule is None:
+            rrule = rule_from_legacy(schedule_type, time_schedule, days_schedule).to_string()
         self.cursor.execute('''
-            INSERT INTO reminders (profile_id, medicine_name, dosage, schedule_type, time_schedule, days_schedule)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (profile_id, medicine_name, dosage, schedule_type, time_schedule, days_schedule))
+            INSERT INTO reminders (profile_id, medicine_name, dosage, schedule_type, time_schedule, days_schedule, rrule)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (profile_id, medicine_name, dosage, schedule_type, time_schedule, days_schedule, rrule))
+        self.conn.commit()
+    
+    def migrate_reminder_rules(self):
+        """Add the rrule column to older databases and convert legacy schedules"""
+        self.cursor.execute('PRAGMA table_info(reminders)')
+        if 'rrule' not in [row[1] for row in self.cursor.fetchall()]:
+            self.cursor.execute('ALTER TABLE reminders ADD COLUMN rrule TEXT')
+        
+        self.cursor.execute('''
+            SELECT id, schedule_type, time_schedule, days_schedule, last_reminded
+            FROM reminders WHERE rrule IS NULL
+        ''')
+        updates = [
+            (rule_from_legacy(schedule_type, times, days, last_reminded).to_string(), reminder_id)
+            for reminder_id, schedule_type, times, days, last_reminded in self.cursor.fetchall()
+        ]
+        if updates:
+            self.cursor.executemany('UPDATE reminders SET rrule = ? WHERE id = ?', updates)
         self.conn.commit()
     
+    def init_record_days(self):
+        """Create the record_days table (day numbers per profile) and its triggers.
+
+        Streaks only need to know which days have a log, so this keeps one
+        row per profile and day instead of scanning every record.
+        """
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'record_days'")
+        exists = self.cursor.fetchone() is not None
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS record_days (
+                profile_id INTEGER NOT NULL,
+                day INTEGER NOT NULL,
+                PRIMARY KEY (profile_id, day)
+            ) WITHOUT ROWID
+        ''')
+        
+        add_day = '''
+            INSERT OR IGNORE INTO record_days (profile_id, day)
+            SELECT NEW.profile_id, CAST(julianday(NEW.date_taken) AS INTEGER)
+            WHERE NEW.completed = 1 AND julianday(NEW.date_taken) IS NOT NULL;
+        '''
+        remove_day = '''
+            DELETE FROM record_days
+            WHERE profile_id = OLD.profile_id AND day = CAST(julianday(OLD.date_taken) AS INTEGER)
+                AND NOT EXISTS (
+                    SELECT 1 FROM medicine_records
+                    WHERE profile_id = OLD.profile_id AND date_taken = OLD.date_taken AND completed = 1
+                );
+        '''
+        self.cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS record_days_insert AFTER INSERT ON medicine_records
+            BEGIN {add_day} END
+        ''')
+        self.cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS record_days_delete AFTER DELETE ON medicine_records
+            BEGIN {remove_day} END
+        ''')
+        self.cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS record_days_update
+            AFTER UPDATE OF profile_id, date_taken, completed ON medicine_records
+            BEGIN {remove_day} {add_day} END
+        ''')
+        
+        if not exists:
+            self.cursor.execute('''
+                INSERT OR IGNORE INTO record_days (profile_id, day)
+                SELECT profile_id, CAST(julianday(date_taken) AS INTEGER)
+                FROM medicine_records
+                WHERE completed = 1 AND julianday(date_taken) IS NOT NULL
+            ''')
+    
     def get_active_reminders(self, profile_id):
         self.cursor.execute(
             'SELECT * FROM reminders WHERE active = 1 AND profile_id = ?',
@@ -226,6 +528,17 @@ class Database:
         )
         return self.cursor.fetchone()[0]
     
+    def get_change_token(self):
+        """Cheap token that changes whenever any connection writes to the database"""
+        self.cursor.execute('PRAGMA data_version')
+        return (self.conn.total_changes, self.cursor.fetchone()[0])
+    
+    def get_table_version(self, table_name):
+        """Counter bumped on every write to a table listed in VERSIONED_TABLES"""
+        self.cursor.execute('SELECT version FROM table_versions WHERE table_name = ?', (table_name,))
+        row = self.cursor.fetchone()
+        return row[0] if row else 0
+    
     def update_reminder_snooze(self, reminder_id, snooze_until):
         self.cursor.execute('UPDATE reminders SET snoozed_until = ? WHERE id = ?', (snooze_until, reminder_id))
         self.conn.commit()
@@ -234,10 +547,197 @@ class Database:
         self.cursor.execute('UPDATE reminders SET last_reminded = ? WHERE id = ?', (timestamp, reminder_id))
         self.conn.commit()
     
+    def commit_reminder_tick(self, occurrences, refires, expired_snoozes, now_stamp):
+        """Claim due occurrences and persist one evaluation tick in a single transaction.
+
+        occurrences holds (reminder_id, occurrence_ts) pairs that are due now;
+        each is claimed in reminder_fires with an indexed insert-or-ignore, so
+        an occurrence fires at most once no matter how often it is evaluated
+        or how many processes evaluate it. refires holds snoozed occurrences
+        whose snooze ran out. expired_snoozes holds reminder ids whose
+        reminder-level snooze ran out; they are only cleared if still expired
+        at commit time, so a snooze set meanwhile is never lost.
+
+        Returns the (reminder_id, occurrence_ts) pairs that should be notified.
+        """
+        claimed = []
+        with self.conn:
+            for reminder_id, occurrence_ts in occurrences:
+                self.cursor.execute('''
+                    INSERT OR IGNORE INTO reminder_fires (reminder_id, occurrence_ts, fired_at)
+                    VALUES (?, ?, ?)
+                ''', (reminder_id, occurrence_ts, now_stamp))
+                if self.cursor.rowcount == 1:
+                    claimed.append((reminder_id, occurrence_ts))
+            for reminder_id, occurrence_ts in refires:
+                self.cursor.execute('''
+                    UPDATE reminder_fires SET status = 'fired', snoozed_until = NULL, fired_at = ?
+                    WHERE reminder_id = ? AND occurrence_ts = ? AND status = 'snoozed'
+                ''', (now_stamp, reminder_id, occurrence_ts))
+                if self.cursor.rowcount == 1:
+                    claimed.append((reminder_id, occurrence_ts))
+            if claimed:
+                self.cursor.executemany(
+                    'UPDATE reminders SET last_reminded = ? WHERE id = ?',
+                    [(f"{occurrence_ts}:00", reminder_id) for reminder_id, occurrence_ts in claimed]
+                )
+            if expired_snoozes:
+                self.cursor.executemany(
+                    'UPDATE reminders SET snoozed_until = NULL WHERE id = ? AND snoozed_until <= ?',
+                    [(reminder_id, now_stamp) for reminder_id in expired_snoozes]
+                )
+        return claimed
+    
+    def get_due_snoozed_fires(self, profile_id, now_stamp):
+        """Snoozed occurrences whose snooze has run out"""
+        self.cursor.execute('''
+            SELECT f.reminder_id, f.occurrence_ts, r.medicine_name, r.dosage
+            FROM reminder_fires f
+            JOIN reminders r ON r.id = f.reminder_id
+            WHERE f.status = 'snoozed' AND f.snoozed_until <= ? AND r.profile_id = ? AND r.active = 1
+        ''', (now_stamp, profile_id))
+        return self.cursor.fetchall()
+    
+    def get_next_fire_snooze(self, profile_id):
+        """Earliest time a snoozed occurrence should ring again (or None)"""
+        self.cursor.execute('''
+            SELECT MIN(f.snoozed_until)
+            FROM reminder_fires f
+            JOIN reminders r ON r.id = f.reminder_id
+            WHERE f.status = 'snoozed' AND r.profile_id = ? AND r.active = 1
+        ''', (profile_id,))
+        return self.cursor.fetchone()[0]
+    
+    def record_fire_responses(self, responses, responded_at):
+        """Record how occurrences were answered.
+
+        responses holds (status, snoozed_until, reminder_id, occurrence_ts) rows,
+        with status "dismissed", "logged" or "snoozed".
+        """
+        with self.conn:
+            self.cursor.executemany('''
+                UPDATE reminder_fires SET status = ?, snoozed_until = ?, responded_at = ?
+                WHERE reminder_id = ? AND occurrence_ts = ?
+            ''', [(status, until, responded_at, reminder_id, ts) for status, until, reminder_id, ts in responses])
+    
     def delete_reminder(self, reminder_id):
         self.cursor.execute('UPDATE reminders SET active = 0 WHERE id = ?', (reminder_id,))
+        # Doses that have not come due yet are no longer expected
+        self.cursor.execute('''
+            DELETE FROM scheduled_doses
+            WHERE reminder_id = ? AND status = 'pending' AND scheduled_date >= ?
+        ''', (reminder_id, datetime.now().strftime("%Y-%m-%d")))
         self.conn.commit()
     
+    # Scheduled dose ledger
+    def get_ledger_reminders(self, profile_id):
+        """Active reminders with their ledger anchor and expansion horizon"""
+        self.cursor.execute('''
+            SELECT r.id, r.medicine_name, r.dosage, r.rrule, s.expanded_through
+            FROM reminders r
+            LEFT JOIN dose_ledger_state s ON s.reminder_id = r.id
+            WHERE r.active = 1 AND r.profile_id = ?
+        ''', (profile_id,))
+        return self.cursor.fetchall()
+    
+    def add_scheduled_doses(self, doses, ledger_states):
+        """Insert expanded doses and advance ledger horizons in one transaction"""
+        with self.conn:
+            self.cursor.executemany('''
+                INSERT OR IGNORE INTO scheduled_doses
+                (profile_id, reminder_id, medicine_name, dosage, scheduled_date, scheduled_time)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', doses)
+            self.cursor.executemany('''
+                INSERT INTO dose_ledger_state (reminder_id, anchor_date, expanded_through)
+                VALUES (?, ?, ?)
+                ON CONFLICT(reminder_id) DO UPDATE SET expanded_through = excluded.expanded_through
+            ''', ledger_states)
+    
+    def get_dose_match_candidates(self, profile_id, through_date, early_minutes, late_minutes):
+        """Pending or missed doses paired with unclaimed records inside the
+        tolerance window. A missed dose is included so that a record logged
+        afterwards (with a time inside its window) still settles it.
+
+        Rows are (dose_id, record_id, offset_minutes) ordered by closeness,
+        where a negative offset means the record was logged early.
+        """
+        self.cursor.execute('''
+            SELECT dose_id, record_id, offset_minutes FROM (
+                SELECT d.id AS dose_id, r.id AS record_id,
+                       (julianday(r.date_taken || ' ' || r.time_taken)
+                        - julianday(d.scheduled_date || ' ' || d.scheduled_time)) * 1440 AS offset_minutes
+                FROM scheduled_doses d
+                JOIN medicine_records r
+                  ON r.profile_id = d.profile_id
+                 AND r.medicine_name = d.medicine_name COLLATE NOCASE
+                 AND r.date_taken BETWEEN date(d.scheduled_date, '-1 day') AND date(d.scheduled_date, '+1 day')
+                WHERE d.profile_id = ? AND d.status IN ('pending', 'missed') AND d.scheduled_date <= ?
+                  AND r.completed = 1
+                  AND NOT EXISTS (SELECT 1 FROM scheduled_doses c WHERE c.record_id = r.id)
+            )
+            WHERE offset_minutes BETWEEN ? AND ?
+            ORDER BY ABS(offset_minutes)
+        ''', (profile_id, through_date, -early_minutes, late_minutes))
+        return self.cursor.fetchall()
+    
+    def resolve_scheduled_doses(self, matches, profile_id, missed_before):
+        """Apply dose matches and mark unmatched overdue doses as missed.
+
+        matches holds (status, record_id, dose_id) rows; missed_before is a
+        "YYYY-MM-DD HH:MM" cutoff after which a pending dose can no longer match.
+        """
+        with self.conn:
+            self.cursor.executemany(
+                'UPDATE scheduled_doses SET status = ?, record_id = ? WHERE id = ?',
+                matches
+            )
+            self.cursor.execute('''
+                UPDATE scheduled_doses SET status = 'missed'
+                WHERE profile_id = ? AND status = 'pending'
+                  AND scheduled_date <= ?
+                  AND scheduled_date || ' ' || scheduled_time < ?
+            ''', (profile_id, missed_before[:10], missed_before))
+    
+    def get_dose_status_counts(self, profile_id, cutoff_date, through_date):
+        """Count scheduled doses per status ("taken", "late", "missed", "pending")"""
+        self.cursor.execute('''
+            SELECT status, COUNT(*)
+            FROM scheduled_doses
+            WHERE profile_id = ? AND scheduled_date >= ? AND scheduled_date <= ?
+            GROUP BY status
+        ''', (profile_id, cutoff_date, through_date))
+        return dict(self.cursor.fetchall())
+    
+    # Analytics exports (one row per point, loaded once into columns)
+    def get_record_points(self, profile_ids, start_date, end_date):
+        """(day offset from start_date, minute of day or -1, medicine name) per logged dose"""
+        placeholders = ", ".join("?" * len(profile_ids))
+        self.cursor.execute(f'''
+            SELECT CAST(julianday(date_taken) - julianday(?) AS INTEGER),
+                   CASE WHEN time_taken GLOB '[01][0-9]:[0-5][0-9]' OR time_taken GLOB '2[0-3]:[0-5][0-9]'
+                        THEN CAST(substr(time_taken, 1, 2) AS INTEGER) * 60 + CAST(substr(time_taken, 4, 2) AS INTEGER)
+                        ELSE -1 END,
+                   medicine_name
+            FROM medicine_records
+            WHERE profile_id IN ({placeholders}) AND date_taken >= ? AND date_taken <= ?
+                AND completed = 1 AND julianday(date_taken) IS NOT NULL
+        ''', (start_date, *profile_ids, start_date, end_date))
+        return self.cursor.fetchall()
+    
+    def get_scheduled_dose_points(self, profile_ids, start_date, end_date):
+        """(day offset from start_date, medicine name, 1 if taken) per resolved scheduled dose"""
+        placeholders = ", ".join("?" * len(profile_ids))
+        self.cursor.execute(f'''
+            SELECT CAST(julianday(scheduled_date) - julianday(?) AS INTEGER),
+                   medicine_name,
+                   status IN ('taken', 'late')
+            FROM scheduled_doses
+            WHERE profile_id IN ({placeholders}) AND scheduled_date >= ? AND scheduled_date <= ?
+                AND status != 'pending'
+        ''', (start_date, *profile_ids, start_date, end_date))
+        return self.cursor.fetchall()
+    
     # Medicine library operations
     def get_medicine_suggestions(self, profile_id, limit=20):
         self.cursor.execute(
@@ -264,7 +764,18 @@ class Database:
             ORDER BY usage_count DESC, last_used DESC LIMIT ?
         ''', (profile_id, limit))
         return self.cursor.fetchall()
-    
+
+    def search_medicines(self, profile_id, query, limit=5):
+        """(medicine_name, common_dosage) rows whose name contains `query`
+        (case-insensitive), names starting with it first, then most used"""
+        self.cursor.execute('''
+            SELECT medicine_name, common_dosage FROM medicine_library
+            WHERE profile_id = ? AND instr(lower(medicine_name), lower(?)) > 0
+            ORDER BY instr(lower(medicine_name), lower(?)) = 1 DESC, usage_count DESC, last_used DESC
+            LIMIT ?
+        ''', (profile_id, query, query, limit))
+        return self.cursor.fetchall()
+
     # Emergency contacts
     def get_all_emergency_contacts(self):
         self.cursor.execute('SELECT * FROM emergency_contacts ORDER BY priority, contact_type, contact_name')
@@ -293,6 +804,14 @@ class Database:
         ''', (cutoff_date, profile_id, limit))
         return self.cursor.fetchall()
     
+    def get_first_record_date(self, profile_id):
+        """Date of the profile's earliest record (an index seek), or None"""
+        self.cursor.execute(
+            'SELECT MIN(date_taken) FROM medicine_records WHERE profile_id = ?',
+            (profile_id,)
+        )
+        return self.cursor.fetchone()[0]
+    
     def get_adherence_stats(self, profile_id, cutoff_date):
         self.cursor.execute('''
             SELECT COUNT(DISTINCT date_taken) 
@@ -370,14 +889,16 @@ class Database:
         # Create new profile
         self.cursor.execute("""
             INSERT INTO user_profiles
-            (profile_name, age, gender, profile_color, avatar_emoji)
-            VALUES (?, ?, ?, ?, ?)
+            (profile_name, age, gender, profile_color, avatar_emoji, alarm_tone, alarm_escalate)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
         """, (
             profile["profile_name"] + " (Restored)",
             profile["age"],
             profile["gender"],
             profile["profile_color"],
-            profile["avatar_emoji"]
+            profile["avatar_emoji"],
+            profile.get("alarm_tone"),
+            profile.get("alarm_escalate")
         ))
         new_profile_id = self.cursor.lastrowid
 
@@ -400,4 +921,6 @@ class Database:
         restore("medicine_library", data["medicine_library"])
 
         self.conn.commit()
+        # Backups taken before recurrence rules existed carry no rrule
+        self.migrate_reminder_rules()
         return new_profile_id
\ No newline at end of file
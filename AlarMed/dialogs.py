@@ -0,0 +1,173 @@
+"""
+AlarMed - Dialog Manager
+Pooled info, error, confirm and custom-content dialogs, shown one at a time
+"""
+
+from collections import deque
+
+from kivy.clock import Clock
+
+DANGER_COLOR = [0.85, 0.33, 0.31, 1]
+
+INFO = ("alert", ("flat",))
+CONFIRM = ("alert", ("raised", "flat"))
+
+
+class DialogManager:
+    """Opens the app's dialogs from a pool of reusable MDDialog instances.
+
+    An MDDialog lays out its buttons and content once, in its constructor,
+    so a dialog of each shape is kept and reused. The shapes are info/error
+    (one button), confirm (two buttons) and custom (content plus buttons).
+    The title, text, content, button labels and callbacks are set before
+    each open. All of them are dropped once the dialog has faded out, so
+    callbacks never keep a dismissed dialog (or its content) alive.
+
+    Requests made while a dialog is open are queued and shown in order.
+    Pass over=True to open a dialog straight away on top of the current one,
+    e.g. a validation error inside a custom dialog, or a due-medicine alert.
+    """
+
+    def __init__(self):
+        self._idle = {}  # pool key -> dialogs ready for reuse
+        self._shown = []  # open (or fading out) dialogs, most recent last
+        self._queue = deque()  # (pool key, spec) waiting for the open ones to close
+        self.created = 0
+        self.reused = 0
+
+    def info(self, title, text, on_ok=None, button="OK", over=False):
+        """Message with one button; on_ok() runs after it closes"""
+        self._request(INFO, {
+            "title": title,
+            "text": text,
+            "buttons": [(button, on_ok, None)],
+            "auto_close": True,
+            "auto_dismiss": True,
+        }, over)
+
+    def error(self, text, title="Error", on_ok=None, over=False):
+        self.info(title, text, on_ok=on_ok, over=over)
+
+    def confirm(self, title, text, on_confirm, confirm_text="OK", cancel_text="CANCEL", danger=False, over=False):
+        """Two-button question; on_confirm() runs after it closes"""
+        self._request(CONFIRM, {
+            "title": title,
+            "text": text,
+            "buttons": [(confirm_text, on_confirm, DANGER_COLOR if danger else None), (cancel_text, None, None)],
+            "auto_close": True,
+            "auto_dismiss": True,
+        }, over)
+
+    def custom(self, title, content, buttons, auto_dismiss=True, over=False):
+        """Show `content` with buttons [(text, callback, "raised" or "flat"), ...].
+
+        A callback gets the dialog and closes it itself with dismiss(), so it
+        can keep the dialog open (e.g. on invalid input); a None callback
+        just closes it. Returns the dialog if it opened now, None if queued.
+        """
+        key = ("custom", tuple(style for text, callback, style in buttons))
+        return self._request(key, {
+            "title": title,
+            "content": content,
+            "buttons": [(text, callback, None) for text, callback, style in buttons],
+            "auto_close": False,
+            "auto_dismiss": auto_dismiss,
+        }, over)
+
+    def prewarm(self):
+        """Build the common dialogs ahead of their first use"""
+        for key in (INFO, CONFIRM):
+            if not self._idle.get(key):
+                self._idle.setdefault(key, []).append(self._create(key))
+
+    def _request(self, key, spec, over):
+        if self._shown and not over:
+            self._queue.append((key, spec))
+            return None
+        return self._open(key, spec)
+
+    def _open(self, key, spec):
+        idle = self._idle.get(key)
+        if idle:
+            dialog = idle.pop()
+            self.reused += 1
+        else:
+            dialog = self._create(key)
+
+        dialog.title = spec["title"]
+        if "content" in spec:
+            holder, content = dialog.content_cls, spec["content"]
+            holder.add_widget(content)
+            holder.height = content.height
+            dialog.content_uid = content.fbind("height", holder.setter("height"))
+        else:
+            dialog.text = spec["text"]
+        for button, default_color, (text, callback, color) in zip(dialog.buttons, dialog.default_colors, spec["buttons"]):
+            button.text = text
+            button.md_bg_color = color or default_color
+        dialog.actions = [callback for text, callback, color in spec["buttons"]]
+        dialog.auto_close = spec["auto_close"]
+        dialog.auto_dismiss = spec["auto_dismiss"]
+
+        self._shown.append(dialog)
+        dialog.open()
+        return dialog
+
+    def _create(self, key):
+        from kivymd.uix.boxlayout import MDBoxLayout
+        from kivymd.uix.button import MDFlatButton, MDRaisedButton
+        from kivymd.uix.dialog import MDDialog
+
+        kind, styles = key
+        buttons = [MDRaisedButton() if style == "raised" else MDFlatButton() for style in styles]
+        if kind == "custom":
+            holder = MDBoxLayout(orientation="vertical", size_hint_y=None)
+            dialog = MDDialog(title=" ", type="custom", content_cls=holder, buttons=buttons)
+            holder.bind(height=lambda *args: dialog.update_height())
+        else:
+            dialog = MDDialog(title=" ", text=" ", buttons=buttons)
+
+        dialog.pool_key = key
+        dialog.default_colors = [button.md_bg_color for button in buttons]  # None: theme colour
+        dialog.actions = []
+        dialog.content_uid = None
+        for index, button in enumerate(buttons):
+            button.bind(on_release=lambda x, index=index: self._press(dialog, index))
+        # A dismissed dialog stays on screen while it fades out; it can be
+        # reused once the fade has finished and it is off the window
+        dialog.bind(_anim_alpha=self._on_fade)
+        self.created += 1
+        return dialog
+
+    def _press(self, dialog, index):
+        action = dialog.actions[index] if index < len(dialog.actions) else None
+        if dialog.auto_close:
+            dialog.dismiss()
+            if action:
+                action()
+        elif action:
+            action(dialog)
+        else:
+            dialog.dismiss()
+
+    def _on_fade(self, dialog, value):
+        if value == 0 and dialog in self._shown:
+            # ModalView takes the dialog off the window in its own handler
+            Clock.schedule_once(lambda dt: self._release(dialog))
+
+    def _release(self, dialog):
+        if dialog._is_open or dialog not in self._shown:
+            return
+        self._shown.remove(dialog)
+        dialog.actions = []
+        holder = dialog.content_cls
+        if holder is not None:
+            for content in holder.children[:]:
+                if dialog.content_uid is not None:
+                    content.unbind_uid("height", dialog.content_uid)
+                holder.remove_widget(content)
+            dialog.content_uid = None
+        self._idle.setdefault(dialog.pool_key, []).append(dialog)
+
+        if self._queue and not self._shown:
+            self._open(*self._queue.popleft())
@@ -0,0 +1,102 @@
+"""
+AlarMed - Dose Ledger
+Expands reminder schedules into scheduled doses and matches them to records
+"""
+
+from datetime import datetime, timedelta
+
+from config import DOSE_LEDGER_WINDOW_DAYS, DOSE_ON_TIME_TOLERANCE, DOSE_LATE_TOLERANCE
+from recurrence import compile_rule, floor_minute
+from time_source import system_clock
+
+
+class DoseLedger:
+    def __init__(self, database, window_days=DOSE_LEDGER_WINDOW_DAYS,
+                 on_time_minutes=DOSE_ON_TIME_TOLERANCE, late_minutes=DOSE_LATE_TOLERANCE,
+                 clock=system_clock):
+        self.db = database
+        self.clock = clock
+        self.window_days = window_days
+        self.on_time_minutes = on_time_minutes
+        self.late_minutes = late_minutes
+
+    def with_database(self, database):
+        """The same ledger on another connection, e.g. a background worker's"""
+        return DoseLedger(database, self.window_days, self.on_time_minutes, self.late_minutes, self.clock)
+
+    def refresh(self, profile_id, now=None):
+        """Bring the ledger up to date: expand ahead, then match records"""
+        now = now or self.clock.now()
+        self.expand(profile_id, now)
+        self.match(profile_id, now)
+
+    def expand(self, profile_id, now=None):
+        """Expand every active reminder up to the rolling window horizon.
+
+        Each reminder continues from where its last expansion stopped, so
+        only newly covered days are generated, and everything is written in
+        a single transaction.
+        """
+        now = now or self.clock.now()
+        today = now.date()
+        horizon = today + timedelta(days=self.window_days)
+
+        doses = []
+        ledger_states = []
+        for reminder_id, medicine, dosage, rrule, expanded_through in self.db.get_ledger_reminders(profile_id):
+            if not rrule:
+                continue
+            if expanded_through:
+                day = datetime.strptime(expanded_through, "%Y-%m-%d").date() + timedelta(days=1)
+                window_start = datetime(day.year, day.month, day.day)
+            else:
+                # A new reminder starts now: slots earlier today were never
+                # due, so they must not be written (and then marked missed)
+                day = today
+                window_start = floor_minute(now)
+            if day > horizon:
+                continue
+
+            rule = compile_rule(rrule)
+            window_end = datetime(horizon.year, horizon.month, horizon.day) + timedelta(days=1)
+            for occurrence in rule.occurrences_between(window_start, window_end):
+                doses.append((
+                    profile_id, reminder_id, medicine, dosage,
+                    occurrence.strftime("%Y-%m-%d"), occurrence.strftime("%H:%M"),
+                ))
+
+            ledger_states.append(
+                (reminder_id, rule.start_date.strftime("%Y-%m-%d"), horizon.strftime("%Y-%m-%d"))
+            )
+
+        if ledger_states:
+            self.db.add_scheduled_doses(doses, ledger_states)
+        return len(doses)
+
+    def match(self, profile_id, now=None):
+        """Match pending doses to logged records and settle overdue ones.
+
+        Candidate pairs come from one join ordered by closeness; each dose and
+        each record is claimed at most once, nearest pair first. Missed doses
+        are candidates too, so a record logged late for a time inside a
+        dose's window turns it into taken or late.
+        """
+        now = now or self.clock.now()
+        candidates = self.db.get_dose_match_candidates(
+            profile_id, now.strftime("%Y-%m-%d"), self.on_time_minutes, self.late_minutes
+        )
+
+        matched_doses = set()
+        matched_records = set()
+        matches = []
+        for dose_id, record_id, offset in candidates:
+            if dose_id in matched_doses or record_id in matched_records:
+                continue
+            matched_doses.add(dose_id)
+            matched_records.add(record_id)
+            status = "taken" if abs(offset) <= self.on_time_minutes else "late"
+            matches.append((status, record_id, dose_id))
+
+        missed_before = (now - timedelta(minutes=self.late_minutes)).strftime("%Y-%m-%d %H:%M")
+        self.db.resolve_scheduled_doses(matches, profile_id, missed_before)
+        return len(matches)
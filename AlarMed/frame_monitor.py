@@ -0,0 +1,205 @@
+"""
+AlarMed - Frame Monitor
+Debug-mode frame timing: slow frames per screen and the method that caused them
+
+Off unless ALARMED_FRAME_MONITOR is set when the app starts:
+    ALARMED_FRAME_MONITOR=1 python main.py             # print the report on exit
+    ALARMED_FRAME_MONITOR=frames.json python main.py   # also write it as JSON
+
+Compare two reports with benchmarks/compare_frames.py.
+"""
+
+import functools
+import json
+import os
+import time
+
+from config import FRAME_HISTOGRAM_BUCKETS_MS, FRAME_JANK_THRESHOLD_MS
+
+MONITOR_ENV = "ALARMED_FRAME_MONITOR"
+REPORT_SLOWEST = 20
+# A longer gap between frames means the app was paused, not a slow frame
+SUSPEND_GAP_MS = 5000
+
+
+class FrameMonitor:
+    """Measures the time between frames with a Clock callback that runs on
+    every frame, and keeps a histogram of frame times per screen.
+
+    Methods decorated with @traced report how long each call took. A frame
+    over `threshold_ms` is blamed on the longest traced call made during it
+    ("untraced" if there was none, e.g. layout or drawing).
+    """
+
+    def __init__(self, output=None, threshold_ms=FRAME_JANK_THRESHOLD_MS,
+                 buckets_ms=FRAME_HISTOGRAM_BUCKETS_MS, clock=time.perf_counter):
+        self.output = output
+        self.threshold_ms = threshold_ms
+        self.buckets_ms = list(buckets_ms)
+        self.clock = clock
+        self.screens = {}  # screen -> {"frames", "slow", "total_ms", "max_ms", "histogram"}
+        self.methods = {}  # method -> {"calls", "total_ms", "max_ms", "slow_frames"}
+        self.slowest = []  # (frame_ms, screen, method, method_ms, at_s), slowest first
+        self.started = None
+        self._last = None
+        self._calls = []  # (method, ms) traced during the current frame
+        self._event = None
+        self._get_screen = None
+
+    def start(self, get_screen):
+        """Start timing frames; get_screen() names the screen on show"""
+        from kivy.clock import Clock
+
+        self._get_screen = get_screen
+        self.started = self._last = self.clock()
+        self._event = Clock.schedule_interval(self._on_frame, 0)
+        return self
+
+    def stop(self):
+        """Stop timing and report"""
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+        report = self.report()
+        self.print_report(report)
+        if self.output:
+            with open(self.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=4)
+        return report
+
+    def record_call(self, method, ms):
+        self._calls.append((method, ms))
+        stats = self.methods.setdefault(method, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "slow_frames": 0})
+        stats["calls"] += 1
+        stats["total_ms"] += ms
+        stats["max_ms"] = max(stats["max_ms"], ms)
+
+    def _on_frame(self, dt):
+        now = self.clock()
+        frame_ms = (now - self._last) * 1000
+        self._last = now
+        calls, self._calls = self._calls, []
+        if frame_ms > SUSPEND_GAP_MS:
+            return
+        try:
+            screen = self._get_screen() or "none"
+        except Exception:
+            screen = "none"
+        self.record_frame(screen, frame_ms, calls, now - self.started)
+
+    def record_frame(self, screen, frame_ms, calls=(), at_s=0.0):
+        stats = self.screens.get(screen)
+        if stats is None:
+            stats = self.screens[screen] = {
+                "frames": 0, "slow": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "histogram": [0] * (len(self.buckets_ms) + 1),
+            }
+        stats["frames"] += 1
+        stats["total_ms"] += frame_ms
+        stats["max_ms"] = max(stats["max_ms"], frame_ms)
+        stats["histogram"][self._bucket(frame_ms)] += 1
+        if frame_ms <= self.threshold_ms:
+            return
+
+        stats["slow"] += 1
+        method, method_ms = max(calls, key=lambda call: call[1]) if calls else ("untraced", 0.0)
+        if method in self.methods:
+            self.methods[method]["slow_frames"] += 1
+        self.slowest.append((frame_ms, screen, method, method_ms, at_s))
+        self.slowest.sort(reverse=True)
+        del self.slowest[REPORT_SLOWEST:]
+
+    def _bucket(self, frame_ms):
+        for index, bound in enumerate(self.buckets_ms):
+            if frame_ms <= bound:
+                return index
+        return len(self.buckets_ms)
+
+    def bucket_labels(self):
+        return [f"<={bound}" for bound in self.buckets_ms] + [f">{self.buckets_ms[-1]}"]
+
+    def report(self):
+        labels = self.bucket_labels()
+        frames = sum(stats["frames"] for stats in self.screens.values())
+        return {
+            "threshold_ms": self.threshold_ms,
+            "duration_s": round(self.clock() - self.started, 1) if self.started is not None else 0.0,
+            "frames": frames,
+            "slow_frames": sum(stats["slow"] for stats in self.screens.values()),
+            "screens": {
+                screen: {
+                    "frames": stats["frames"],
+                    "slow_frames": stats["slow"],
+                    "mean_ms": round(stats["total_ms"] / stats["frames"], 2),
+                    "max_ms": round(stats["max_ms"], 1),
+                    "histogram_ms": dict(zip(labels, stats["histogram"])),
+                }
+                for screen, stats in sorted(self.screens.items())
+            },
+            "methods": {
+                method: {
+                    "calls": stats["calls"],
+                    "mean_ms": round(stats["total_ms"] / stats["calls"], 2),
+                    "max_ms": round(stats["max_ms"], 1),
+                    "slow_frames": stats["slow_frames"],
+                }
+                for method, stats in sorted(self.methods.items())
+            },
+            "slowest": [
+                {"ms": round(frame_ms, 1), "screen": screen, "method": method,
+                 "method_ms": round(method_ms, 1), "at_s": round(at_s, 1)}
+                for frame_ms, screen, method, method_ms, at_s in self.slowest
+            ],
+        }
+
+    def print_report(self, report):
+        print(
+            f"Frames: {report['frames']} in {report['duration_s']:.0f}s, "
+            f"{report['slow_frames']} over {report['threshold_ms']}ms"
+        )
+        for screen, stats in report["screens"].items():
+            histogram = " ".join(f"{label}:{count}" for label, count in stats["histogram_ms"].items() if count)
+            print(f"  {screen:<16} {stats['slow_frames']:4d} slow, max {stats['max_ms']:.0f}ms  {histogram}")
+        for entry in report["slowest"]:
+            print(f"  {entry['ms']:7.1f}ms on {entry['screen']}: {entry['method']} ({entry['method_ms']:.1f}ms)")
+
+
+_monitor = None
+
+
+def install(get_screen):
+    """Start monitoring if ALARMED_FRAME_MONITOR is set; call from on_start"""
+    global _monitor
+    setting = os.environ.get(MONITOR_ENV)
+    if _monitor is None and setting:
+        _monitor = FrameMonitor(output=None if setting == "1" else setting).start(get_screen)
+    return _monitor
+
+
+def uninstall():
+    """Stop monitoring and write the report"""
+    global _monitor
+    monitor, _monitor = _monitor, None
+    if monitor is not None:
+        try:
+            monitor.stop()
+        except Exception as e:
+            print(f"Error writing frame report: {e}")
+
+
+def traced(method):
+    """Decorator: time calls to `method` so slow frames can be blamed on it"""
+    name = method.__qualname__
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        monitor = _monitor
+        if monitor is None:
+            return method(*args, **kwargs)
+        started = monitor.clock()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            monitor.record_call(name, (monitor.clock() - started) * 1000)
+
+    return wrapper
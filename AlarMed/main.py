@@ -3,67 +3,87 @@ AlarMed - Medicine Reminder & Tracker
 Clean, responsive UI with Poppins font
 """
 
+import startup_trace
+
+# Must run before Kivy is imported; a no-op unless ALARMED_STARTUP_TRACE is set
+startup_trace.install()
+
 from kivymd.app import MDApp
 from kivymd.uix.screenmanager import MDScreenManager
-from kivymd.uix.dialog import MDDialog
-from kivymd.uix.button import MDFlatButton
+from kivy.clock import Clock
 from kivy.core.window import Window
 from kivy.core.text import LabelBase
+import os
 
+from audio import DEFAULT_RINGTONE, get_audio_manager
+from background import BackgroundWorker
+from config import ALARM_ESCALATE, ALARM_TONE, REMINDER_METRICS_FILE, REMINDER_METRICS_WINDOW_HOURS
 from database import Database
+from dialogs import DialogManager
+from dose_ledger import DoseLedger
+import frame_monitor
+from reminder_metrics import ReminderMetrics
 from reminders_checker import ReminderChecker
+from time_source import system_clock
+from timeline import DoseTimeline
 
-# Import all screens
-from screens.profile_selector import ProfileSelectorScreen
-from screens.dashboard import DashboardScreen
-from screens.record_medicine import RecordMedicineScreen
-from screens.reminders import RemindersScreen
-from screens.history import HistoryScreen
-from screens.reports import ReportsScreen
-from screens.emergency import EmergencyScreen
-from screens.backup import BackupScreen
+# Screens are imported and built on first navigation
+from screens.registry import ScreenRegistry
 
 Window.size = (450, 800)
 
-LabelBase.register(
-    name="Poppins",
-    fn_regular="fonts/Poppins-Regular.ttf",
-    fn_bold="fonts/Poppins-Bold.ttf",
-)
+# Only the regular and bold weights are used (and packaged, see buildozer.spec)
+with startup_trace.asset("font", "Poppins"):
+    LabelBase.register(
+        name="Poppins",
+        fn_regular="fonts/Poppins-Regular.ttf",
+        fn_bold="fonts/Poppins-Bold.ttf",
+    )
 
 
 class AlarMedApp(MDApp):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.clock = system_clock
         self.db = Database()
+        self.background = BackgroundWorker(self.db.path)
+        # Quick lookups while typing; kept apart so they never wait on a report
+        self.lookups = BackgroundWorker(self.db.path, name="lookups")
+        # The one configured ledger; workers use it on their own connection
+        self.dose_ledger = DoseLedger(self.db, clock=self.clock)
+        self.dose_timeline = DoseTimeline(self.db, clock=self.clock)
         self.reminder_checker = None
+        self.reminder_metrics = None
 
         self.current_profile_id = None
         self.current_profile_name = None
         self.current_profile_color = None
         self.current_profile_avatar = None
 
-        self._dialog = None
+        self.dialogs = DialogManager()
 
     def build(self):
         self.theme_cls.primary_palette = "Blue"
         self.theme_cls.theme_style = "Dark"
         self.theme_cls.material_style = "M3"
 
+        # Empty until on_start picks the first screen
         self.sm = MDScreenManager()
-        self.sm.add_widget(ProfileSelectorScreen(name="profile_selector"))
-        self.sm.add_widget(DashboardScreen(name="dashboard"))
-        self.sm.add_widget(RecordMedicineScreen(name="record"))
-        self.sm.add_widget(RemindersScreen(name="reminders"))
-        self.sm.add_widget(HistoryScreen(name="history"))
-        self.sm.add_widget(ReportsScreen(name="reports"))
-        self.sm.add_widget(EmergencyScreen(name="emergency"))
-        self.sm.add_widget(BackupScreen(name="backup"))
+        self.screen_registry = ScreenRegistry(self.sm)
         return self.sm
 
     def on_start(self):
+        Window.bind(on_flip=self.on_first_frame)
+        # Frame timing for debugging; a no-op unless ALARMED_FRAME_MONITOR is set
+        frame_monitor.install(lambda: self.sm.current)
+        self.reminder_metrics = ReminderMetrics(
+            path=os.path.join(self.user_data_dir, REMINDER_METRICS_FILE),
+            window_hours=REMINDER_METRICS_WINDOW_HOURS,
+            clock=self.clock,
+        )
+
         if self.db.get_profile_count() == 0:
-            self.sm.current = "profile_selector"
+            self.go_to_screen("profile_selector")
             return
 
         last_profile = self.db.get_last_active_profile()
@@ -71,7 +91,16 @@ class AlarMedApp(MDApp):
             pid, name, age, gender, color, avatar, *_ = last_profile
             self.load_profile(pid, name, color, avatar)
         else:
-            self.sm.current = "profile_selector"
+            self.go_to_screen("profile_selector")
+
+    def on_first_frame(self, *args):
+        Window.unbind(on_flip=self.on_first_frame)
+        startup_trace.first_frame()
+        # Decode the alarm tone in the background before any reminder fires
+        checker = self.reminder_checker
+        get_audio_manager().preload(checker.tone_path if checker else ALARM_TONE or DEFAULT_RINGTONE)
+        # Build the common dialogs once the app has settled
+        Clock.schedule_once(lambda dt: self.dialogs.prewarm(), 1)
 
     def load_profile(self, profile_id, name, color, avatar):
         self.current_profile_id = profile_id
@@ -84,30 +113,40 @@ class AlarMedApp(MDApp):
         if self.reminder_checker:
             self.reminder_checker.stop()
 
-        self.reminder_checker = ReminderChecker(self.db, profile_id)
+        # Each profile may have its own tone and alarm mode
+        tone, escalate = self.db.get_profile_alarm_settings(profile_id)
+        self.reminder_checker = ReminderChecker(
+            self.db, profile_id,
+            tone_path=tone or ALARM_TONE or DEFAULT_RINGTONE,
+            escalate=ALARM_ESCALATE if escalate is None else bool(escalate),
+            clock=self.clock, metrics=self.reminder_metrics,
+        )
         self.reminder_checker.start()
 
-        self.sm.current = "dashboard"
+        self.go_to_screen("dashboard")
 
     def switch_profile(self):
         if self.reminder_checker:
             self.reminder_checker.stop()
-        self.sm.current = "profile_selector"
+        self.go_to_screen("profile_selector")
 
     def go_to_screen(self, screen_name: str):
-        self.sm.current = screen_name
+        self.screen_registry.show(screen_name)
 
     def show_dialog(self, title, message):
-        dialog = MDDialog(
-            title=title,
-            text=message,
-            buttons=[MDFlatButton(text="OK", on_release=lambda x: dialog.dismiss())],
-        )
-        dialog.open()
+        self.dialogs.info(title, message)
 
     def on_stop(self):
+        frame_monitor.uninstall()
+        self.background.stop()
+        self.lookups.stop()
         if self.reminder_checker:
             self.reminder_checker.stop()
+        if self.reminder_metrics:
+            try:
+                self.reminder_metrics.export()
+            except Exception as e:
+                print(f"Error saving reminder metrics: {e}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+"""
+AlarMed - Notifier Backends
+Pluggable outputs for the headless reminder scheduler
+"""
+
+import logging
+import shutil
+import subprocess
+
+
+def format_due_reminder(due):
+    """One-line description of a due reminder"""
+    return f"{due.time} - {due.medicine} ({due.dosage})"
+
+
+class Notifier:
+    """Base class: receives the list of reminders due in one evaluation"""
+
+    def notify(self, due_reminders):
+        raise NotImplementedError
+
+
+class ConsoleNotifier(Notifier):
+    def notify(self, due_reminders):
+        for due in due_reminders:
+            print(f"[AlarMed] Time to take: {format_due_reminder(due)}", flush=True)
+
+
+class LogNotifier(Notifier):
+    def __init__(self, logger_name="alarmed.reminders"):
+        self.logger = logging.getLogger(logger_name)
+
+    def notify(self, due_reminders):
+        for due in due_reminders:
+            self.logger.info("Reminder due: %s", format_due_reminder(due))
+
+
+class DesktopNotifier(Notifier):
+    """Linux desktop notifications through notify-send (libnotify)"""
+
+    def __init__(self):
+        self.command = shutil.which("notify-send")
+
+    def notify(self, due_reminders):
+        if not self.command:
+            return
+        body = "\n".join(format_due_reminder(due) for due in due_reminders)
+        subprocess.run(
+            [self.command, "--urgency=critical", "AlarMed - Medication Reminder", body],
+            check=False,
+        )
+
+
+# Backends selectable by name from the daemon command line
+NOTIFIERS = {
+    "console": ConsoleNotifier,
+    "log": LogNotifier,
+    "desktop": DesktopNotifier,
+}
@@ -0,0 +1,300 @@
+"""
+AlarMed - Recurrence Rules
+Compiled RRULE-style schedules with fast next-occurrence lookups
+
+Rules are stored in the reminders table as text, for example:
+    FREQ=DAILY;INTERVAL=2;DTSTART=20260101T0000;BYTIME=0800,2000
+    FREQ=WEEKLY;DTSTART=20260101T0000;BYDAY=MO,WE,FR;BYTIME=0900
+    FREQ=MONTHLY;DTSTART=20260101T0000;BYMONTHDAY=1,15;BYTIME=0900
+    FREQ=HOURLY;INTERVAL=8;DTSTART=20260101T0600;UNTIL=20260110T2359
+"""
+
+from bisect import bisect_left
+from calendar import monthrange
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from timecodec import parse_24h
+
+FREQUENCIES = ("HOURLY", "DAILY", "WEEKLY", "MONTHLY")
+WEEKDAY_CODES = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+STAMP_FORMAT = "%Y%m%dT%H%M"
+
+# Schedule types offered when creating a reminder
+SCHEDULE_TYPES = ["Daily", "Specific Days", "Every Other Day", "Weekly", "Monthly", "Every N Hours"]
+
+ONE_MINUTE = timedelta(minutes=1)
+MAX_MONTH_SCAN = 120
+
+
+def floor_minute(moment):
+    return moment.replace(second=0, microsecond=0)
+
+
+class Recurrence:
+    """A compiled schedule.
+
+    Day-based rules (DAILY, WEEKLY, MONTHLY) fire at each of `times`
+    (minutes after midnight) on eligible days; HOURLY rules fire every
+    `interval` hours from `start`. Finding the next eligible day is
+    arithmetic on the day/week/month index, and the time of day is a
+    bisect into the sorted times, so each lookup is constant or
+    logarithmic regardless of how far from `start` it is.
+    """
+
+    def __init__(self, freq, start, interval=1, times=(), byday=(), bymonthday=(),
+                 until=None, count=None, exdates=()):
+        if freq not in FREQUENCIES:
+            raise ValueError(f"Unsupported frequency: {freq}")
+        if interval < 1:
+            raise ValueError("Interval must be at least 1")
+
+        self.freq = freq
+        self.interval = interval
+        self.start = floor_minute(start)
+        self.start_date = self.start.date()
+        self.times = sorted(set(times))
+        self.byday = sorted(set(byday)) or [self.start_date.weekday()]
+        self.bymonthday = sorted(set(bymonthday)) or [self.start_date.day]
+        self.exdates = frozenset(floor_minute(d) for d in exdates)
+        self.count = count
+        self.until_arg = until
+        self.until = until
+
+        # Week 0 of a WEEKLY rule starts on the Monday of the start week
+        self._week0 = self.start_date - timedelta(days=self.start_date.weekday())
+
+        # COUNT is compiled into an UNTIL bound once, so lookups stay O(1)
+        if count is not None:
+            if count < 1:
+                raise ValueError("Count must be at least 1")
+            occurrence = self._first_from(self.start)
+            for _ in range(count - 1):
+                if occurrence is None:
+                    break
+                occurrence = self._first_from(occurrence + ONE_MINUTE)
+            if occurrence is not None:
+                self.until = occurrence
+
+    # Lookups
+    def next_after(self, moment):
+        """First occurrence strictly after `moment`, or None"""
+        return self._next_valid(floor_minute(moment) + ONE_MINUTE)
+
+    def next_from(self, moment):
+        """First occurrence at or after `moment`, or None"""
+        return self._next_valid(moment)
+
+    def occurs_at(self, moment):
+        """Whether the rule has an occurrence in the minute of `moment`"""
+        minute = floor_minute(moment)
+        return self._next_valid(minute) == minute
+
+    def occurrences_between(self, start, end):
+        """Occurrences with start <= occurrence < end, in order"""
+        occurrence = self._next_valid(start)
+        while occurrence is not None and occurrence < end:
+            yield occurrence
+            occurrence = self._next_valid(occurrence + ONE_MINUTE)
+
+    def _next_valid(self, moment):
+        occurrence = self._first_from(moment)
+        while occurrence is not None and occurrence in self.exdates:
+            occurrence = self._first_from(occurrence + ONE_MINUTE)
+        return occurrence
+
+    def _first_from(self, moment):
+        """First candidate occurrence >= moment, ignoring exclusions"""
+        if moment < self.start:
+            moment = self.start
+
+        if self.freq == "HOURLY":
+            step = self.interval * 60
+            elapsed = -(-(moment - self.start) // ONE_MINUTE)
+            occurrence = self.start + timedelta(minutes=-(-elapsed // step) * step)
+        else:
+            if not self.times:
+                return None
+            day = moment.date()
+            minute = moment.hour * 60 + moment.minute + (1 if moment.second or moment.microsecond else 0)
+            index = bisect_left(self.times, minute)
+            if index == len(self.times):
+                day += timedelta(days=1)
+                index = 0
+            eligible = self._next_day(day)
+            if eligible is None:
+                return None
+            if eligible != day:
+                index = 0
+            occurrence = datetime(eligible.year, eligible.month, eligible.day) + timedelta(minutes=self.times[index])
+
+        if self.until is not None and occurrence > self.until:
+            return None
+        return occurrence
+
+    def _next_day(self, day):
+        """First eligible day on or after `day`"""
+        if self.freq == "DAILY":
+            offset = (day - self.start_date).days
+            remainder = offset % self.interval
+            return day if remainder == 0 else day + timedelta(days=self.interval - remainder)
+
+        if self.freq == "WEEKLY":
+            weekday = day.weekday()
+            week = (day - self._week0).days // 7
+            if week % self.interval == 0:
+                index = bisect_left(self.byday, weekday)
+                if index < len(self.byday):
+                    return day + timedelta(days=self.byday[index] - weekday)
+                week += 1
+            week += -week % self.interval
+            return self._week0 + timedelta(days=week * 7 + self.byday[0])
+
+        # MONTHLY
+        year, month, from_day = day.year, day.month, day.day
+        month_index = (year - self.start_date.year) * 12 + month - self.start_date.month
+        for _ in range(MAX_MONTH_SCAN):
+            if month_index % self.interval == 0:
+                last_day = monthrange(year, month)[1]
+                month_days = sorted(last_day + d + 1 if d < 0 else d for d in self.bymonthday)
+                for month_day in month_days:
+                    if from_day <= month_day <= last_day:
+                        return day.replace(year=year, month=month, day=month_day)
+                skip = 1
+            else:
+                skip = -month_index % self.interval
+            month_index += skip
+            month += skip
+            year += (month - 1) // 12
+            month = (month - 1) % 12 + 1
+            from_day = 1
+        return None
+
+    # Storage
+    def to_string(self):
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        parts.append(f"DTSTART={self.start.strftime(STAMP_FORMAT)}")
+        if self.freq != "HOURLY":
+            parts.append("BYTIME=" + ",".join(f"{m // 60:02d}{m % 60:02d}" for m in self.times))
+        if self.freq == "WEEKLY":
+            parts.append("BYDAY=" + ",".join(WEEKDAY_CODES[d] for d in self.byday))
+        if self.freq == "MONTHLY":
+            parts.append("BYMONTHDAY=" + ",".join(str(d) for d in self.bymonthday))
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until_arg is not None:
+            parts.append(f"UNTIL={self.until_arg.strftime(STAMP_FORMAT)}")
+        if self.exdates:
+            parts.append("EXDATE=" + ",".join(d.strftime(STAMP_FORMAT) for d in sorted(self.exdates)))
+        return ";".join(parts)
+
+    def __str__(self):
+        return self.to_string()
+
+    @classmethod
+    def parse(cls, text):
+        fields = {}
+        for part in text.strip().split(";"):
+            if not part:
+                continue
+            key, _, value = part.partition("=")
+            fields[key.strip().upper()] = value.strip()
+
+        def stamps(value):
+            return [datetime.strptime(v, STAMP_FORMAT) for v in value.split(",") if v]
+
+        def clock_minutes(value):
+            return [int(v[:2]) * 60 + int(v[2:]) for v in value.split(",") if v]
+
+        return cls(
+            fields.get("FREQ", "DAILY"),
+            datetime.strptime(fields["DTSTART"], STAMP_FORMAT),
+            interval=int(fields.get("INTERVAL", 1)),
+            times=clock_minutes(fields.get("BYTIME", "")),
+            byday=[WEEKDAY_CODES.index(d) for d in fields.get("BYDAY", "").split(",") if d],
+            bymonthday=[int(d) for d in fields.get("BYMONTHDAY", "").split(",") if d],
+            until=stamps(fields["UNTIL"])[0] if fields.get("UNTIL") else None,
+            count=int(fields["COUNT"]) if fields.get("COUNT") else None,
+            exdates=stamps(fields.get("EXDATE", "")),
+        )
+
+
+@lru_cache(maxsize=256)
+def compile_rule(text):
+    """Parse a stored rule once; compiled rules are immutable and shared"""
+    return Recurrence.parse(text)
+
+
+def parse_time_minutes(time_str):
+    """Minutes after midnight for a "HH:MM" string (TimeFormatError is a ValueError)"""
+    return parse_24h(time_str)
+
+
+def parse_weekdays(days_str):
+    """Weekday numbers from "Mon, Wed, Fri" (full names and any case accepted)"""
+    names = [name.lower() for name in DAY_NAMES]
+    weekdays = []
+    for day in (days_str or "").split(","):
+        day = day.strip()[:3].lower()
+        if day in names:
+            weekdays.append(names.index(day))
+    return weekdays
+
+
+def build_rule(schedule_type, times, days="", start=None, every_hours=None, duration_days=None):
+    """Build a rule from the reminder form (or a legacy reminder row).
+
+    times are "HH:MM" strings; days holds weekday names for "Specific Days"
+    or days of the month for "Monthly"; duration_days ends the schedule
+    after that many days ("for 10 days then stop"). The first dose is the
+    first time at or after start (default now).
+    """
+    start = floor_minute(start or datetime.now())
+    start_day = datetime(start.year, start.month, start.day)
+    minutes = []
+    for time_str in times:
+        try:
+            minutes.append(parse_time_minutes(time_str))
+        except ValueError:
+            continue
+
+    until = None
+    if duration_days:
+        until = start_day + timedelta(days=duration_days) - ONE_MINUTE
+
+    if schedule_type == "Every N Hours":
+        # Keep the phase of the first time, from the first dose not before start
+        step = timedelta(hours=every_hours or 8)
+        first = start_day + timedelta(minutes=min(minutes) if minutes else 0)
+        if first < start:
+            first += -(-(start - first) // step) * step
+        return Recurrence("HOURLY", first, interval=every_hours or 8, until=until)
+    # DTSTART keeps the time of day, so no dose falls before the schedule
+    # began; days are still counted from the start day
+    if schedule_type == "Specific Days":
+        return Recurrence("WEEKLY", start, times=minutes, byday=parse_weekdays(days) or range(7), until=until)
+    if schedule_type == "Every Other Day":
+        return Recurrence("DAILY", start, interval=2, times=minutes, until=until)
+    if schedule_type == "Weekly":
+        return Recurrence("WEEKLY", start, times=minutes, until=until)
+    if schedule_type == "Monthly":
+        month_days = [int(d) for d in (days or "").replace(" ", "").split(",") if d.lstrip("-").isdigit()]
+        return Recurrence("MONTHLY", start, times=minutes, bymonthday=month_days, until=until)
+    return Recurrence("DAILY", start, times=minutes, until=until)
+
+
+def rule_from_legacy(schedule_type, time_schedule, days_schedule, last_reminded=None, today=None):
+    """Rule equivalent to a reminder saved before rules existed.
+
+    "Every Other Day" and "Weekly" used to count from the last reminder, so
+    that date becomes the rule's start.
+    """
+    today = today or datetime.now()
+    start = datetime(today.year, today.month, today.day)
+    if last_reminded and schedule_type in ("Every Other Day", "Weekly"):
+        start = datetime.strptime(last_reminded.split()[0], "%Y-%m-%d")
+    times = (time_schedule or "").split(",")
+    return build_rule(schedule_type, times, days_schedule, start=start)
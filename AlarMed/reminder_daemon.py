@@ -0,0 +1,69 @@
+"""
+AlarMed - Headless Reminder Daemon
+Runs the reminder scheduler as a standalone process, without Kivy
+
+Usage:
+    python reminder_daemon.py --db alarmed.db --notifier console --notifier desktop
+"""
+
+import argparse
+import logging
+import sys
+
+from config import DB_NAME
+from database import Database
+from notifiers import NOTIFIERS
+from reminder_engine import ReminderEngine, ReminderScheduler
+from reminder_metrics import ReminderMetrics
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AlarMed headless reminder daemon")
+    parser.add_argument("--db", default=DB_NAME, help="path to the AlarMed database")
+    parser.add_argument("--profile", type=int, help="profile id (defaults to the last active profile)")
+    parser.add_argument(
+        "--notifier",
+        action="append",
+        choices=sorted(NOTIFIERS),
+        help="notifier backend, may be repeated (default: console)",
+    )
+    parser.add_argument("--log-file", help="write log notifier output to this file")
+    parser.add_argument("--metrics-file", help="write a rolling JSON summary of dispatch latency and wakeups")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(
+        filename=args.log_file,
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+
+    db = Database(args.db)
+    profile_id = args.profile
+    if profile_id is None:
+        profile = db.get_last_active_profile()
+        if not profile:
+            print("No profiles found in database", file=sys.stderr)
+            return 1
+        profile_id = profile[0]
+
+    notifiers = [NOTIFIERS[name]() for name in (args.notifier or ["console"])]
+    metrics = ReminderMetrics(path=args.metrics_file) if args.metrics_file else None
+    scheduler = ReminderScheduler(ReminderEngine(db, profile_id), notifiers, metrics)
+    logging.info("Reminder daemon started for profile %s", profile_id)
+
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if metrics:
+            metrics.export()
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
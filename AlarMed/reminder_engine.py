@@ -0,0 +1,218 @@
+"""
+AlarMed - Reminder Engine
+UI-independent reminder evaluation and scheduling (no Kivy imports)
+"""
+
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from recurrence import ONE_MINUTE, compile_rule, floor_minute, rule_from_legacy
+from time_source import system_clock
+
+
+class DueReminder(namedtuple("DueReminder", ["reminder_id", "medicine", "dosage", "time", "date"])):
+    """A reminder occurrence that is due right now"""
+
+    __slots__ = ()
+
+    @property
+    def occurrence_ts(self):
+        """Key of the occurrence in the reminder_fires log"""
+        return f"{self.date} {self.time}"
+
+
+class ReminderEngine:
+    """Decides which reminders fire at a given minute for one profile.
+
+    Each reminder's stored rule is compiled once; the engine remembers the
+    earliest upcoming occurrence (or snooze expiry) and skips minutes before
+    it without touching any rule.
+
+    When the wall clock jumps ahead of real time (a DST change springing
+    forward), occurrences in the skipped wall minutes fire at the first
+    minute after the jump instead of never.
+    """
+
+    def __init__(self, database, profile_id, clock=system_clock):
+        self.db = database
+        self.profile_id = profile_id
+        self.clock = clock
+        self.last_check_time = None
+        self.last_check_timestamp = None
+        self.next_due = None
+        self._reminders = []
+        self._change_token = None
+
+    def active_reminders(self):
+        """Active reminders with their compiled rules, reloaded only after a write"""
+        token = self.db.get_change_token()
+        if token != self._change_token:
+            self._reminders = []
+            for reminder in self.db.get_active_reminders(self.profile_id):
+                rrule = reminder[10] or rule_from_legacy(*reminder[4:7], reminder[8]).to_string()
+                self._reminders.append((reminder, compile_rule(rrule)))
+            self._change_token = token
+            self.next_due = None
+        return self._reminders
+
+    def evaluate(self, now=None):
+        """Return the reminders due at `now`, at most once per minute"""
+        # Real time is only known for the clock's own reading
+        timestamp = self.clock.timestamp() if now is None else None
+        now = now or self.clock.now()
+        minute = floor_minute(now)
+        if self.last_check_time == minute:
+            return []
+        gap_start = self.skipped_minutes_start(minute, timestamp)
+        self.last_check_time = minute
+        self.last_check_timestamp = timestamp
+
+        reminders = self.active_reminders()
+        if self.next_due is not None and minute < self.next_due:
+            return []
+
+        now_stamp = now.strftime("%Y-%m-%d %H:%M:%S")
+        occurrence_ts = minute.strftime("%Y-%m-%d %H:%M")
+        details = {}
+        occurrences = []
+        expired_snoozes = []
+        next_due = None
+        for reminder, rule in reminders:
+            (
+                reminder_id,
+                profile_id,
+                medicine,
+                dosage,
+                schedule_type,
+                times,
+                days,
+                active,
+                last_reminded,
+                snoozed,
+                rrule,
+            ) = reminder
+
+            if snoozed:
+                snooze_time = datetime.strptime(snoozed, "%Y-%m-%d %H:%M:%S")
+                if now < snooze_time:
+                    next_due = min(next_due or snooze_time, snooze_time)
+                    continue
+                expired_snoozes.append(reminder_id)
+
+            if gap_start is not None:
+                # Wall times that never existed; the claim keeps their slot
+                for occurrence in rule.occurrences_between(gap_start, minute):
+                    skipped_ts = occurrence.strftime("%Y-%m-%d %H:%M")
+                    occurrences.append((reminder_id, skipped_ts))
+                    details[(reminder_id, skipped_ts)] = (medicine, dosage)
+
+            if rule.occurs_at(minute):
+                occurrences.append((reminder_id, occurrence_ts))
+                details[(reminder_id, occurrence_ts)] = (medicine, dosage)
+
+            upcoming = rule.next_after(minute)
+            if upcoming is not None:
+                next_due = min(next_due or upcoming, upcoming)
+
+        # Occurrences snoozed from the alert ring again once their snooze ends
+        refires = []
+        for reminder_id, snoozed_ts, medicine, dosage in self.db.get_due_snoozed_fires(self.profile_id, now_stamp):
+            refires.append((reminder_id, snoozed_ts))
+            details[(reminder_id, snoozed_ts)] = (medicine, dosage)
+        next_snooze = self.db.get_next_fire_snooze(self.profile_id)
+        if next_snooze and next_snooze > now_stamp:
+            snooze_time = datetime.strptime(next_snooze, "%Y-%m-%d %H:%M:%S")
+            next_due = min(next_due or snooze_time, snooze_time)
+
+        # Claim and commit before anyone is notified: a crash can drop an
+        # alert but never make the same occurrence fire twice
+        due = []
+        if occurrences or refires or expired_snoozes:
+            claimed = self.db.commit_reminder_tick(occurrences, refires, expired_snoozes, now_stamp)
+            for reminder_id, claimed_ts in claimed:
+                medicine, dosage = details[(reminder_id, claimed_ts)]
+                fire_date, fire_time = claimed_ts.split()
+                due.append(DueReminder(reminder_id, medicine, dosage, fire_time, fire_date))
+        self.next_due = next_due
+        return due
+
+    def skipped_minutes_start(self, minute, timestamp):
+        """First wall minute skipped since the last check, or None.
+
+        Between two checks the wall clock normally moves as far as real time
+        (give or take the minute rounding). Minutes it moved further were
+        never lived through; they are taken to end right before `minute`,
+        which is exact when checks run every minute.
+        """
+        if timestamp is None or self.last_check_timestamp is None or minute <= self.last_check_time:
+            return None
+        skipped = (minute - self.last_check_time) - timedelta(seconds=timestamp - self.last_check_timestamp)
+        if skipped <= ONE_MINUTE:
+            return None
+        # Rounded up: a minute already checked is claimed again, harmlessly
+        return max(self.last_check_time + ONE_MINUTE, minute - ONE_MINUTE * -(-skipped // ONE_MINUTE))
+
+
+class ReminderScheduler:
+    """Runs a ReminderEngine on a sleeping thread and hands due reminders
+    to notifier backends. Wakes once per minute, just after the boundary.
+    """
+
+    def __init__(self, engine, notifiers, metrics=None):
+        self.engine = engine
+        self.notifiers = list(notifiers)
+        self.metrics = metrics  # Optional ReminderMetrics
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Run the scheduler in a background daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def run_forever(self):
+        """Evaluate reminders every minute until stop() is called"""
+        self.tick()
+        while not self._stop_event.wait(self.seconds_until_next_minute(self.engine.clock.now())):
+            self.tick()
+
+    def tick(self, now=None):
+        started = time.perf_counter()
+        try:
+            due = self.engine.evaluate(now)
+        except Exception as e:
+            print(f"Error checking reminders: {e}")
+            due = []
+        if due:
+            if self.metrics:
+                evaluated_at = now or self.engine.clock.now()
+                for item in due:
+                    self.metrics.record_fire(item, evaluated_at)
+            for notifier in self.notifiers:
+                try:
+                    notifier.notify(due)
+                except Exception as e:
+                    print(f"Error in notifier {type(notifier).__name__}: {e}")
+            if self.metrics:
+                # Headless: the notifier dispatch stands in for the dialog
+                self.metrics.mark_dialog_open(due, now or self.engine.clock.now())
+        if self.metrics:
+            self.metrics.record_wakeup(time.perf_counter() - started, now or self.engine.clock.now())
+        return due
+
+    @staticmethod
+    def seconds_until_next_minute(now):
+        next_minute = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Small margin so the wakeup lands inside the new minute
+        return (next_minute - now).total_seconds() + 0.05
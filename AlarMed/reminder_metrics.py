@@ -0,0 +1,129 @@
+"""
+AlarMed - Reminder Metrics
+Dispatch latency and wakeup accounting for the reminder subsystem
+"""
+
+import json
+import math
+import os
+from collections import OrderedDict
+from datetime import datetime
+
+from time_source import system_clock
+
+STAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return None
+    index = max(0, math.ceil(fraction * len(values)) - 1)
+    return values[index]
+
+
+class ReminderMetrics:
+    """Collects, per fired occurrence, when it was scheduled, evaluated,
+    shown and heard, and per hour, how often the checker woke up and how
+    long check_reminders took. summary() is a rolling window; export()
+    writes it as JSON so runs before and after a change can be compared.
+    """
+
+    def __init__(self, path=None, window_hours=24, max_fires=200, clock=system_clock):
+        self.path = path
+        self.clock = clock
+        self.hours = OrderedDict()
+        self.window_hours = window_hours
+        self.fires = OrderedDict()
+        self.max_fires = max_fires
+        self._current_hour = None
+
+    def record_wakeup(self, check_seconds, now=None):
+        now = now or self.clock.now()
+        hour = now.strftime("%Y-%m-%d %H:00")
+        if hour != self._current_hour:
+            # Starting a new hour: publish the finished one
+            if self._current_hour is not None and self.path:
+                self.export()
+            self._current_hour = hour
+        bucket = self.hours.setdefault(hour, {"wakeups": 0, "check_seconds": 0.0})
+        bucket["wakeups"] += 1
+        bucket["check_seconds"] += check_seconds
+        while len(self.hours) > self.window_hours:
+            self.hours.popitem(last=False)
+
+    def record_fire(self, due, evaluated_at=None):
+        key = (due.reminder_id, due.occurrence_ts)
+        self.fires[key] = {
+            "reminder_id": due.reminder_id,
+            "medicine": due.medicine,
+            "scheduled": f"{due.occurrence_ts}:00.000000",
+            "evaluated": (evaluated_at or self.clock.now()).strftime(STAMP_FORMAT),
+            "dialog_open": None,
+            "sound_start": None,
+        }
+        while len(self.fires) > self.max_fires:
+            self.fires.popitem(last=False)
+
+    def mark_dialog_open(self, due_reminders, at=None):
+        self._mark(due_reminders, "dialog_open", at)
+
+    def mark_sound_start(self, due_reminders, at=None):
+        self._mark(due_reminders, "sound_start", at)
+
+    def _mark(self, due_reminders, field, at):
+        stamp = (at or self.clock.now()).strftime(STAMP_FORMAT)
+        for due in due_reminders:
+            fire = self.fires.get((due.reminder_id, due.occurrence_ts))
+            if fire and fire[field] is None:
+                fire[field] = stamp
+
+    def summary(self):
+        latencies = {"evaluated": [], "dialog_open": [], "sound_start": []}
+        for fire in self.fires.values():
+            scheduled = datetime.strptime(fire["scheduled"], STAMP_FORMAT)
+            for field, values in latencies.items():
+                if fire[field]:
+                    moment = datetime.strptime(fire[field], STAMP_FORMAT)
+                    values.append((moment - scheduled).total_seconds() * 1000)
+
+        latency_summary = {}
+        for field, values in latencies.items():
+            values.sort()
+            latency_summary[field] = {
+                "count": len(values),
+                "p50_ms": percentile(values, 0.5),
+                "p95_ms": percentile(values, 0.95),
+                "max_ms": values[-1] if values else None,
+            }
+
+        total_wakeups = sum(b["wakeups"] for b in self.hours.values())
+        total_check = sum(b["check_seconds"] for b in self.hours.values())
+        hour_count = max(1, len(self.hours))
+        return {
+            "generated_at": self.clock.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "window_hours": self.window_hours,
+            "wakeups": total_wakeups,
+            "wakeups_per_hour": total_wakeups / hour_count,
+            "check_ms_per_hour": total_check * 1000 / hour_count,
+            "hours": [
+                {"hour": hour, "wakeups": b["wakeups"], "check_ms": round(b["check_seconds"] * 1000, 3)}
+                for hour, b in self.hours.items()
+            ],
+            "latency": latency_summary,
+            "recent_fires": list(self.fires.values())[-50:],
+        }
+
+    def export(self, path=None):
+        """Write the rolling summary as JSON (atomically replacing the old file)"""
+        path = path or self.path
+        if not path:
+            return None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=4)
+        os.replace(temp_path, path)
+        return path
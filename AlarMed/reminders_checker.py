@@ -1,26 +1,41 @@
 """
 AlarMed - Reminder Checker with Ringtone
+Kivy client of the reminder engine: polls it on the UI clock and shows dialogs
 """
 
+from kivy.app import App
 from kivy.clock import Clock
-from datetime import datetime
-from kivymd.uix.dialog import MDDialog
-from kivymd.uix.button import MDFlatButton
-from kivy.core.audio import SoundLoader
-import os
-
-# Path to your ringtone
-RINGTONE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "ringtone.mp3")
-
-
-class ReminderChecker:
-    def __init__(self, database, profile_id):
+from kivy.metrics import dp
+from datetime import timedelta
+import time
+
+from audio import DEFAULT_RINGTONE, get_audio_manager
+from config import REMINDER_SNOOZE_MINUTES
+from frame_monitor import traced
+from notifiers import Notifier
+from reminder_engine import ReminderEngine
+from time_source import system_clock
+from utils import display_time
+
+
+class ReminderChecker(Notifier):
+    def __init__(self, database, profile_id, tone_path=DEFAULT_RINGTONE, escalate=False,
+                 clock=system_clock, metrics=None):
         self.db = database
         self.profile_id = profile_id
+        self.clock = clock
+        self.engine = ReminderEngine(database, profile_id, clock)
         self.check_event = None
-        self.last_check_time = None
-        self.sound = SoundLoader.load(RINGTONE_PATH)
+        self.tone_path = tone_path
+        self.escalate = escalate
+        self.metrics = metrics  # Optional ReminderMetrics
+        # The tone is decoded after the first frame (see main.py) or, at the
+        # latest, by play_alarm(); never while the app is starting
+        self.audio = get_audio_manager()
         self.current_dialog = None  # Keep reference to the active dialog
+        self.current_content = None  # ...and to its rows container
+        self.pending = {}  # (reminder_id, occurrence_ts) -> DueReminder awaiting an answer
+        self.pending_rows = {}
 
     def start(self):
         # Check every 5 seconds to trigger exactly on the minute
@@ -32,148 +47,156 @@ class ReminderChecker:
             self.check_event.cancel()
             self.check_event = None
 
-    def play_sound(self):
-        if self.sound:
-            self.sound.stop()
-            self.sound.play()
+    def play_sound(self, due_reminders=()):
+        on_start = None
+        if self.metrics and due_reminders:
+            on_start = lambda: self.metrics.mark_sound_start(due_reminders, self.clock.now())
+        self.audio.play_alarm(self.tone_path, repeat=self.escalate, escalate=self.escalate, on_start=on_start)
 
     def stop_sound(self):
-        if self.sound:
-            self.sound.stop()
+        self.audio.stop_alarm()
 
+    @traced
     def check_reminders(self, dt):
+        started = time.perf_counter()
         try:
-            now = datetime.now()
-            current_time = now.strftime("%H:%M")
-            current_date = now.strftime("%Y-%m-%d")
-            current_day = now.strftime("%a")
-
-            if self.last_check_time == current_time:
-                return
-            self.last_check_time = current_time
-
-            reminders = self.db.get_active_reminders(self.profile_id)
-
-            for reminder in reminders:
-                (
-                    reminder_id,
-                    profile_id,
-                    medicine,
-                    dosage,
-                    schedule_type,
-                    times,
-                    days,
-                    active,
-                    last_reminded,
-                    snoozed,
-                ) = reminder
-
-                if snoozed:
-                    snooze_time = datetime.strptime(snoozed, "%Y-%m-%d %H:%M:%S")
-                    if now < snooze_time:
-                        continue
-                    else:
-                        self.db.update_reminder_snooze(reminder_id, None)
-
-                times_list = [t.strip() for t in times.split(",")]
-                for reminder_time in times_list:
-                    if reminder_time != current_time:
-                        continue
-
-                    should_trigger = False
-
-                    if schedule_type == "Daily":
-                        should_trigger = True
-                    elif schedule_type == "Specific Days" and days:
-                        days_list = [d.strip() for d in days.split(",")]
-                        if current_day in days_list:
-                            should_trigger = True
-                    elif schedule_type == "Every Other Day":
-                        if last_reminded:
-                            last_date = datetime.strptime(
-                                last_reminded.split()[0], "%Y-%m-%d"
-                            )
-                            if (now - last_date).days >= 2:
-                                should_trigger = True
-                        else:
-                            should_trigger = True
-                    elif schedule_type == "Weekly":
-                        if last_reminded:
-                            last_date = datetime.strptime(
-                                last_reminded.split()[0], "%Y-%m-%d"
-                            )
-                            if (now - last_date).days >= 7:
-                                should_trigger = True
-                        else:
-                            should_trigger = True
-
-                    if should_trigger:
-                        self.play_sound()
-                        self.show_reminder_notification(medicine, dosage, reminder_time)
-                        self.db.update_reminder_last_reminded(
-                            reminder_id, f"{current_date} {current_time}:00"
-                        )
-
+            due_reminders = self.engine.evaluate()
+            if self.metrics:
+                evaluated_at = self.clock.now()
+                for due in due_reminders:
+                    self.metrics.record_fire(due, evaluated_at)
+            self.notify(due_reminders)
         except Exception as e:
             print(f"Error checking reminders: {e}")
-
-    def show_reminder_notification(self, medicine, dosage, time):
-        from kivy.app import App
-        app = App.get_running_app()
-
-        # Define dialog buttons with sound stopping
-        dismiss_btn = MDFlatButton(
-            text="DISMISS",
-            on_release=lambda x: (self.stop_sound(), self.current_dialog.dismiss())
-        )
-        log_btn = MDFlatButton(
-            text="LOG NOW",
-            on_release=lambda x: (self.stop_sound(), self.current_dialog.dismiss(), self.quick_log(medicine, dosage))
-        )
-
-        self.current_dialog = MDDialog(
-            title="Medication Reminder",
-            text=f"Time to take:\n\n{medicine}\n{dosage}\n\nScheduled for: {self.format_time_ampm(time)}",
-            buttons=[dismiss_btn, log_btn],
+        if self.metrics:
+            self.metrics.record_wakeup(time.perf_counter() - started, self.clock.now())
+
+    def notify(self, due_reminders):
+        """Notifier interface: alert the user about due reminders.
+
+        Everything due in one evaluation (plus anything still unanswered from
+        an earlier one) is shown in a single dialog, and the tone plays once.
+        """
+        if not due_reminders:
+            return
+        for due in due_reminders:
+            key = (due.reminder_id, due.occurrence_ts)
+            if key not in self.pending:
+                self.pending[key] = due
+        self.play_sound(due_reminders)
+        self.show_reminder_notification()
+        if self.metrics:
+            self.metrics.mark_dialog_open(due_reminders, self.clock.now())
+
+    def show_reminder_notification(self):
+        # Imported on the first reminder rather than at startup
+        from kivymd.uix.button import MDFlatButton
+        from kivymd.uix.boxlayout import MDBoxLayout
+        from kivymd.uix.label import MDLabel
+
+        if self.current_dialog:
+            self.current_dialog.dismiss()
+
+        content = MDBoxLayout(orientation="vertical", spacing=dp(8), size_hint_y=None)
+        self.pending_rows = {}
+        for key, due in self.pending.items():
+            row = MDBoxLayout(orientation="vertical", size_hint_y=None, height=dp(96))
+            row.add_widget(
+                MDLabel(
+                    text=f"{due.medicine} - {due.dosage}\n{self.format_time_ampm(due.time)}",
+                    font_style="Body2",
+                )
+            )
+            actions = MDBoxLayout(orientation="horizontal", spacing=dp(5), size_hint_y=None, height=dp(40))
+            actions.add_widget(MDFlatButton(text="LOG", on_release=lambda x, k=key: self.log_pending([k])))
+            actions.add_widget(MDFlatButton(text="SNOOZE", on_release=lambda x, k=key: self.snooze_pending([k])))
+            actions.add_widget(MDFlatButton(text="DISMISS", on_release=lambda x, k=key: self.dismiss_pending([k])))
+            row.add_widget(actions)
+            content.add_widget(row)
+            self.pending_rows[key] = row
+        content.height = len(self.pending_rows) * dp(104)
+
+        # Shown over any open dialog: a due dose should not wait in the queue
+        self.current_content = content
+        self.current_dialog = App.get_running_app().dialogs.custom(
+            "Medication Reminder" if len(self.pending) == 1 else f"{len(self.pending)} Medications Due",
+            content,
+            [
+                ("DISMISS ALL", lambda dialog: self.dismiss_pending(list(self.pending)), "flat"),
+                ("LOG ALL", lambda dialog: self.log_pending(list(self.pending)), "raised"),
+            ],
+            auto_dismiss=False,
+            over=True,
         )
-        self.current_dialog.open()
 
-    def quick_log(self, medicine, dosage):
-        from kivy.app import App
+    def answer_pending(self, keys, status, snoozed_until=None):
+        """Record the answer for each occurrence and remove it from the dialog.
+
+        Returns the answered reminders; the dialog closes once none are left.
+        """
+        answered = [self.pending[key] for key in keys if key in self.pending]
+        if answered:
+            try:
+                self.db.record_fire_responses(
+                    [(status, snoozed_until, due.reminder_id, due.occurrence_ts) for due in answered],
+                    self.clock.now().strftime("%Y-%m-%d %H:%M:%S"),
+                )
+            except Exception as e:
+                print(f"Error recording reminder response: {e}")
+
+        content = self.current_content
+        for key in keys:
+            self.pending.pop(key, None)
+            row = self.pending_rows.pop(key, None)
+            if row and content:
+                content.remove_widget(row)
+
+        if not self.pending:
+            self.stop_sound()
+            if self.current_dialog:
+                self.current_dialog.dismiss()
+            self.current_dialog = None
+            self.current_content = None
+        elif content:
+            # The dialog follows its content's height
+            content.height = len(self.pending_rows) * dp(104)
+        return answered
+
+    def dismiss_pending(self, keys):
+        self.answer_pending(keys, "dismissed")
+
+    def snooze_pending(self, keys):
+        """Ring these occurrences again after the snooze interval"""
+        until = self.clock.now() + timedelta(minutes=REMINDER_SNOOZE_MINUTES)
+        self.answer_pending(keys, "snoozed", until.strftime("%Y-%m-%d %H:%M:%S"))
+
+    def log_pending(self, keys):
+        self.quick_log(self.answer_pending(keys, "logged"))
+
+    def quick_log(self, items):
+        """Log the given due reminders as taken, all in one transaction"""
+        if not items:
+            return
         try:
-            app = App.get_running_app()
-            current_time = datetime.now().strftime("%H:%M")
-            current_date = datetime.now().strftime("%Y-%m-%d")
+            now = self.clock.now()
+            current_time = now.strftime("%H:%M")
+            current_date = now.strftime("%Y-%m-%d")
 
-            app.db.add_medicine_record(
+            self.db.add_medicine_records(
                 self.profile_id,
-                medicine,
-                dosage,
-                current_time,
-                current_date,
-                "Logged from reminder",
+                [
+                    (due.medicine, due.dosage, current_time, current_date, "Logged from reminder")
+                    for due in items
+                ],
             )
 
-            app.db.update_medicine_library(
-                self.profile_id, medicine, dosage, current_date
-            )
-
-            dialog = MDDialog(
-                title="Success",
-                text=f"{medicine} logged successfully!",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: dialog.dismiss())],
-            )
-            dialog.open()
+            if len(items) == 1:
+                text = f"{items[0].medicine} logged successfully!"
+            else:
+                text = f"{len(items)} medicines logged successfully!"
+            App.get_running_app().dialogs.info("Success", text)
         except Exception as e:
             print(f"Error logging medicine: {e}")
 
     def format_time_ampm(self, time_24):
-        try:
-            hour, minute = map(int, time_24.split(":"))
-            ampm = "AM" if hour < 12 else "PM"
-            hour_12 = hour if hour <= 12 else hour - 12
-            if hour_12 == 0:
-                hour_12 = 12
-            return f"{hour_12:02d}:{minute:02d} {ampm}"
-        except Exception:
-            return time_24
+        return display_time(time_24)
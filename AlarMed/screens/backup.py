@@ -10,7 +10,6 @@ from kivy.metrics import dp
 from kivy.uix.filechooser import FileChooserListView
 from kivy.uix.popup import Popup
 
-from datetime import datetime
 import os
 
 
@@ -144,7 +143,7 @@ class BackupScreen(MDScreen):
             return
 
         safe_name = (app.current_profile_name or "profile").strip().replace(" ", "_")
-        filename = f"alarmed_backup_{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        filename = f"alarmed_backup_{safe_name}_{app.clock.now().strftime('%Y%m%d_%H%M%S')}.json"
         backup_dir = self._get_backup_dir()
         full_path = os.path.join(backup_dir, filename)
 
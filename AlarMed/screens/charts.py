@@ -0,0 +1,237 @@
+"""
+AlarMed - Charts
+Bar chart, sparkline and calendar heatmap, each one widget drawn on its canvas
+"""
+
+import math
+from datetime import date
+
+from kivy.clock import Clock
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, Ellipse, Line, Rectangle
+from kivy.metrics import dp, sp
+from kivy.uix.widget import Widget
+
+TRACK_COLOR = [0.2, 0.2, 0.2, 1]
+BAR_COLOR = [0.12, 0.42, 0.65, 1]
+TEXT_COLOR = [1, 1, 1, 1]
+SECONDARY_TEXT_COLOR = [1, 1, 1, 0.6]
+# Heatmap shades: no doses, then quarters of the busiest day's count
+HEATMAP_COLORS = [
+    [0.16, 0.16, 0.16, 1],
+    [0.08, 0.24, 0.37, 1],
+    [0.1, 0.33, 0.51, 1],
+    [0.12, 0.42, 0.65, 1],
+    [0.3, 0.62, 0.9, 1],
+]
+
+
+def _same(old, new):
+    # NaN (a day with nothing scheduled) equals NaN here
+    return old == new or (old != old and new != new)
+
+
+class Chart(Widget):
+    """Base for the charts: a single widget whose canvas holds every mark.
+
+    set_data() takes precomputed values, one per mark. Instructions are only
+    created when the number of marks changes; otherwise just the marks whose
+    value changed are redrawn, and a move or resize repositions the marks
+    without creating anything. Redraws are batched to at most one per frame.
+
+    Subclasses implement create_marks() (add the instructions for
+    len(self.values) marks to the canvas) and place(index) (draw one mark
+    from its value and the widget's geometry).
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.values = []
+        self._changed = set()
+        self._full = True
+        self._trigger = Clock.create_trigger(self._redraw)
+        self.bind(pos=self.invalidate, size=self.invalidate)
+
+    def set_data(self, values):
+        values = list(values)
+        if len(values) != len(self.values):
+            self.values = values
+            self.canvas.clear()
+            self.create_marks()
+            self.invalidate()
+            return
+        self._changed.update(
+            index for index, (old, new) in enumerate(zip(self.values, values)) if not _same(old, new)
+        )
+        self.values = values
+        if self._changed or self._full:
+            self._trigger()
+
+    def invalidate(self, *args):
+        """Redraw every mark on the next frame"""
+        self._full = True
+        self._trigger()
+
+    def _redraw(self, dt):
+        indexes = range(len(self.values)) if self._full else sorted(self._changed)
+        self._full = False
+        self._changed = set()
+        self.draw(indexes)
+
+    def draw(self, indexes):
+        for index in indexes:
+            self.place(index)
+
+    def create_marks(self):
+        raise NotImplementedError
+
+    def place(self, index):
+        raise NotImplementedError
+
+
+class BarChart(Chart):
+    """Horizontal bars, one row per (label, value, value text), each a label
+    line over a bar scaled to the largest value"""
+
+    row_height = dp(55)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.marks = []
+        self.scale = 0
+        self._textures = {}
+
+    def set_data(self, rows):
+        rows = list(rows)
+        scale = max((value for label, value, text in rows), default=0)
+        if scale != self.scale:
+            self.scale = scale
+            self._full = True
+        super().set_data(rows)
+        self.height = self.row_height * len(rows)
+        # Textures for labels no longer shown can go
+        shown = {text for label, value, value_text in rows for text in (label, value_text)}
+        self._textures = {text: texture for text, texture in self._textures.items() if text in shown}
+
+    def create_marks(self):
+        self.marks = []
+        with self.canvas:
+            for _ in self.values:
+                Color(*TEXT_COLOR)
+                label = Rectangle()
+                Color(*SECONDARY_TEXT_COLOR)
+                value_label = Rectangle()
+                Color(*TRACK_COLOR)
+                track = Rectangle()
+                Color(*BAR_COLOR)
+                bar = Rectangle()
+                self.marks.append((label, value_label, track, bar))
+
+    def texture(self, text, font_size):
+        texture = self._textures.get(text)
+        if texture is None:
+            core = CoreLabel(text=text, font_size=font_size)
+            core.refresh()
+            texture = self._textures[text] = core.texture
+        return texture
+
+    def place(self, index):
+        label_text, value, value_text = self.values[index]
+        label, value_label, track, bar = self.marks[index]
+        top = self.top - index * self.row_height
+
+        label.texture = self.texture(label_text, sp(15))
+        label.size = label.texture.size
+        label.pos = (self.x, top - dp(25) + (dp(25) - label.size[1]) / 2)
+
+        value_label.texture = self.texture(value_text, sp(14))
+        value_label.size = value_label.texture.size
+        value_label.pos = (self.right - value_label.size[0], top - dp(25) + (dp(25) - value_label.size[1]) / 2)
+
+        track.pos = (self.x, top - dp(36))
+        track.size = (self.width, dp(6))
+        bar.pos = track.pos
+        bar.size = (self.width * (value / self.scale if self.scale else 0), dp(6))
+
+
+class Sparkline(Chart):
+    """A line through rates between 0 and 1, one point per day, with the
+    last value marked. NaN values (nothing scheduled) are skipped."""
+
+    def create_marks(self):
+        with self.canvas:
+            Color(*TRACK_COLOR)
+            self.baseline = Line(width=dp(1))
+            Color(*BAR_COLOR)
+            self.line = Line(width=dp(1.5))
+            self.dot = Ellipse(size=(0, 0))
+
+    def draw(self, indexes):
+        # One polyline through every point: any change redraws it whole
+        if not self.values:
+            return
+        step = self.width / max(1, len(self.values) - 1)
+        points = []
+        for day, value in enumerate(self.values):
+            if value == value:
+                points.extend((self.x + day * step, self.y + self.height * min(1.0, max(0.0, value))))
+        self.baseline.points = (self.x, self.y, self.right, self.y)
+        self.line.points = points
+        radius = dp(3)
+        if points:
+            self.dot.pos = (points[-2] - radius, points[-1] - radius)
+            self.dot.size = (radius * 2, radius * 2)
+        else:
+            self.dot.size = (0, 0)
+
+
+class CalendarHeatmap(Chart):
+    """Daily counts as a grid of squares, a column per week (Monday at the
+    top), shaded by quarters of the busiest day. A year is 365 rectangles
+    on one canvas."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.start = None
+        self.top_count = 0
+        self.cells = []
+        self.size_per_cell = 0
+
+    def set_data(self, counts, start=None):
+        """counts[i] is the count for the day `start` + i days (a date)"""
+        counts = list(counts)
+        top_count = max(counts, default=0)
+        if start != self.start or top_count != self.top_count:
+            self.start, self.top_count = start, top_count
+            self._full = True
+        super().set_data(counts)
+
+    def create_marks(self):
+        self.cells = []
+        with self.canvas:
+            for _ in self.values:
+                color = Color(*HEATMAP_COLORS[0])
+                self.cells.append((color, Rectangle()))
+
+    @property
+    def offset(self):
+        return self.start.weekday() if isinstance(self.start, date) else 0
+
+    def draw(self, indexes):
+        weeks = (len(self.values) + self.offset + 6) // 7
+        self.size_per_cell = min(self.width / max(1, weeks), self.height / 7)
+        super().draw(indexes)
+
+    def place(self, index):
+        color, rect = self.cells[index]
+        count = self.values[index]
+        level = 0
+        if count > 0 and self.top_count > 0:
+            level = min(4, max(1, math.ceil(4 * count / self.top_count)))
+        color.rgba = HEATMAP_COLORS[level]
+
+        size = self.size_per_cell
+        week, weekday = divmod(index + self.offset, 7)
+        gap = max(1.0, size * 0.15)
+        rect.pos = (self.x + week * size, self.top - (weekday + 1) * size)
+        rect.size = (size - gap, size - gap)
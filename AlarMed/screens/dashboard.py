@@ -13,19 +13,18 @@ from kivymd.uix.scrollview import MDScrollView
 from kivymd.uix.toolbar import MDTopAppBar
 from kivy.metrics import dp
 from kivy.app import App
-from datetime import datetime
 
-from utils import (
-    get_greeting,
-    calculate_streak,
-    get_upcoming_doses_from_reminders,
-    time_to_ampm,
-)
+from frame_monitor import traced
+from timecodec import format_ampm
+from utils import get_greeting
+
+UPCOMING_LIMIT = 5
 
 
 class DashboardScreen(MDScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.data_key = None
         self.build_ui()
 
     def on_enter(self):
@@ -53,6 +52,7 @@ class DashboardScreen(MDScreen):
         self.content_layout.bind(minimum_height=self.content_layout.setter("height"))
         scroll.add_widget(self.content_layout)
         main_layout.add_widget(scroll)
+        self.build_profile_sections()
 
         nav_layout = MDBoxLayout(
             orientation="horizontal",
@@ -80,32 +80,28 @@ class DashboardScreen(MDScreen):
 
         main_layout.add_widget(nav_layout)
         self.add_widget(main_layout)
-        self.refresh_dashboard()
 
-    def refresh_dashboard(self):
+    def build_profile_sections(self):
+        """Create every dashboard widget once; refresh only updates their values"""
         app = App.get_running_app()
-        self.content_layout.clear_widgets()
 
-        if not app.current_profile_id or not app.current_profile_name:
-            placeholder_card = MDCard(
-                orientation="vertical",
-                padding=dp(25),
-                size_hint_y=None,
-                height=dp(150),
-                md_bg_color=[0.1, 0.1, 0.1, 1],
-                radius=[15, 15, 15, 15],
-            )
-            placeholder_label = MDLabel(
+        self.placeholder_card = MDCard(
+            orientation="vertical",
+            padding=dp(25),
+            size_hint_y=None,
+            height=dp(150),
+            md_bg_color=[0.1, 0.1, 0.1, 1],
+            radius=[15, 15, 15, 15],
+        )
+        self.placeholder_card.add_widget(
+            MDLabel(
                 text="Select or create a profile to view your dashboard.",
                 halign="center",
                 theme_text_color="Secondary",
                 font_style="Body2",
             )
-            placeholder_card.add_widget(placeholder_label)
-            self.content_layout.add_widget(placeholder_card)
-            return
+        )
 
-        greeting = get_greeting()
         greeting_card = MDCard(
             orientation="vertical",
             padding=dp(25),
@@ -114,59 +110,40 @@ class DashboardScreen(MDScreen):
             md_bg_color=[0.12, 0.42, 0.65, 1],
             radius=[20, 20, 20, 20],
         )
-        greeting_card.add_widget(
-            MDLabel(text=greeting, font_style="H5", size_hint_y=None, height=dp(35))
-        )
-        greeting_card.add_widget(
-            MDLabel(
-                text=app.current_profile_name,
-                font_style="H6",
-                size_hint_y=None,
-                height=dp(30),
-            )
-        )
-        greeting_card.add_widget(
-            MDLabel(
-                text=datetime.now().strftime("%A, %B %d, %Y"),
-                font_style="Caption",
-                theme_text_color="Secondary",
-                size_hint_y=None,
-                height=dp(20),
-            )
+        self.greeting_label = MDLabel(font_style="H5", size_hint_y=None, height=dp(35))
+        self.profile_name_label = MDLabel(font_style="H6", size_hint_y=None, height=dp(30))
+        self.date_label = MDLabel(
+            font_style="Caption",
+            theme_text_color="Secondary",
+            size_hint_y=None,
+            height=dp(20),
         )
-        self.content_layout.add_widget(greeting_card)
-
-        today_date_str = datetime.now().strftime("%Y-%m-%d")
-        today_count = app.db.get_today_medicine_count(app.current_profile_id, today_date_str)
-        reminder_count = app.db.get_active_reminder_count(app.current_profile_id)
-        dates = app.db.get_streak_dates(app.current_profile_id)
-        streak = calculate_streak(dates)
-        reminders = app.db.get_active_reminders(app.current_profile_id)
-        upcoming = get_upcoming_doses_from_reminders(reminders)
+        greeting_card.add_widget(self.greeting_label)
+        greeting_card.add_widget(self.profile_name_label)
+        greeting_card.add_widget(self.date_label)
 
         stats_grid = MDGridLayout(cols=2, spacing=dp(15), size_hint_y=None, height=dp(200))
+        self.stat_labels = {}
         stats = [
-            ("Today's Medicines", str(today_count), [0.12, 0.42, 0.65, 1]),
-            ("Active Reminders", str(reminder_count), [0.18, 0.65, 0.45, 1]),
-            ("Day Streak", f"{streak} days", [0.94, 0.68, 0.31, 1]),
-            ("Upcoming", str(len(upcoming)), [0.85, 0.33, 0.31, 1]),
+            ("today", "Today's Medicines", [0.12, 0.42, 0.65, 1]),
+            ("reminders", "Active Reminders", [0.18, 0.65, 0.45, 1]),
+            ("streak", "Day Streak", [0.94, 0.68, 0.31, 1]),
+            ("upcoming", "Upcoming", [0.85, 0.33, 0.31, 1]),
         ]
-        for title, value, color in stats:
+        for key, title, color in stats:
             stat_card = MDCard(
                 orientation="vertical",
                 padding=dp(20),
                 md_bg_color=color,
                 radius=[15, 15, 15, 15],
             )
-            stat_card.add_widget(
-                MDLabel(
-                    text=value,
-                    font_style="H4",
-                    halign="center",
-                    size_hint_y=None,
-                    height=dp(50),
-                )
+            self.stat_labels[key] = MDLabel(
+                font_style="H4",
+                halign="center",
+                size_hint_y=None,
+                height=dp(50),
             )
+            stat_card.add_widget(self.stat_labels[key])
             stat_card.add_widget(
                 MDLabel(
                     text=title,
@@ -177,12 +154,8 @@ class DashboardScreen(MDScreen):
                 )
             )
             stats_grid.add_widget(stat_card)
-        self.content_layout.add_widget(stats_grid)
-
-        self.content_layout.add_widget(
-            MDLabel(text="Quick Actions", font_style="H6", size_hint_y=None, height=dp(40))
-        )
 
+        quick_actions_title = MDLabel(text="Quick Actions", font_style="H6", size_hint_y=None, height=dp(40))
         quick_actions_grid = MDGridLayout(cols=2, spacing=dp(15), size_hint_y=None, height=dp(330))
         actions = [
             ("Log Medicine", "record", [0.12, 0.42, 0.65, 1]),
@@ -202,13 +175,8 @@ class DashboardScreen(MDScreen):
             )
             quick_actions_grid.add_widget(action_btn)
 
-        self.content_layout.add_widget(quick_actions_grid)
-
-        self.content_layout.add_widget(
-            MDLabel(text="Upcoming Doses", font_style="H6", size_hint_y=None, height=dp(40))
-        )
-
-        upcoming_card = MDCard(
+        upcoming_title = MDLabel(text="Upcoming Doses", font_style="H6", size_hint_y=None, height=dp(40))
+        self.upcoming_card = MDCard(
             orientation="vertical",
             padding=dp(20),
             spacing=dp(10),
@@ -217,36 +185,107 @@ class DashboardScreen(MDScreen):
             radius=[15, 15, 15, 15],
         )
 
+        # A fixed pool of dose rows, shown or hidden as the list changes
+        self.upcoming_rows = []
+        for _ in range(UPCOMING_LIMIT):
+            dose_layout = MDBoxLayout(
+                orientation="vertical",
+                size_hint_y=None,
+                height=dp(70),
+                spacing=dp(8),
+            )
+            dose_layout.time_label = MDLabel(font_style="Caption", theme_text_color="Secondary")
+            dose_layout.name_label = MDLabel(font_style="Body1")
+            dose_layout.add_widget(dose_layout.time_label)
+            dose_layout.add_widget(dose_layout.name_label)
+            dose_layout.add_widget(
+                MDBoxLayout(size_hint_y=None, height=dp(1), md_bg_color=[0.2, 0.2, 0.2, 1])
+            )
+            self.upcoming_rows.append(dose_layout)
+        self.no_upcoming_label = MDLabel(
+            text="No doses in the next 24 hours",
+            halign="center",
+            theme_text_color="Secondary",
+            font_style="Body2",
+        )
+
+        self.profile_sections = [
+            greeting_card,
+            stats_grid,
+            quick_actions_title,
+            quick_actions_grid,
+            upcoming_title,
+            self.upcoming_card,
+        ]
+
+    def show_sections(self, sections):
+        if self.content_layout.children[::-1] != sections:
+            self.content_layout.clear_widgets()
+            for section in sections:
+                self.content_layout.add_widget(section)
+
+    @traced
+    def refresh_dashboard(self):
+        """Update the dashboard values in place.
+
+        All figures come from one snapshot query. Nothing is touched when
+        they, the profile, the greeting and the upcoming doses are unchanged
+        since the last refresh.
+        """
+        app = App.get_running_app()
+
+        if not app.current_profile_id or not app.current_profile_name:
+            self.show_sections([self.placeholder_card])
+            self.data_key = None
+            return
+
+        now = app.clock.now()
+        profile_id = app.current_profile_id
+        today_date_str = now.strftime("%Y-%m-%d")
+        upcoming_count = app.dose_timeline.count(profile_id, now)
+        upcoming = app.dose_timeline.upcoming(profile_id, UPCOMING_LIMIT, now)
+        snapshot = app.db.get_dashboard_snapshot(profile_id, today_date_str)
+        data_key = (
+            profile_id,
+            app.current_profile_name,
+            today_date_str,
+            get_greeting(now),
+            snapshot,
+            upcoming_count,
+            tuple(upcoming),
+        )
+        self.show_sections(self.profile_sections)
+        if data_key == self.data_key:
+            return
+        self.data_key = data_key
+
+        self.greeting_label.text = data_key[3]
+        self.profile_name_label.text = app.current_profile_name
+        self.date_label.text = now.strftime("%A, %B %d, %Y")
+
+        today_count, reminder_count, streak = snapshot[:3]
+        self.stat_labels["today"].text = str(today_count)
+        self.stat_labels["reminders"].text = str(reminder_count)
+        self.stat_labels["streak"].text = f"{streak} days"
+        self.stat_labels["upcoming"].text = str(upcoming_count)
+
+        self.upcoming_card.clear_widgets()
         if upcoming:
-            for med_name, dose, time_str in upcoming[:5]:
-                dose_layout = MDBoxLayout(
-                    orientation="vertical",
-                    size_hint_y=None,
-                    height=dp(70),
-                    spacing=dp(8),
-                )
-                dose_layout.add_widget(
-                    MDLabel(
-                        text=time_to_ampm(time_str),
-                        font_style="Caption",
-                        theme_text_color="Secondary",
-                    )
-                )
-                dose_layout.add_widget(MDLabel(text=f"{med_name} - {dose}", font_style="Body1"))
-                dose_layout.add_widget(
-                    MDBoxLayout(size_hint_y=None, height=dp(1), md_bg_color=[0.2, 0.2, 0.2, 1])
-                )
-                upcoming_card.add_widget(dose_layout)
-            upcoming_card.height = dp(30 + len(upcoming[:5]) * 80)
+            for dose_layout, (dose_time, reminder_id, med_name, dose) in zip(self.upcoming_rows, upcoming):
+                dose_layout.time_label.text = self.format_upcoming_time(dose_time, now)
+                dose_layout.name_label.text = f"{med_name} - {dose}"
+                self.upcoming_card.add_widget(dose_layout)
+            self.upcoming_card.height = dp(30 + len(upcoming) * 80)
         else:
-            upcoming_card.add_widget(
-                MDLabel(
-                    text="No upcoming doses today",
-                    halign="center",
-                    theme_text_color="Secondary",
-                    font_style="Body2",
-                )
-            )
-            upcoming_card.height = dp(100)
+            self.upcoming_card.add_widget(self.no_upcoming_label)
+            self.upcoming_card.height = dp(100)
 
-        self.content_layout.add_widget(upcoming_card)
+    def format_upcoming_time(self, dose_time, now):
+        """AM/PM time, prefixed with the day when it is not today"""
+        text = format_ampm(dose_time.hour * 60 + dose_time.minute)
+        days_ahead = (dose_time.date() - now.date()).days
+        if days_ahead == 1:
+            return f"Tomorrow, {text}"
+        if days_ahead > 1:
+            return f"{dose_time.strftime('%a')}, {text}"
+        return text
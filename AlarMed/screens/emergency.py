@@ -11,12 +11,14 @@ from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.scrollview import MDScrollView
 from kivymd.uix.textfield import MDTextField
 from kivymd.uix.toolbar import MDTopAppBar
-from kivymd.uix.dialog import MDDialog
 from kivymd.uix.menu import MDDropdownMenu
 from kivy.metrics import dp
 from kivy.app import App
 import webbrowser
 
+from frame_monitor import traced
+from screens.keyed_list import KeyedList
+
 class EmergencyScreen(MDScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -127,13 +129,13 @@ class EmergencyScreen(MDScreen):
             size_hint_y=None
         )
         self.contacts_list.bind(minimum_height=self.contacts_list.setter('height'))
+        self.contact_cards = KeyedList(self.contacts_list, self.build_contact_card, empty=self.build_empty_card)
         content.add_widget(self.contacts_list)
         
         scroll.add_widget(content)
         main_layout.add_widget(scroll)
         
         self.add_widget(main_layout)
-        self.refresh_contacts()
     
     def set_contact_type(self, contact_type):
         self.type_btn.text = f"Type: {contact_type}"
@@ -147,23 +149,13 @@ class EmergencyScreen(MDScreen):
         contact_type = self.type_btn.text.replace("Type: ", "")
         
         if not name or not phone:
-            dialog = MDDialog(
-                title="Missing Information",
-                text="Please fill in all fields",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: dialog.dismiss())]
-            )
-            dialog.open()
+            app.dialogs.info("Missing Information", "Please fill in all fields")
             return
         
         try:
             app.db.add_emergency_contact(name, phone, contact_type)
             
-            dialog = MDDialog(
-                title="Success",
-                text="Contact added successfully",
-                buttons=[MDRaisedButton(text="OK", on_release=lambda x: dialog.dismiss())]
-            )
-            dialog.open()
+            app.dialogs.info("Success", "Contact added successfully")
             
             self.contact_name.text = ""
             self.contact_phone.text = ""
@@ -172,39 +164,35 @@ class EmergencyScreen(MDScreen):
             self.refresh_contacts()
             
         except Exception as e:
-            dialog = MDDialog(
-                title="Error",
-                text=f"Failed: {str(e)}",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: dialog.dismiss())]
-            )
-            dialog.open()
+            app.dialogs.error(f"Failed: {str(e)}")
     
+    @traced
     def refresh_contacts(self):
+        """Update the contact cards; unchanged contacts keep their card"""
         app = App.get_running_app()
-        self.contacts_list.clear_widgets()
-        
         contacts = app.db.get_all_emergency_contacts()
+        self.contact_cards.update([(contact[0], tuple(contact)) for contact in contacts])
+    
+    def build_empty_card(self):
+        empty_card = MDCard(
+            orientation='vertical',
+            padding=dp(30),
+            size_hint_y=None,
+            height=dp(120),
+            md_bg_color=[0.1, 0.1, 0.1, 1],
+            radius=[15, 15, 15, 15]
+        )
         
-        if not contacts:
-            empty_card = MDCard(
-                orientation='vertical',
-                padding=dp(30),
-                size_hint_y=None,
-                height=dp(120),
-                md_bg_color=[0.1, 0.1, 0.1, 1],
-                radius=[15, 15, 15, 15]
-            )
-            
-            empty_label = MDLabel(
-                text="No contacts yet",
-                halign='center',
-                theme_text_color='Secondary',
-                font_style="Body2"
-            )
-            empty_card.add_widget(empty_label)
-            self.contacts_list.add_widget(empty_card)
-            return
-        
+        empty_label = MDLabel(
+            text="No contacts yet",
+            halign='center',
+            theme_text_color='Secondary',
+            font_style="Body2"
+        )
+        empty_card.add_widget(empty_label)
+        return empty_card
+    
+    def build_contact_card(self, contact):
         type_colors = {
             "Emergency": [0.85, 0.33, 0.31, 1],
             "Medical": [0.12, 0.42, 0.65, 1],
@@ -213,85 +201,84 @@ class EmergencyScreen(MDScreen):
             "Other": [0.3, 0.3, 0.3, 1]
         }
         
-        for contact in contacts:
-            contact_id, name, phone, contact_type, priority = contact
-            
-            color = type_colors.get(contact_type, [0.1, 0.1, 0.1, 1])
-            
-            contact_card = MDCard(
-                orientation='vertical',
-                padding=dp(20),
-                spacing=dp(12),
-                size_hint_y=None,
-                md_bg_color=[0.1, 0.1, 0.1, 1],
-                radius=[15, 15, 15, 15]
-            )
-            
-            header = MDBoxLayout(
-                orientation='horizontal',
-                size_hint_y=None,
-                height=dp(35)
-            )
-            
-            name_label = MDLabel(
-                text=name,
-                font_style="H6",
-                size_hint_x=0.7
-            )
-            header.add_widget(name_label)
-            
-            type_badge = MDLabel(
-                text=contact_type,
-                font_style="Caption",
-                halign='right',
-                theme_text_color='Secondary',
-                size_hint_x=0.3
-            )
-            header.add_widget(type_badge)
-            
-            contact_card.add_widget(header)
-            
-            phone_card = MDCard(
-                padding=dp(12),
-                size_hint_y=None,
-                height=dp(45),
-                md_bg_color=[0.15, 0.15, 0.15, 1],
-                radius=[10, 10, 10, 10]
-            )
-            
-            phone_label = MDLabel(
-                text=phone,
-                halign='center',
-                font_style="Body1"
-            )
-            phone_card.add_widget(phone_label)
-            contact_card.add_widget(phone_card)
-            
-            btn_layout = MDBoxLayout(
-                orientation='horizontal',
-                spacing=dp(10),
-                size_hint_y=None,
-                height=dp(48)
-            )
-            
-            call_btn = MDRaisedButton(
-                text="CALL",
-                md_bg_color=[0.18, 0.65, 0.45, 1],
-                on_release=lambda x, p=phone: self.call_contact(p)
-            )
-            btn_layout.add_widget(call_btn)
-            
-            delete_btn = MDFlatButton(
-                text="DELETE",
-                theme_text_color='Error',
-                on_release=lambda x, c_id=contact_id: self.confirm_delete_contact(c_id)
-            )
-            btn_layout.add_widget(delete_btn)
-            
-            contact_card.add_widget(btn_layout)
-            
-            contact_card.height = dp(180)
-            self.contacts_list.add_widget(contact_card)
+        contact_id, name, phone, contact_type, priority = contact
+        
+        color = type_colors.get(contact_type, [0.1, 0.1, 0.1, 1])
+        
+        contact_card = MDCard(
+            orientation='vertical',
+            padding=dp(20),
+            spacing=dp(12),
+            size_hint_y=None,
+            md_bg_color=[0.1, 0.1, 0.1, 1],
+            radius=[15, 15, 15, 15]
+        )
+        
+        header = MDBoxLayout(
+            orientation='horizontal',
+            size_hint_y=None,
+            height=dp(35)
+        )
+        
+        name_label = MDLabel(
+            text=name,
+            font_style="H6",
+            size_hint_x=0.7
+        )
+        header.add_widget(name_label)
+        
+        type_badge = MDLabel(
+            text=contact_type,
+            font_style="Caption",
+            halign='right',
+            theme_text_color='Secondary',
+            size_hint_x=0.3
+        )
+        header.add_widget(type_badge)
+        
+        contact_card.add_widget(header)
+        
+        phone_card = MDCard(
+            padding=dp(12),
+            size_hint_y=None,
+            height=dp(45),
+            md_bg_color=[0.15, 0.15, 0.15, 1],
+            radius=[10, 10, 10, 10]
+        )
+        
+        phone_label = MDLabel(
+            text=phone,
+            halign='center',
+            font_style="Body1"
+        )
+        phone_card.add_widget(phone_label)
+        contact_card.add_widget(phone_card)
+        
+        btn_layout = MDBoxLayout(
+            orientation='horizontal',
+            spacing=dp(10),
+            size_hint_y=None,
+            height=dp(48)
+        )
+        
+        call_btn = MDRaisedButton(
+            text="CALL",
+            md_bg_color=[0.18, 0.65, 0.45, 1],
+            on_release=lambda x, p=phone: self.call_contact(p)
+        )
+        btn_layout.add_widget(call_btn)
+        
+        delete_btn = MDFlatButton(
+            text="DELETE",
+            theme_text_color='Error',
+            on_release=lambda x, c_id=contact_id: self.confirm_delete_contact(c_id)
+        )
+        btn_layout.add_widget(delete_btn)
+        
+        contact_card.add_widget(btn_layout)
+        
+        contact_card.height = dp(180)
+        return contact_card
     
     def call_contact(self, phone):
         try:
@@ -299,34 +286,22 @@ class EmergencyScreen(MDScreen):
         except:
             pass
         
-        dialog = MDDialog(
-            title="Calling",
-            text=f"Opening phone dialer:\n{phone}",
-            buttons=[MDFlatButton(text="OK", on_release=lambda x: dialog.dismiss())]
-        )
-        dialog.open()
+        App.get_running_app().dialogs.info("Calling", f"Opening phone dialer:\n{phone}")
     
     def confirm_delete_contact(self, contact_id):
-        dialog = MDDialog(
-            title="Delete Contact",
-            text="Are you sure you want to delete this contact?",
-            buttons=[
-                MDRaisedButton(
-                    text="DELETE",
-                    md_bg_color=[0.85, 0.33, 0.31, 1],
-                    on_release=lambda x: self.delete_contact(contact_id, dialog)
-                ),
-                MDFlatButton(text="CANCEL", on_release=lambda x: dialog.dismiss()),
-            ],
+        App.get_running_app().dialogs.confirm(
+            "Delete Contact",
+            "Are you sure you want to delete this contact?",
+            lambda: self.delete_contact(contact_id),
+            confirm_text="DELETE",
+            danger=True
         )
-        dialog.open()
     
-    def delete_contact(self, contact_id, dialog):
+    def delete_contact(self, contact_id):
         app = App.get_running_app()
         
         try:
             app.db.delete_emergency_contact(contact_id)
-            dialog.dismiss()
             self.refresh_contacts()
         except Exception as e:
             print(f"Error deleting: {e}")
@@ -8,19 +8,41 @@ from kivymd.uix.card import MDCard
 from kivymd.uix.label import MDLabel
 from kivymd.uix.button import MDRaisedButton, MDFlatButton
 from kivymd.uix.boxlayout import MDBoxLayout
-from kivymd.uix.scrollview import MDScrollView
+from kivymd.uix.recycleview import MDRecycleView
 from kivymd.uix.toolbar import MDTopAppBar
 from kivymd.uix.menu import MDDropdownMenu
+from kivy.uix.behaviors import ButtonBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.properties import BooleanProperty, ObjectProperty, StringProperty
+from kivy.factory import Factory
 from kivy.metrics import dp
 from kivy.app import App
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+from functools import lru_cache
 
-from utils import time_to_ampm
+from frame_monitor import traced
+from utils import display_time
+
+CARD_COLOR = [0.1, 0.1, 0.1, 1]
+TODAY_COLOR = [0.12, 0.42, 0.65, 1]
+
+DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+MONTH_NAMES = ("", "January", "February", "March", "April", "May", "June",
+               "July", "August", "September", "October", "November", "December")
+
+# Row heights (dp); fixed so the list can be laid out without measuring text
+DAY_HEIGHT = 72
+RECORD_HEIGHT = 78
+RECORD_NOTES_HEIGHT = 98
+GROUP_GAP = 15
 
 class HistoryScreen(MDScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.filter_days = 30
+        self.summaries = []
+        self.day_records = {}  # date -> records, for the expanded days
+        self.today_str = None
         self.build_ui()
     
     def on_enter(self):
@@ -54,21 +76,38 @@ class HistoryScreen(MDScreen):
         )
         main_layout.add_widget(self.filter_label)
         
-        # Scroll view
-        scroll = MDScrollView()
-        self.history_layout = MDBoxLayout(
+        # Virtualized record list: only the rows on screen exist as widgets
+        self.history_list = MDRecycleView()
+        list_layout = RecycleBoxLayout(
             orientation='vertical',
-            spacing=dp(15),
             padding=dp(20),
+            default_size_hint=(1, None),
             size_hint_y=None
         )
-        self.history_layout.bind(minimum_height=self.history_layout.setter('height'))
+        list_layout.bind(minimum_height=list_layout.setter('height'))
+        self.history_list.add_widget(list_layout)
+        self.history_list.key_viewclass = "viewclass"
         
-        scroll.add_widget(self.history_layout)
-        main_layout.add_widget(scroll)
+        self.empty_card = MDCard(
+            orientation='vertical',
+            padding=dp(30),
+            size_hint_y=None,
+            height=dp(150),
+            md_bg_color=CARD_COLOR,
+            radius=[15, 15, 15, 15]
+        )
+        self.empty_card.add_widget(MDLabel(
+            text="No medication records found",
+            halign='center',
+            theme_text_color='Secondary',
+            font_style="Body2"
+        ))
+        
+        self.list_container = MDBoxLayout(orientation='vertical')
+        self.list_container.add_widget(self.history_list)
+        main_layout.add_widget(self.list_container)
         
         self.add_widget(main_layout)
-        self.refresh_history()
     
     def show_filter_menu(self):
         """Show filter menu"""
@@ -115,124 +154,180 @@ class HistoryScreen(MDScreen):
             self.filter_label.text = f"Last {days} days"
         self.refresh_history()
     
+    @traced
     def refresh_history(self):
-        """Refresh history display"""
+        """Refresh history display: one summary row per day, from a single
+        aggregate query. Records are only read for the expanded days."""
         app = App.get_running_app()
-        self.history_layout.clear_widgets()
         
-        if self.filter_days == 9999:
-            records = app.db.get_medicine_records(app.current_profile_id)
-        else:
-            cutoff_date = (datetime.now() - timedelta(days=self.filter_days)).strftime("%Y-%m-%d")
-            records = app.db.get_medicine_records(app.current_profile_id, cutoff_date)
+        now = app.clock.now()
+        self.today_str = now.strftime("%Y-%m-%d")
+        cutoff_date = None
+        if self.filter_days != 9999:
+            cutoff_date = (now - timedelta(days=self.filter_days)).strftime("%Y-%m-%d")
+        self.summaries = app.db.get_daily_summaries(app.current_profile_id, cutoff_date)
         
-        if not records:
-            empty_card = MDCard(
-                orientation='vertical',
-                padding=dp(30),
-                size_hint_y=None,
-                height=dp(150),
-                md_bg_color=[0.1, 0.1, 0.1, 1],
-                radius=[15, 15, 15, 15]
-            )
-            
-            empty_label = MDLabel(
-                text="No medication records found",
-                halign='center',
-                theme_text_color='Secondary',
-                font_style="Body2"
-            )
-            empty_card.add_widget(empty_label)
-            self.history_layout.add_widget(empty_card)
-            return
+        # Keep open days open, with their records read again
+        shown_days = {summary[0] for summary in self.summaries}
+        self.day_records = {
+            day: app.db.get_medicine_records_for_day(app.current_profile_id, day)
+            for day in self.day_records if day in shown_days
+        }
         
-        # Group by date
-        records_by_date = {}
-        for record in records:
-            date = record[5]
-            if date not in records_by_date:
-                records_by_date[date] = []
-            records_by_date[date].append(record)
+        self.update_list()
+        self.history_list.scroll_y = 1
+        self.show_empty_state(not self.summaries)
+    
+    def toggle_day(self, day):
+        """Expand or collapse a day's records"""
+        if day in self.day_records:
+            del self.day_records[day]
+        else:
+            app = App.get_running_app()
+            self.day_records[day] = app.db.get_medicine_records_for_day(app.current_profile_id, day)
+        self.update_list()
+    
+    def update_list(self):
+        self.history_list.data = build_history_data(
+            self.summaries, self.day_records, self.today_str, self.toggle_day
+        )
+    
+    def show_empty_state(self, empty):
+        """Swap between the record list and the empty card"""
+        shown = self.empty_card if empty else self.history_list
+        if shown.parent is not self.list_container:
+            self.list_container.clear_widgets()
+            self.list_container.add_widget(shown)
+
+
+def build_history_data(summaries, day_records, today_str, toggle=None):
+    """RecycleView rows for the day summaries (newest first): a row per day,
+    followed by the day's records when it is in day_records, with a gap
+    between days.
+    """
+    data = []
+    for day, doses, medicine_count, medicines in summaries:
+        is_today = day == today_str
+        records = day_records.get(day)
+        if data:
+            data.append({"viewclass": "Widget", "height": dp(GROUP_GAP)})
+        data.append({
+            "viewclass": "HistoryDayRow",
+            "height": dp(DAY_HEIGHT),
+            "day": day,
+            "summary_text": (
+                f"{doses} dose{'' if doses == 1 else 's'} · "
+                f"{medicine_count} medicine{'' if medicine_count == 1 else 's'}: {medicines}"
+            ),
+            "is_today": is_today,
+            "expanded": records is not None,
+            "toggle": toggle,
+        })
+        for record in records or ():
+            record_id, profile_id, medicine, dosage, time_taken, date_taken, notes, completed, created_at = record
+            data.append({
+                "viewclass": "HistoryRecordRow",
+                "height": dp(RECORD_NOTES_HEIGHT if notes else RECORD_HEIGHT),
+                "time_text": display_time(time_taken),
+                "medicine_text": f"{medicine} - {dosage}",
+                "notes_text": notes or "",
+                "is_today": is_today,
+                "last": False,
+            })
+        if records:
+            data[-1]["last"] = True
+    return data
+
+
+@lru_cache(maxsize=512)
+def format_day(day):
+    """'2026-10-19' -> 'Monday, October 19, 2026'"""
+    try:
+        value = date.fromisoformat(day)
+    except (TypeError, ValueError):
+        return str(day)
+    return f"{DAY_NAMES[value.weekday()]}, {MONTH_NAMES[value.month]} {value.day:02d}, {value.year}"
+
+
+class HistoryDayRow(ButtonBehavior, MDBoxLayout):
+    """A day's summary; tap to show or hide its records. The date is only
+    formatted when the row comes into view."""
+    
+    day = StringProperty("")
+    summary_text = StringProperty("")
+    is_today = BooleanProperty(False)
+    expanded = BooleanProperty(False)
+    toggle = ObjectProperty(None, allownone=True)
+    
+    def __init__(self, **kwargs):
+        super().__init__(orientation='vertical', padding=[dp(20), dp(10)], spacing=dp(4), **kwargs)
+        self.label = MDLabel(font_style="Subtitle1", bold=True, size_hint_y=None, height=dp(28))
+        self.summary_label = MDLabel(
+            font_style="Caption", theme_text_color='Secondary', size_hint_y=None, height=dp(20), shorten=True
+        )
+        self.add_widget(self.label)
+        self.add_widget(self.summary_label)
+        self.bind(
+            day=self.update_title,
+            summary_text=self.summary_label.setter('text'),
+            is_today=self.update_style,
+            expanded=self.update_style,
+        )
+        self.update_style()
+    
+    def on_release(self):
+        if self.toggle:
+            self.toggle(self.day)
+    
+    def update_title(self, *args):
+        self.label.text = f"{format_day(self.day)} (Today)" if self.is_today else format_day(self.day)
+    
+    def update_style(self, *args):
+        self.update_title()
+        self.md_bg_color = TODAY_COLOR if self.is_today else CARD_COLOR
+        # Open days continue into their records below
+        self.radius = [15, 15, 0, 0] if self.expanded else [15, 15, 15, 15]
+
+
+class HistoryRecordRow(MDBoxLayout):
+    """One record; the last row of a day rounds off the day's card"""
+    
+    time_text = StringProperty("")
+    medicine_text = StringProperty("")
+    notes_text = StringProperty("")
+    is_today = BooleanProperty(False)
+    last = BooleanProperty(False)
+    
+    def __init__(self, **kwargs):
+        super().__init__(orientation='vertical', padding=[dp(20), dp(10)], spacing=dp(4), **kwargs)
+        self.time_label = MDLabel(
+            font_style="Caption", theme_text_color='Secondary', size_hint_y=None, height=dp(20)
+        )
+        self.medicine_label = MDLabel(font_style="Body1", size_hint_y=None, height=dp(25))
+        self.notes_label = MDLabel(
+            font_style="Caption", theme_text_color='Secondary', size_hint_y=None, height=0, shorten=True
+        )
+        divider = MDBoxLayout(size_hint_y=None, height=dp(1), md_bg_color=[0.2, 0.2, 0.2, 1])
+        for widget in (self.time_label, self.medicine_label, self.notes_label, divider):
+            self.add_widget(widget)
         
-        # Display
-        for date in sorted(records_by_date.keys(), reverse=True):
-            date_obj = datetime.strptime(date, "%Y-%m-%d")
-            date_display = date_obj.strftime("%A, %B %d, %Y")
-            is_today = date == datetime.now().strftime("%Y-%m-%d")
-            
-            # Date card
-            date_card = MDCard(
-                orientation='vertical',
-                padding=dp(20),
-                spacing=dp(15),
-                size_hint_y=None,
-                md_bg_color=[0.12, 0.42, 0.65, 1] if is_today else [0.1, 0.1, 0.1, 1],
-                radius=[15, 15, 15, 15]
-            )
-            
-            date_text = date_display
-            if is_today:
-                date_text += " (Today)"
-            
-            date_label = MDLabel(
-                text=date_text,
-                font_style="Subtitle1",
-                bold=True,
-                size_hint_y=None,
-                height=dp(30)
-            )
-            date_card.add_widget(date_label)
-            
-            # Records for this date
-            for record in records_by_date[date]:
-                record_id, profile_id, medicine, dosage, time_taken, date_taken, notes, completed, created_at = record
-                
-                record_box = MDBoxLayout(
-                    orientation='vertical',
-                    size_hint_y=None,
-                    padding=[0, dp(10)],
-                    spacing=dp(8)
-                )
-                
-                time_ampm = time_to_ampm(time_taken)
-                
-                time_label = MDLabel(
-                    text=time_ampm,
-                    font_style="Caption",
-                    theme_text_color='Secondary',
-                    size_hint_y=None,
-                    height=dp(20)
-                )
-                record_box.add_widget(time_label)
-                
-                med_label = MDLabel(
-                    text=f"{medicine} - {dosage}",
-                    font_style="Body1",
-                    size_hint_y=None,
-                    height=dp(25)
-                )
-                record_box.add_widget(med_label)
-                
-                if notes:
-                    notes_label = MDLabel(
-                        text=notes,
-                        font_style="Caption",
-                        theme_text_color='Secondary',
-                        size_hint_y=None
-                    )
-                    notes_label.bind(texture_size=notes_label.setter('size'))
-                    record_box.add_widget(notes_label)
-                
-                # Divider
-                divider = MDBoxLayout(
-                    size_hint_y=None,
-                    height=dp(1),
-                    md_bg_color=[0.2, 0.2, 0.2, 1]
-                )
-                record_box.add_widget(divider)
-                
-                record_box.bind(minimum_height=record_box.setter('height'))
-                date_card.add_widget(record_box)
-            
-            date_card.bind(minimum_height=date_card.setter('height'))
-            self.history_layout.add_widget(date_card)
+        self.bind(
+            time_text=self.time_label.setter('text'),
+            medicine_text=self.medicine_label.setter('text'),
+            notes_text=self.update_notes,
+            is_today=self.update_style,
+            last=self.update_style,
+        )
+        self.update_style()
+    
+    def update_notes(self, instance, notes):
+        self.notes_label.text = notes
+        self.notes_label.height = dp(20) if notes else 0
+    
+    def update_style(self, *args):
+        self.md_bg_color = TODAY_COLOR if self.is_today else CARD_COLOR
+        self.radius = [0, 0, 15, 15] if self.last else [0, 0, 0, 0]
+
+
+Factory.register("HistoryDayRow", cls=HistoryDayRow)
+Factory.register("HistoryRecordRow", cls=HistoryRecordRow)
@@ -0,0 +1,74 @@
+"""
+AlarMed - Keyed List
+Updates a list of cards in place from rows keyed by id
+"""
+
+
+class KeyedList:
+    """Keeps a layout's cards in step with a list of (key, data) rows.
+
+    update() compares the new rows with the previous ones by key: cards for
+    removed keys are taken out, new keys get a new card, and a key whose
+    data changed gets its card rebuilt in the same place. Cards whose data
+    is unchanged are reused as they are, and only cards out of order are
+    moved. `data` must support ==; pass only the fields the card shows.
+    """
+
+    def __init__(self, container, create, empty=None):
+        self.container = container
+        self.create = create  # data -> card widget
+        self.empty = empty  # () -> widget shown when there are no rows
+        self._rows = {}  # key -> (data, widget)
+        self._empty_widget = None
+
+    def update(self, rows):
+        """Show `rows` in order; returns the number of cards added, rebuilt or moved"""
+        container = self.container
+        touched = 0
+        new_keys = {key for key, data in rows}
+
+        for key in [key for key in self._rows if key not in new_keys]:
+            container.remove_widget(self._rows.pop(key)[1])
+            touched += 1
+
+        if not rows:
+            if self.empty and self._empty_widget is None:
+                self._empty_widget = self.empty()
+                container.add_widget(self._empty_widget)
+            return touched
+        if self._empty_widget is not None:
+            container.remove_widget(self._empty_widget)
+            self._empty_widget = None
+
+        ordered = []
+        for key, data in rows:
+            previous = self._rows.get(key)
+            if previous and previous[0] == data:
+                widget = previous[1]
+            else:
+                widget = self.create(data)
+                if previous:
+                    # Rebuilt in place: swap the old card for the new one
+                    index = container.children.index(previous[1])
+                    container.remove_widget(previous[1])
+                    container.add_widget(widget, index=index)
+                    touched += 1
+            self._rows[key] = (data, widget)
+            ordered.append(widget)
+
+        # Layout children are stored last-first: display position i is
+        # children[len(children) - 1 - i]
+        for position, widget in enumerate(ordered):
+            children = container.children
+            if widget.parent is container:
+                if children.index(widget) == len(children) - 1 - position:
+                    continue
+                container.remove_widget(widget)
+            container.add_widget(widget, index=len(container.children) - position)
+            touched += 1
+        return touched
+
+    def clear(self):
+        self.container.clear_widgets()
+        self._rows = {}
+        self._empty_widget = None
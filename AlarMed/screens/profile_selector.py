@@ -10,13 +10,13 @@ from kivymd.uix.button import MDRaisedButton, MDFlatButton
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.gridlayout import MDGridLayout
 from kivymd.uix.scrollview import MDScrollView
-from kivymd.uix.dialog import MDDialog
 from kivymd.uix.textfield import MDTextField
 from kivymd.uix.menu import MDDropdownMenu
 from kivy.metrics import dp
 from kivy.app import App
 
-from config import AVATAR_LETTERS, HEX_COLORS
+from config import ALARM_ESCALATE, AVATAR_LETTERS, HEX_COLORS
+from frame_monitor import traced
 
 class ProfileSelectorScreen(MDScreen):
     def __init__(self, **kwargs):
@@ -92,8 +92,8 @@ class ProfileSelectorScreen(MDScreen):
         main_layout.add_widget(self.profiles_scroll)
         
         self.add_widget(main_layout)
-        self.refresh_profiles()
     
+    @traced
     def refresh_profiles(self):
         """Refresh profile list"""
         app = App.get_running_app()
@@ -123,7 +123,7 @@ class ProfileSelectorScreen(MDScreen):
         
         # Display profiles
         for profile in profiles:
-            profile_id, name, age, gender, color, avatar, created_at, last_active = profile
+            profile_id, name, age, gender, color, avatar, created_at, last_active, *_ = profile
             
             # Convert hex color to RGBA
             r = int(color[1:3], 16) / 255
@@ -241,7 +241,7 @@ class ProfileSelectorScreen(MDScreen):
             orientation='vertical',
             spacing=dp(15),
             size_hint_y=None,
-            height=dp(450),
+            height=dp(513),
             padding=dp(15)
         )
         
@@ -288,6 +288,24 @@ class ProfileSelectorScreen(MDScreen):
         self.gender_menu.caller = gender_btn
         content.add_widget(gender_btn)
         
+        # Alarm mode: play the tone once, or ring louder until answered
+        alarm_escalate = [ALARM_ESCALATE]
+        
+        def alarm_mode_text():
+            return "Alarm: Ring Until Answered" if alarm_escalate[0] else "Alarm: Ring Once"
+        
+        def toggle_alarm_mode(button):
+            alarm_escalate[0] = not alarm_escalate[0]
+            button.text = alarm_mode_text()
+        
+        alarm_btn = MDFlatButton(
+            text=alarm_mode_text(),
+            size_hint_y=None,
+            height=dp(48),
+            on_release=toggle_alarm_mode
+        )
+        content.add_widget(alarm_btn)
+        
         # Avatar selection
         avatar_label = MDLabel(
             text="Choose Avatar:",
@@ -373,7 +391,7 @@ class ProfileSelectorScreen(MDScreen):
         
         content.add_widget(color_grid)
         
-        def save_profile(instance):
+        def save_profile(dialog):
             name = name_field.text.strip()
             age = age_field.text.strip()
             gender = gender_btn.text if gender_btn.text != "Select Gender (Optional)" else ""
@@ -390,7 +408,8 @@ class ProfileSelectorScreen(MDScreen):
                     age_int,
                     gender if gender else None,
                     selected_color[0],
-                    selected_avatar[0]
+                    selected_avatar[0],
+                    alarm_escalate=alarm_escalate[0]
                 )
                 
                 dialog.dismiss()
@@ -400,23 +419,11 @@ class ProfileSelectorScreen(MDScreen):
                 # In a real app, use better error logging
                 print(f"Error creating profile: {e}")
         
-        dialog = MDDialog(
-            title="Create Profile",
-            type="custom",
-            content_cls=content,
-            buttons=[
-                MDRaisedButton(
-                    text="CREATE",
-                    on_release=save_profile
-                ),
-                MDFlatButton(
-                    text="CANCEL",
-                    on_release=lambda x: dialog.dismiss()
-                ),
-            ],
+        app.dialogs.custom(
+            "Create Profile",
+            content,
+            [("CREATE", save_profile, "raised"), ("CANCEL", None, "flat")]
         )
-        
-        dialog.open()
     
     def set_gender(self, button, gender):
         """Set gender selection"""
@@ -432,25 +439,15 @@ class ProfileSelectorScreen(MDScreen):
         """Confirm profile deletion"""
         app = App.get_running_app()
         
-        dialog = MDDialog(
-            title="Delete Profile",
-            text=f"Are you sure you want to delete '{profile_name}'?\n\nThis will permanently delete all associated data.",
-            buttons=[
-                MDRaisedButton(
-                    text="DELETE",
-                    md_bg_color=[0.85, 0.33, 0.31, 1],
-                    on_release=lambda x: self.delete_profile(profile_id, dialog)
-                ),
-                MDFlatButton(
-                    text="CANCEL",
-                    on_release=lambda x: dialog.dismiss()
-                ),
-            ],
+        app.dialogs.confirm(
+            "Delete Profile",
+            f"Are you sure you want to delete '{profile_name}'?\n\nThis will permanently delete all associated data.",
+            lambda: self.delete_profile(profile_id),
+            confirm_text="DELETE",
+            danger=True
         )
-        
-        dialog.open()
     
-    def delete_profile(self, profile_id, dialog):
+    def delete_profile(self, profile_id):
         """Delete profile"""
         app = App.get_running_app()
         
@@ -458,12 +455,10 @@ class ProfileSelectorScreen(MDScreen):
         if app.db.get_profile_count() == 1:
             # Optionally show a message that the last profile cannot be deleted
             print("Cannot delete the last remaining profile.")
-            dialog.dismiss()
             return
         
         try:
             app.db.delete_profile(profile_id)
-            dialog.dismiss()
             self.refresh_profiles()
         except Exception as e:
             # In a real app, use better error logging
@@ -12,23 +12,32 @@ from kivymd.uix.gridlayout import MDGridLayout
 from kivymd.uix.scrollview import MDScrollView
 from kivymd.uix.textfield import MDTextField
 from kivymd.uix.toolbar import MDTopAppBar
-from kivymd.uix.dialog import MDDialog
 from kivy.metrics import dp
 from kivy.app import App
-from datetime import datetime
+from kivy.clock import Clock
 
-from config import COMMON_DOSAGES, TIME_PRESETS
+from config import COMMON_DOSAGES, MEDICINE_SEARCH_DEBOUNCE, MEDICINE_SUGGESTION_LIMIT, TIME_PRESETS
+from frame_monitor import traced
+from timecodec import TimeFormatError, format_ampm, parse_ampm
 from utils import time_to_24h
 
 class RecordMedicineScreen(MDScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.suggestions_key = None  # (profile, library version, query) shown
+        self.search_serial = 0  # Bumped per lookup; older results are dropped
+        self.picked_medicine = None
+        self.search_trigger = Clock.create_trigger(lambda dt: self.refresh_suggestions(), MEDICINE_SEARCH_DEBOUNCE)
         self.build_ui()
-        self.selected_time = datetime.now().strftime("%I:%M %p")
+        self.selected_time = App.get_running_app().clock.now().strftime("%I:%M %p")
+    
+    def on_enter(self):
+        self.refresh_suggestions()
     
     def build_ui(self):
         """Build clean record UI"""
         app = App.get_running_app()
+        now = app.clock.now()
         
         main_layout = MDBoxLayout(orientation='vertical')
         
@@ -68,37 +77,14 @@ class RecordMedicineScreen(MDScreen):
             height=dp(56),
             mode="rectangle"
         )
+        self.medicine_field.bind(text=self.on_medicine_text)
         content.add_widget(self.medicine_field)
         
-        # Recent medicines
-        recent_meds = app.db.get_recent_medicines(app.current_profile_id, limit=3)
-        if recent_meds:
-            recent_label = MDLabel(
-                text="Recent:",
-                font_style="Caption",
-                theme_text_color='Secondary',
-                size_hint_y=None,
-                height=dp(25)
-            )
-            content.add_widget(recent_label)
-            
-            recent_grid = MDGridLayout(
-                cols=1,
-                spacing=dp(8),
-                size_hint_y=None,
-                height=dp(len(recent_meds) * 48)
-            )
-            
-            for med_name, dosage in recent_meds:
-                suggest_btn = MDFlatButton(
-                    text=f"{med_name} - {dosage or ''}",
-                    size_hint_y=None,
-                    height=dp(40),
-                    on_release=lambda x, m=med_name, d=dosage: self.autofill(m, d)
-                )
-                recent_grid.add_widget(suggest_btn)
-            
-            content.add_widget(recent_grid)
+        # Recent medicines, or matches for what is typed (filled in on_enter,
+        # once a profile is loaded)
+        self.suggestion_box = MDBoxLayout(orientation='vertical', spacing=dp(20), size_hint_y=None)
+        self.suggestion_box.bind(minimum_height=self.suggestion_box.setter('height'))
+        content.add_widget(self.suggestion_box)
         
         # Dosage
         self.dosage_field = MDTextField(
@@ -158,7 +144,7 @@ class RecordMedicineScreen(MDScreen):
         
         self.hour_field = MDTextField(
             hint_text="HH",
-            text=datetime.now().strftime("%I"),
+            text=now.strftime("%I"),
             input_filter='int',
             size_hint_x=0.3,
             mode="rectangle"
@@ -175,7 +161,7 @@ class RecordMedicineScreen(MDScreen):
         
         self.minute_field = MDTextField(
             hint_text="MM",
-            text=datetime.now().strftime("%M"),
+            text=now.strftime("%M"),
             input_filter='int',
             size_hint_x=0.3,
             mode="rectangle"
@@ -184,7 +170,7 @@ class RecordMedicineScreen(MDScreen):
         
         self.ampm_field = MDTextField(
             hint_text="AM/PM",
-            text=datetime.now().strftime("%p"),
+            text=now.strftime("%p"),
             size_hint_x=0.3,
             mode="rectangle"
         )
@@ -253,8 +239,91 @@ class RecordMedicineScreen(MDScreen):
         
         self.add_widget(main_layout)
     
+    def on_medicine_text(self, field, text):
+        """Look up suggestions once typing pauses"""
+        if text == self.picked_medicine:
+            # Filled in from a suggestion: nothing more to suggest
+            self.search_trigger.cancel()
+            self.search_serial += 1
+            self.suggestions_key = None
+            self.suggestion_box.clear_widgets()
+            return
+        self.picked_medicine = None
+        # A trigger already scheduled is not pushed back by calling it again
+        self.search_trigger.cancel()
+        self.search_trigger()
+    
+    @traced
+    def refresh_suggestions(self):
+        """Suggest the profile's most used medicines, or the library entries
+        matching the medicine name typed so far.
+
+        The lookup runs on the app's lookup worker. Each one bumps
+        search_serial, so a lookup still queued when a newer one is made is
+        skipped, and results that arrive late are dropped. Nothing is looked
+        up when the profile, the library and the query are all unchanged.
+        """
+        app = App.get_running_app()
+        profile_id = app.current_profile_id
+        query = self.medicine_field.text.strip()
+        key = (profile_id, app.db.get_table_version("medicine_library"), query)
+        if key == self.suggestions_key:
+            return
+        self.search_trigger.cancel()
+        self.search_serial += 1
+        serial = self.search_serial
+        
+        def lookup(db):
+            if serial != self.search_serial:
+                return None
+            if query:
+                return db.search_medicines(profile_id, query, limit=MEDICINE_SUGGESTION_LIMIT)
+            return db.get_recent_medicines(profile_id, limit=3)
+        
+        app.lookups.submit(lookup, lambda rows: self.suggestions_ready(serial, key, rows))
+    
+    def suggestions_ready(self, serial, key, rows):
+        if serial != self.search_serial:
+            return
+        self.suggestions_key = key
+        self.show_suggestions("Suggestions:" if key[2] else "Recent:", rows)
+    
+    @traced
+    def show_suggestions(self, title, medicines):
+        self.suggestion_box.clear_widgets()
+        if not medicines:
+            return
+        
+        suggestion_label = MDLabel(
+            text=title,
+            font_style="Caption",
+            theme_text_color='Secondary',
+            size_hint_y=None,
+            height=dp(25)
+        )
+        self.suggestion_box.add_widget(suggestion_label)
+        
+        suggestion_grid = MDGridLayout(
+            cols=1,
+            spacing=dp(8),
+            size_hint_y=None,
+            height=dp(len(medicines) * 48)
+        )
+        
+        for med_name, dosage in medicines:
+            suggest_btn = MDFlatButton(
+                text=f"{med_name} - {dosage or ''}",
+                size_hint_y=None,
+                height=dp(40),
+                on_release=lambda x, m=med_name, d=dosage: self.autofill(m, d)
+            )
+            suggestion_grid.add_widget(suggest_btn)
+        
+        self.suggestion_box.add_widget(suggestion_grid)
+    
     def autofill(self, medicine, dosage):
         """Autofill fields"""
+        self.picked_medicine = medicine
         self.medicine_field.text = medicine
         if dosage:
             self.dosage_field.text = dosage
@@ -262,12 +331,12 @@ class RecordMedicineScreen(MDScreen):
     def set_time(self, time_str):
         """Set time from preset"""
         try:
-            time_obj = datetime.strptime(time_str, "%I:%M %p")
-            self.hour_field.text = time_obj.strftime("%I")
-            self.minute_field.text = time_obj.strftime("%M")
-            self.ampm_field.text = time_obj.strftime("%p")
-        except:
-            pass
+            clock_text, ampm = format_ampm(parse_ampm(time_str)).split(" ")
+        except TimeFormatError as e:
+            print(f"Error setting time: {e}")
+            return
+        self.hour_field.text, self.minute_field.text = clock_text.split(":")
+        self.ampm_field.text = ampm
     
     def save_record(self):
         """Save medicine record"""
@@ -281,23 +350,14 @@ class RecordMedicineScreen(MDScreen):
         notes = self.notes_field.text.strip()
         
         if not medicine or not dosage or not hour or not minute:
-            dialog = MDDialog(
-                title="Missing Information",
-                text="Please fill in medicine name, dosage, and time.",
-                buttons=[
-                    MDFlatButton(
-                        text="OK",
-                        on_release=lambda x: dialog.dismiss()
-                    )
-                ]
-            )
-            dialog.open()
+            app.dialogs.info("Missing Information", "Please fill in medicine name, dosage, and time.")
             return
         
         try:
             time_str = f"{hour}:{minute} {ampm}"
             time_24 = time_to_24h(time_str)
-            date_taken = datetime.now().strftime("%Y-%m-%d")
+            now = app.clock.now()
+            date_taken = now.strftime("%Y-%m-%d")
             
             app.db.add_medicine_record(
                 app.current_profile_id,
@@ -315,35 +375,19 @@ class RecordMedicineScreen(MDScreen):
                 date_taken
             )
             
-            dialog = MDDialog(
-                title="Success",
-                text="Medicine logged successfully!",
-                buttons=[
-                    MDRaisedButton(
-                        text="OK",
-                        on_release=lambda x: (dialog.dismiss(), app.go_to_screen('dashboard'))
-                    )
-                ]
+            app.dialogs.info(
+                "Success",
+                "Medicine logged successfully!",
+                on_ok=lambda: app.go_to_screen('dashboard')
             )
-            dialog.open()
             
             # Clear form
             self.medicine_field.text = ""
             self.dosage_field.text = ""
             self.notes_field.text = ""
-            self.hour_field.text = datetime.now().strftime("%I")
-            self.minute_field.text = datetime.now().strftime("%M")
-            self.ampm_field.text = datetime.now().strftime("%p")
+            self.hour_field.text = now.strftime("%I")
+            self.minute_field.text = now.strftime("%M")
+            self.ampm_field.text = now.strftime("%p")
             
         except Exception as e:
-            dialog = MDDialog(
-                title="Error",
-                text=f"Failed to save: {str(e)}",
-                buttons=[
-                    MDFlatButton(
-                        text="OK",
-                        on_release=lambda x: dialog.dismiss()
-                    )
-                ]
-            )
-            dialog.open()
+            app.dialogs.error(f"Failed to save: {str(e)}")
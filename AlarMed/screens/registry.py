@@ -0,0 +1,96 @@
+"""
+AlarMed - Screen Registry
+Builds each screen on first navigation and prefetches likely next screens
+"""
+
+from importlib import import_module
+
+from kivy.clock import Clock
+
+from config import SCREEN_PREFETCH_DELAY
+from frame_monitor import traced
+
+# Screen name -> (module, class); modules are imported on first use
+SCREENS = {
+    "profile_selector": ("screens.profile_selector", "ProfileSelectorScreen"),
+    "dashboard": ("screens.dashboard", "DashboardScreen"),
+    "record": ("screens.record_medicine", "RecordMedicineScreen"),
+    "reminders": ("screens.reminders", "RemindersScreen"),
+    "history": ("screens.history", "HistoryScreen"),
+    "reports": ("screens.reports", "ReportsScreen"),
+    "emergency": ("screens.emergency", "EmergencyScreen"),
+    "backup": ("screens.backup", "BackupScreen"),
+}
+
+# Screens most often visited next, in order of likelihood
+PREFETCH = {
+    "profile_selector": ["dashboard"],
+    "dashboard": ["record", "reminders", "history"],
+    "record": ["history"],
+    "history": ["reports"],
+}
+
+
+class ScreenRegistry:
+    """Lazily populated screen manager.
+
+    Only the screen being shown is built during navigation. After the app
+    has been idle for `prefetch_delay` seconds, the likely next screens are
+    built one per frame, so the first visit to them is a plain switch.
+    Screens refresh their data in on_enter, so building one never touches
+    the database.
+    """
+
+    def __init__(self, manager, screens=SCREENS, prefetch=PREFETCH, prefetch_delay=SCREEN_PREFETCH_DELAY):
+        self.manager = manager
+        self.screens = screens
+        self.prefetch = prefetch or {}
+        self.prefetch_delay = prefetch_delay
+        self._pending = []
+        self._prefetch_event = None
+
+    @traced
+    def get(self, name):
+        """The screen called `name`, building it if needed"""
+        if self.manager.has_screen(name):
+            return self.manager.get_screen(name)
+        module_name, class_name = self.screens[name]
+        screen_class = getattr(import_module(module_name), class_name)
+        screen = screen_class(name=name)
+        self.manager.add_widget(screen)
+        return screen
+
+    def show(self, name):
+        self.get(name)
+        self.manager.current = name
+        self.schedule_prefetch(name)
+
+    def build_all(self):
+        for name in self.screens:
+            self.get(name)
+
+    def is_built(self, name):
+        return self.manager.has_screen(name)
+
+    def schedule_prefetch(self, name):
+        """Queue the likely next screens after `name`, replacing any earlier queue"""
+        if self._prefetch_event:
+            self._prefetch_event.cancel()
+            self._prefetch_event = None
+        self._pending = [n for n in self.prefetch.get(name, ()) if not self.is_built(n)]
+        if self._pending and self.prefetch_delay is not None:
+            self._prefetch_event = Clock.schedule_once(self._prefetch_next, self.prefetch_delay)
+
+    def _prefetch_next(self, dt):
+        self._prefetch_event = None
+        while self._pending:
+            name = self._pending.pop(0)
+            if not self.is_built(name):
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Error prefetching screen {name}: {e}")
+                break
+        if self._pending:
+            # One screen per frame keeps each frame short
+            self._prefetch_event = Clock.schedule_once(self._prefetch_next, 0)
@@ -7,13 +7,15 @@ from kivymd.uix.scrollview import MDScrollView
 from kivymd.uix.textfield import MDTextField
 from kivymd.uix.toolbar import MDTopAppBar
 from kivymd.uix.menu import MDDropdownMenu
-from kivymd.uix.dialog import MDDialog
 from kivy.metrics import dp
 from kivy.app import App
 from kivy.clock import Clock
-from datetime import datetime, timedelta
+from datetime import timedelta
 
-from utils import time_to_24h, time_to_ampm
+from frame_monitor import traced
+from recurrence import SCHEDULE_TYPES, build_rule, compile_rule
+from screens.keyed_list import KeyedList
+from utils import display_time, time_to_24h
 
 
 class RemindersScreen(MDScreen):
@@ -60,7 +62,7 @@ class RemindersScreen(MDScreen):
             md_bg_color=[0.1, 0.1, 0.1, 1],
             radius=[15, 15, 15, 15],
         )
-        add_card.height = dp(800)
+        add_card.height = dp(950)
 
         add_title = MDLabel(
             text="Add New Reminder",
@@ -104,7 +106,7 @@ class RemindersScreen(MDScreen):
 
         schedule_items = [
             {"text": s, "viewclass": "OneLineListItem", "on_release": lambda x=s: self.set_schedule_type(x)}
-            for s in ["Daily", "Specific Days", "Every Other Day", "Weekly"]
+            for s in SCHEDULE_TYPES
         ]
         self.schedule_menu = MDDropdownMenu(items=schedule_items, width_mult=4)
 
@@ -119,13 +121,31 @@ class RemindersScreen(MDScreen):
         add_card.add_widget(self.schedule_btn)
 
         self.rem_days = MDTextField(
-            hint_text="Days (e.g., Mon, Wed, Fri)",
+            hint_text="Days (e.g., Mon, Wed, Fri or 1, 15 for Monthly)",
             size_hint_y=None,
             height=dp(56),
             mode="rectangle",
         )
         add_card.add_widget(self.rem_days)
 
+        self.rem_interval = MDTextField(
+            hint_text="Repeat every N hours (Every N Hours only)",
+            input_filter="int",
+            size_hint_y=None,
+            height=dp(56),
+            mode="rectangle",
+        )
+        add_card.add_widget(self.rem_interval)
+
+        self.rem_duration = MDTextField(
+            hint_text="Stop after N days (optional)",
+            input_filter="int",
+            size_hint_y=None,
+            height=dp(56),
+            mode="rectangle",
+        )
+        add_card.add_widget(self.rem_duration)
+
         add_card.add_widget(MDLabel(text="Reminder Times", font_style="Subtitle2", size_hint_y=None, height=dp(30)))
 
         time_btn = MDRaisedButton(
@@ -169,6 +189,7 @@ class RemindersScreen(MDScreen):
 
         self.reminders_list = MDBoxLayout(orientation="vertical", spacing=dp(15), size_hint_y=None)
         self.reminders_list.bind(minimum_height=self.reminders_list.setter("height"))
+        self.reminder_cards = KeyedList(self.reminders_list, self.build_reminder_card, empty=self.build_empty_card)
         self.content.add_widget(self.reminders_list)
 
         self.scroll.add_widget(self.content)
@@ -221,11 +242,13 @@ class RemindersScreen(MDScreen):
         self.schedule_menu.dismiss()
 
     def show_add_time_dialog(self):
+        app = App.get_running_app()
+        now = app.clock.now()
         content = MDBoxLayout(orientation="vertical", spacing=dp(15), size_hint_y=None, height=dp(120), padding=dp(15))
         time_input_layout = MDBoxLayout(orientation="horizontal", spacing=dp(10), size_hint_y=None, height=dp(56))
-        hour_field = MDTextField(hint_text="HH", text=datetime.now().strftime("%I"), input_filter="int", size_hint_x=0.3, mode="rectangle")
-        minute_field = MDTextField(hint_text="MM", text=datetime.now().strftime("%M"), input_filter="int", size_hint_x=0.3, mode="rectangle")
-        ampm_field = MDTextField(hint_text="AM/PM", text=datetime.now().strftime("%p"), size_hint_x=0.3, mode="rectangle")
+        hour_field = MDTextField(hint_text="HH", text=now.strftime("%I"), input_filter="int", size_hint_x=0.3, mode="rectangle")
+        minute_field = MDTextField(hint_text="MM", text=now.strftime("%M"), input_filter="int", size_hint_x=0.3, mode="rectangle")
+        ampm_field = MDTextField(hint_text="AM/PM", text=now.strftime("%p"), size_hint_x=0.3, mode="rectangle")
         colon = MDLabel(text=":", font_style="H5", halign="center", size_hint_x=0.1)
         time_input_layout.add_widget(hour_field)
         time_input_layout.add_widget(colon)
@@ -233,7 +256,7 @@ class RemindersScreen(MDScreen):
         time_input_layout.add_widget(ampm_field)
         content.add_widget(time_input_layout)
 
-        def add_time(instance):
+        def add_time(dialog):
             hour = hour_field.text.strip().zfill(2)
             minute = minute_field.text.strip().zfill(2)
             ampm = ampm_field.text.strip().upper()
@@ -244,23 +267,9 @@ class RemindersScreen(MDScreen):
                     self.update_times_display()
                 dialog.dismiss()
             else:
-                error_dialog = MDDialog(
-                    title="Invalid Time",
-                    text="Please enter valid hour, minute, and AM/PM",
-                    buttons=[MDFlatButton(text="OK", on_release=lambda x: error_dialog.dismiss())],
-                )
-                error_dialog.open()
-
-        dialog = MDDialog(
-            title="Add Time",
-            type="custom",
-            content_cls=content,
-            buttons=[
-                MDRaisedButton(text="ADD", on_release=add_time),
-                MDFlatButton(text="CANCEL", on_release=lambda x: dialog.dismiss()),
-            ],
-        )
-        dialog.open()
+                app.dialogs.info("Invalid Time", "Please enter valid hour, minute, and AM/PM", over=True)
+
+        app.dialogs.custom("Add Time", content, [("ADD", add_time, "raised"), ("CANCEL", None, "flat")])
 
     def clear_times(self):
         self.reminder_times = []
@@ -277,25 +286,27 @@ class RemindersScreen(MDScreen):
         days = self.rem_days.text.strip()
 
         if not medicine or not dosage or not self.reminder_times:
-            dialog = MDDialog(
-                title="Missing Information",
-                text="Please select a medicine, dosage, and add at least one time.",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: dialog.dismiss())],
-            )
-            dialog.open()
+            app.dialogs.info("Missing Information", "Please select a medicine, dosage, and add at least one time.")
             return
 
         try:
             times_24 = [time_to_24h(t) for t in self.reminder_times]
             times_str = ", ".join(times_24)
-            app.db.add_reminder(app.current_profile_id, medicine, dosage, schedule_type, times_str, days)
-
-            dialog = MDDialog(
-                title="Success",
-                text="Reminder created successfully!",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: dialog.dismiss())],
+            interval = self.rem_interval.text.strip()
+            duration = self.rem_duration.text.strip()
+            rule = build_rule(
+                schedule_type,
+                times_24,
+                days,
+                start=app.clock.now(),
+                every_hours=int(interval) if interval else None,
+                duration_days=int(duration) if duration else None,
             )
-            dialog.open()
+            app.db.add_reminder(
+                app.current_profile_id, medicine, dosage, schedule_type, times_str, days, rule.to_string()
+            )
+
+            app.dialogs.info("Success", "Reminder created successfully!")
 
             self.selected_medicine = None
             self.selected_dosage = None
@@ -303,6 +314,8 @@ class RemindersScreen(MDScreen):
             self.rem_medicine.text = ""
             self.rem_dosage.text = ""
             self.rem_days.text = ""
+            self.rem_interval.text = ""
+            self.rem_duration.text = ""
             self.reminder_times = []
             self.update_times_display()
             self.schedule_btn.text = "Schedule: Daily"
@@ -311,83 +324,84 @@ class RemindersScreen(MDScreen):
             Clock.schedule_once(lambda dt: setattr(self.scroll, 'scroll_y', 1), 0.1)
 
         except Exception as e:
-            dialog = MDDialog(
-                title="Error",
-                text=f"Failed to add reminder: {str(e)}",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: dialog.dismiss())],
-            )
-            dialog.open()
+            app.dialogs.error(f"Failed to add reminder: {str(e)}")
 
+    @traced
     def refresh_reminders(self):
+        """Update the reminder cards; unchanged reminders keep their card"""
         app = App.get_running_app()
-        self.reminders_list.clear_widgets()
         reminders = app.db.get_active_reminders(app.current_profile_id)
+        self.reminder_cards.update([
+            (reminder[0], (reminder[0], *reminder[2:7], *reminder[9:11]))
+            for reminder in reminders
+        ])
+        Clock.schedule_once(lambda dt: setattr(self.scroll, 'scroll_y', 1), 0.1)
 
-        if not reminders:
-            empty_card = MDCard(
-                orientation="vertical",
-                padding=dp(30),
-                size_hint_y=None,
-                height=dp(120),
-                md_bg_color=[0.1, 0.1, 0.1, 1],
-                radius=[15, 15, 15, 15],
+    def build_empty_card(self):
+        empty_card = MDCard(
+            orientation="vertical",
+            padding=dp(30),
+            size_hint_y=None,
+            height=dp(120),
+            md_bg_color=[0.1, 0.1, 0.1, 1],
+            radius=[15, 15, 15, 15],
+        )
+        empty_card.add_widget(
+            MDLabel(
+                text="No active reminders",
+                halign="center",
+                theme_text_color="Secondary",
+                font_style="Body2",
             )
-            empty_card.add_widget(
+        )
+        return empty_card
+
+    def build_reminder_card(self, reminder):
+        reminder_id, medicine, dosage, schedule_type, times, days, snoozed_until, rrule = reminder
+        reminder_card = MDCard(
+            orientation="vertical",
+            padding=dp(20),
+            spacing=dp(12),
+            size_hint_y=None,
+            md_bg_color=[0.1, 0.1, 0.1, 1],
+            radius=[15, 15, 15, 15],
+        )
+        reminder_card.add_widget(MDLabel(text=medicine, font_style="H6", size_hint_y=None, height=dp(30)))
+        times_list = [t.strip() for t in times.split(",")]
+        times_ampm = [display_time(t) for t in times_list]
+        times_display = ", ".join(times_ampm)
+        schedule_text = schedule_type
+        if schedule_type == "Every N Hours" and rrule:
+            schedule_text = f"Every {compile_rule(rrule).interval} Hours"
+        details_text = f"Dosage: {dosage}\nTimes: {times_display}\nSchedule: {schedule_text}"
+        if days:
+            details_text += f"\nDays: {days}"
+        details = MDLabel(text=details_text, theme_text_color="Secondary", font_style="Body2", size_hint_y=None)
+        details.bind(texture_size=details.setter("size"))
+        reminder_card.add_widget(details)
+
+        if snoozed_until:
+            reminder_card.add_widget(
                 MDLabel(
-                    text="No active reminders",
-                    halign="center",
-                    theme_text_color="Secondary",
-                    font_style="Body2",
+                    text="Snoozed",
+                    theme_text_color="Custom",
+                    text_color=[0.94, 0.68, 0.31, 1],
+                    font_style="Caption",
+                    size_hint_y=None,
+                    height=dp(25),
                 )
             )
-            self.reminders_list.add_widget(empty_card)
-            return
-
-        for reminder in reminders:
-            reminder_id, profile_id, medicine, dosage, schedule_type, times, days, active, last_reminded, snoozed_until = reminder
-            reminder_card = MDCard(
-                orientation="vertical",
-                padding=dp(20),
-                spacing=dp(12),
-                size_hint_y=None,
-                md_bg_color=[0.1, 0.1, 0.1, 1],
-                radius=[15, 15, 15, 15],
-            )
-            reminder_card.add_widget(MDLabel(text=medicine, font_style="H6", size_hint_y=None, height=dp(30)))
-            times_list = [t.strip() for t in times.split(",")]
-            times_ampm = [time_to_ampm(t) for t in times_list]
-            times_display = ", ".join(times_ampm)
-            details_text = f"Dosage: {dosage}\nTimes: {times_display}\nSchedule: {schedule_type}"
-            if days:
-                details_text += f"\nDays: {days}"
-            details = MDLabel(text=details_text, theme_text_color="Secondary", font_style="Body2", size_hint_y=None)
-            details.bind(texture_size=details.setter("size"))
-            reminder_card.add_widget(details)
-
-            if snoozed_until:
-                reminder_card.add_widget(
-                    MDLabel(
-                        text="Snoozed",
-                        theme_text_color="Custom",
-                        text_color=[0.94, 0.68, 0.31, 1],
-                        font_style="Caption",
-                        size_hint_y=None,
-                        height=dp(25),
-                    )
-                )
 
-            btn_layout = MDBoxLayout(orientation="horizontal", spacing=dp(10), size_hint_y=None, height=dp(48))
-            btn_layout.add_widget(MDFlatButton(text="SNOOZE 1H", on_release=lambda x, r_id=reminder_id: self.snooze_reminder(r_id)))
-            btn_layout.add_widget(MDFlatButton(text="DELETE", theme_text_color="Error", on_release=lambda x, r_id=reminder_id: self.confirm_delete_reminder(r_id)))
-            reminder_card.add_widget(btn_layout)
-            reminder_card.height = dp(220)
-            self.reminders_list.add_widget(reminder_card)
-
-        Clock.schedule_once(lambda dt: setattr(self.scroll, 'scroll_y', 1), 0.1)
+        btn_layout = MDBoxLayout(orientation="horizontal", spacing=dp(10), size_hint_y=None, height=dp(48))
+        btn_layout.add_widget(MDFlatButton(text="SNOOZE 1H", on_release=lambda x, r_id=reminder_id: self.snooze_reminder(r_id)))
+        btn_layout.add_widget(MDFlatButton(text="DELETE", theme_text_color="Error", on_release=lambda x, r_id=reminder_id: self.confirm_delete_reminder(r_id)))
+        reminder_card.add_widget(btn_layout)
+        reminder_card.height = dp(220)
+        return reminder_card
 
     def snooze_reminder(self, reminder_id):
         app = App.get_running_app()
-        snooze_until = (datetime.now() + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S")
+        snooze_until = (app.clock.now() + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S")
         try:
             app.db.update_reminder_snooze(reminder_id, snooze_until)
             self.refresh_reminders()
@@ -395,25 +409,18 @@ class RemindersScreen(MDScreen):
             print(f"Error snoozing: {e}")
 
     def confirm_delete_reminder(self, reminder_id):
-        dialog = MDDialog(
-            title="Delete Reminder",
-            text="Are you sure you want to delete this reminder?",
-            buttons=[
-                MDRaisedButton(
-                    text="DELETE",
-                    md_bg_color=[0.85, 0.33, 0.31, 1],
-                    on_release=lambda x: self.delete_reminder(reminder_id, dialog),
-                ),
-                MDFlatButton(text="CANCEL", on_release=lambda x: dialog.dismiss()),
-            ],
+        App.get_running_app().dialogs.confirm(
+            "Delete Reminder",
+            "Are you sure you want to delete this reminder?",
+            lambda: self.delete_reminder(reminder_id),
+            confirm_text="DELETE",
+            danger=True,
         )
-        dialog.open()
 
-    def delete_reminder(self, reminder_id, dialog):
+    def delete_reminder(self, reminder_id):
         app = App.get_running_app()
         try:
             app.db.delete_reminder(reminder_id)
-            dialog.dismiss()
             self.refresh_reminders()
         except Exception as e:
             print(f"Error deleting: {e}")
@@ -14,12 +14,84 @@ from kivymd.uix.toolbar import MDTopAppBar
 from kivymd.uix.menu import MDDropdownMenu
 from kivy.metrics import dp
 from kivy.app import App
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import math
+import time
+
+from analytics import AdherenceAnalytics
+from config import REPORT_CACHE_MAX_AGE
+from dose_ledger import DoseLedger
+from frame_monitor import traced
+from screens.charts import BarChart, CalendarHeatmap, Sparkline
+
+# Days shown in the activity heatmap, ending today
+HEATMAP_DAYS = 365
+
+
+def compute_report(db, profile_id, period_days, now, ledger=None):
+    """Every figure on the reports screen, as plain data (runs on the background worker).
+
+    ledger is the app's DoseLedger; it is brought up to date on `db`.
+    """
+    today = now.strftime("%Y-%m-%d")
+    if period_days == 9999:
+        cutoff_date = "1900-01-01"
+        first_date = db.get_first_record_date(profile_id)
+        days_in_period = (now - datetime.strptime(first_date, "%Y-%m-%d")).days + 1 if first_date else 0
+    else:
+        cutoff_date = (now - timedelta(days=period_days)).strftime("%Y-%m-%d")
+        days_in_period = period_days
+    
+    rates, trend, median_spread = {}, [], None
+    dose_counts, streaks = {}, (0, 0, [])
+    if profile_id:
+        (ledger.with_database(db) if ledger else DoseLedger(db)).refresh(profile_id, now)
+        dose_counts = db.get_dose_status_counts(profile_id, cutoff_date, today)
+        
+        analytics = AdherenceAnalytics.from_database(db, profile_id, now.date() - timedelta(days=29), now.date())
+        rolling = analytics.rolling_rates()
+        rates = {window: float(values[-1]) for window, values in rolling.items() if len(values)}
+        trend = [float(value) for value in rolling[7]]
+        spreads = sorted(spread for _, spread, _ in analytics.time_of_day_stats().values())
+        median_spread = spreads[len(spreads) // 2] if spreads else None
+        
+        streaks = db.get_streak_summary(profile_id, today)
+    
+    # Doses per day over the past year, oldest first
+    heatmap_start = now.date() - timedelta(days=HEATMAP_DAYS - 1)
+    daily_doses = [0] * HEATMAP_DAYS
+    for day, doses, medicine_count, medicines in db.get_daily_summaries(profile_id, heatmap_start.isoformat()):
+        try:
+            index = (date.fromisoformat(day) - heatmap_start).days
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < HEATMAP_DAYS:
+            daily_doses[index] = doses
+    
+    return {
+        "completed_days": db.get_adherence_stats(profile_id, cutoff_date),
+        "daily_doses": (heatmap_start, daily_doses),
+        "days_in_period": days_in_period,
+        "dose_counts": dose_counts,
+        "rates": rates,
+        "trend": trend,
+        "median_spread": median_spread,
+        "streaks": streaks,
+        "top_medicines": db.get_most_taken_medicines(profile_id, cutoff_date),
+        "total_records": db.get_total_records(profile_id, cutoff_date),
+        "unique_medicines": db.get_unique_medicines(profile_id, cutoff_date),
+    }
 
 class ReportsScreen(MDScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.period_days = 30
+        self.report_cache = {}  # (profile, period, day) -> (table versions, computed at, report)
+        self.report_key = None
+        # Kept across refreshes so a new report only redraws what changed
+        self.top_chart = BarChart(size_hint_y=None)
+        self.trend_chart = Sparkline(size_hint_y=None, height=dp(50))
+        self.heatmap = CalendarHeatmap(size_hint_y=None, height=dp(56))
         self.build_ui()
     
     def on_enter(self):
@@ -62,7 +134,6 @@ class ReportsScreen(MDScreen):
         main_layout.add_widget(scroll)
         
         self.add_widget(main_layout)
-        self.refresh_reports()
     
     def show_period_menu(self):
         period_items = [
@@ -82,16 +153,63 @@ class ReportsScreen(MDScreen):
             self.period_label.text = f"Last {days} days"
         self.refresh_reports()
     
+    @traced
     def refresh_reports(self):
+        """Show the report for the current profile and period.
+
+        Cached reports are shown at once. Otherwise a loading state is shown
+        while the report is computed on the background worker. A cached
+        report is reused until medicine records or reminders change, the
+        day changes, or it is REPORT_CACHE_MAX_AGE seconds old.
+        """
         app = App.get_running_app()
-        self.reports_layout.clear_widgets()
+        now = app.clock.now()
+        key = (app.current_profile_id, self.period_days, now.strftime("%Y-%m-%d"))
+        versions = (app.db.get_table_version("medicine_records"), app.db.get_table_version("reminders"))
+        self.report_key = key
         
-        if self.period_days == 9999:
-            cutoff_date = "1900-01-01"
-            days_in_period = 999
-        else:
-            cutoff_date = (datetime.now() - timedelta(days=self.period_days)).strftime("%Y-%m-%d")
-            days_in_period = self.period_days
+        cached = self.report_cache.get(key)
+        if cached and cached[0] == versions and time.monotonic() - cached[1] < REPORT_CACHE_MAX_AGE:
+            self.show_report(cached[2])
+            return
+        
+        self.show_loading()
+        profile_id, period_days, started = app.current_profile_id, self.period_days, time.monotonic()
+        ledger = app.dose_ledger
+        app.background.submit(
+            lambda db: compute_report(db, profile_id, period_days, now, ledger),
+            lambda report: self.report_ready(key, versions, started, report),
+        )
+    
+    def report_ready(self, key, versions, started, report):
+        # Reports from earlier days can never be shown again
+        self.report_cache = {
+            cached_key: entry for cached_key, entry in self.report_cache.items() if cached_key[2] == key[2]
+        }
+        self.report_cache[key] = (versions, started, report)
+        # Only show it if the user has not moved on to another period or profile
+        if key == self.report_key:
+            self.show_report(report)
+    
+    def attach(self, chart, card):
+        """Move a kept chart into this report's card"""
+        if chart.parent:
+            chart.parent.remove_widget(chart)
+        card.add_widget(chart)
+    
+    def show_loading(self):
+        self.reports_layout.clear_widgets()
+        self.reports_layout.add_widget(MDLabel(
+            text="Loading reports...",
+            halign='center',
+            theme_text_color='Secondary',
+            size_hint_y=None,
+            height=dp(80)
+        ))
+    
+    @traced
+    def show_report(self, report):
+        self.reports_layout.clear_widgets()
         
         # Adherence card
         adherence_card = MDCard(
@@ -111,16 +229,8 @@ class ReportsScreen(MDScreen):
         )
         adherence_card.add_widget(adherence_title)
         
-        completed_days = app.db.get_adherence_stats(app.current_profile_id, cutoff_date)
-        
-        if self.period_days == 9999:
-            records = app.db.get_medicine_records(app.current_profile_id)
-            if records:
-                first_date = min([r[5] for r in records])
-                days_in_period = (datetime.now() - datetime.strptime(first_date, "%Y-%m-%d")).days + 1
-            else:
-                days_in_period = 0
-        
+        completed_days = report["completed_days"]
+        days_in_period = report["days_in_period"]
         missed_days = max(0, days_in_period - completed_days)
         adherence_rate = (completed_days / days_in_period * 100) if days_in_period > 0 else 0
         
@@ -145,6 +255,163 @@ class ReportsScreen(MDScreen):
         adherence_card.height = dp(190)
         self.reports_layout.add_widget(adherence_card)
         
+        # Scheduled doses (expected vs. logged)
+        dose_counts = report["dose_counts"]
+        taken = dose_counts.get("taken", 0)
+        late = dose_counts.get("late", 0)
+        missed = dose_counts.get("missed", 0)
+        resolved = taken + late + missed
+        dose_rate = ((taken + late) / resolved * 100) if resolved > 0 else 0
+        
+        dose_card = MDCard(
+            orientation='vertical',
+            padding=dp(20),
+            spacing=dp(15),
+            size_hint_y=None,
+            md_bg_color=[0.1, 0.1, 0.1, 1],
+            radius=[15, 15, 15, 15]
+        )
+        dose_card.add_widget(MDLabel(
+            text="Scheduled Doses",
+            font_style="H6",
+            size_hint_y=None,
+            height=dp(30)
+        ))
+        
+        dose_grid = MDGridLayout(
+            cols=4,
+            spacing=dp(10),
+            size_hint_y=None,
+            height=dp(120)
+        )
+        dose_grid.add_widget(stat_box("Taken", str(taken)))
+        dose_grid.add_widget(stat_box("Late", str(late)))
+        dose_grid.add_widget(stat_box("Missed", str(missed)))
+        dose_grid.add_widget(stat_box("Dose Rate", f"{dose_rate:.0f}%"))
+        
+        dose_card.add_widget(dose_grid)
+        dose_card.height = dp(190)
+        self.reports_layout.add_widget(dose_card)
+        
+        # Rolling rates and timing consistency over the last 30 days
+        rates = report["rates"]
+        median_spread = report["median_spread"]
+        
+        def rate_text(window):
+            rate = rates.get(window)
+            if rate is None or math.isnan(rate):
+                return "-"
+            return f"{rate * 100:.0f}%"
+        
+        trend_card = MDCard(
+            orientation='vertical',
+            padding=dp(20),
+            spacing=dp(15),
+            size_hint_y=None,
+            md_bg_color=[0.1, 0.1, 0.1, 1],
+            radius=[15, 15, 15, 15]
+        )
+        trend_card.add_widget(MDLabel(
+            text="Adherence Trends",
+            font_style="H6",
+            size_hint_y=None,
+            height=dp(30)
+        ))
+        
+        trend_grid = MDGridLayout(
+            cols=3,
+            spacing=dp(15),
+            size_hint_y=None,
+            height=dp(120)
+        )
+        trend_grid.add_widget(stat_box("7-Day Rate", rate_text(7)))
+        trend_grid.add_widget(stat_box("30-Day Rate", rate_text(30)))
+        trend_grid.add_widget(stat_box(
+            "Timing Spread",
+            f"±{median_spread:.0f} min" if median_spread is not None and math.isfinite(median_spread) else "-"
+        ))
+        
+        trend_card.add_widget(trend_grid)
+        trend_card.height = dp(190)
+        
+        trend = report["trend"]
+        if any(rate == rate for rate in trend):
+            trend_card.add_widget(MDLabel(
+                text="7-day rate, last 30 days",
+                font_style="Caption",
+                theme_text_color='Secondary',
+                size_hint_y=None,
+                height=dp(20)
+            ))
+            self.trend_chart.set_data(trend)
+            self.attach(self.trend_chart, trend_card)
+            trend_card.height = dp(290)
+        self.reports_layout.add_widget(trend_card)
+        
+        # Streaks (consecutive days with at least one record)
+        current_streak, longest_streak, streaks = report["streaks"]
+        
+        streak_card = MDCard(
+            orientation='vertical',
+            padding=dp(20),
+            spacing=dp(10),
+            size_hint_y=None,
+            md_bg_color=[0.1, 0.1, 0.1, 1],
+            radius=[15, 15, 15, 15]
+        )
+        streak_card.add_widget(MDLabel(
+            text="Streaks",
+            font_style="H6",
+            size_hint_y=None,
+            height=dp(30)
+        ))
+        
+        streak_grid = MDGridLayout(
+            cols=3,
+            spacing=dp(15),
+            size_hint_y=None,
+            height=dp(100)
+        )
+        streak_grid.add_widget(stat_box("Current", f"{current_streak} days"))
+        streak_grid.add_widget(stat_box("Longest", f"{longest_streak} days"))
+        streak_grid.add_widget(stat_box("Streaks", str(len(streaks))))
+        streak_card.add_widget(streak_grid)
+        
+        recent_streaks = streaks[-3:][::-1]
+        for start, end, length in recent_streaks:
+            start_text = datetime.strptime(start, "%Y-%m-%d").strftime("%b %d, %Y")
+            end_text = datetime.strptime(end, "%Y-%m-%d").strftime("%b %d, %Y")
+            streak_card.add_widget(MDLabel(
+                text=f"{start_text} - {end_text}  ({length} days)",
+                font_style="Caption",
+                theme_text_color='Secondary',
+                size_hint_y=None,
+                height=dp(20)
+            ))
+        streak_card.height = dp(170 + len(recent_streaks) * 30)
+        self.reports_layout.add_widget(streak_card)
+        
+        # Doses per day over the past year
+        heatmap_card = MDCard(
+            orientation='vertical',
+            padding=dp(20),
+            spacing=dp(10),
+            size_hint_y=None,
+            md_bg_color=[0.1, 0.1, 0.1, 1],
+            radius=[15, 15, 15, 15]
+        )
+        heatmap_card.add_widget(MDLabel(
+            text="Past Year",
+            font_style="H6",
+            size_hint_y=None,
+            height=dp(30)
+        ))
+        heatmap_start, daily_doses = report["daily_doses"]
+        self.heatmap.set_data(daily_doses, heatmap_start)
+        self.attach(self.heatmap, heatmap_card)
+        heatmap_card.height = dp(136)
+        self.reports_layout.add_widget(heatmap_card)
+        
         # Most taken medicines
         top_card = MDCard(
             orientation='vertical',
@@ -163,27 +430,12 @@ class ReportsScreen(MDScreen):
         )
         top_card.add_widget(top_title)
         
-        top_medicines = app.db.get_most_taken_medicines(app.current_profile_id, cutoff_date)
+        top_medicines = report["top_medicines"]
         
         if top_medicines:
-            max_count = top_medicines[0][1]
-            for medicine, count in top_medicines:
-                row = MDBoxLayout(orientation='vertical', size_hint_y=None, height=dp(55), spacing=dp(5))
-                
-                line = MDBoxLayout(orientation='horizontal', size_hint_y=None, height=dp(25))
-                line.add_widget(MDLabel(text=medicine, size_hint_x=0.7))
-                line.add_widget(MDLabel(text=f"{count} times", halign='right', theme_text_color='Secondary', size_hint_x=0.3))
-                row.add_widget(line)
-                
-                progress_bg = MDBoxLayout(size_hint_y=None, height=dp(6), md_bg_color=[0.2, 0.2, 0.2, 1])
-                width = (count / max_count) if max_count > 0 else 0
-                progress = MDBoxLayout(size_hint=(width, 1), md_bg_color=[0.12, 0.42, 0.65, 1])
-                progress_bg.add_widget(progress)
-                row.add_widget(progress_bg)
-                
-                top_card.add_widget(row)
-            
-            top_card.height = dp(80 + len(top_medicines) * 60)
+            self.top_chart.set_data((medicine, count, f"{count} times") for medicine, count in top_medicines)
+            self.attach(self.top_chart, top_card)
+            top_card.height = dp(80) + self.top_chart.height
         else:
             top_card.add_widget(MDLabel(
                 text="No records in this period",
@@ -214,8 +466,8 @@ class ReportsScreen(MDScreen):
         )
         total_card.add_widget(total_title)
         
-        total_records = app.db.get_total_records(app.current_profile_id, cutoff_date)
-        unique_medicines = app.db.get_unique_medicines(app.current_profile_id, cutoff_date)
+        total_records = report["total_records"]
+        unique_medicines = report["unique_medicines"]
         
         grid = MDGridLayout(
             cols=2,
@@ -0,0 +1,228 @@
+"""
+AlarMed - Reminder Simulator
+Replays minute-by-minute time against a database of reminders, as fast as
+possible, and records every fire decision of the reminder engine
+
+Usage:
+    python simulator.py                      # one year of sample reminders, checked
+    python simulator.py --db alarmed.db --profile 1 --start 2024-01-01 --days 366
+    python simulator.py --tz America/New_York  # step through real DST changes
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter, namedtuple
+from datetime import datetime, timedelta, timezone
+
+from database import Database
+from dose_ledger import DoseLedger
+from recurrence import build_rule, compile_rule
+from reminder_engine import ReminderEngine
+from time_source import ManualClock
+
+
+# One decision taken by the engine: the local wall time it saw and what fired
+FireDecision = namedtuple(
+    "FireDecision", ["wall_time", "utc_time", "reminder_id", "medicine", "time", "date"]
+)
+
+SimulationResult = namedtuple(
+    "SimulationResult", ["fires", "evaluations", "elapsed", "skipped_minutes", "repeated_minutes"]
+)
+
+# Reminders covering every schedule type, including times inside DST gaps
+SAMPLE_REMINDERS = [
+    ("Daily Med", "1 tablet", "Daily", "08:00, 20:00", ""),
+    ("Night Med", "1 tablet", "Daily", "01:15, 02:30", ""),
+    ("Weekday Med", "5 mg", "Specific Days", "09:00", "Mon, Wed, Fri"),
+    ("Alternate Med", "1 capsule", "Every Other Day", "07:30, 19:30", ""),
+    ("Weekly Med", "10 ml", "Weekly", "01:30", ""),
+    ("Monthly Med", "1 tablet", "Monthly", "09:00", "1, 15, 29"),
+    ("Course Med", "1 capsule", "Every N Hours", "06:00", ""),
+]
+
+# The sample run: a leap year, so Monthly Med's 29th also falls in February
+SAMPLE_START = "2028-01-01"
+SAMPLE_DAYS = 366
+
+# Fires per sample reminder over the sample run, in any time zone: a DST gap
+# moves a dose to the end of the gap and a repeated hour never fires it twice
+SAMPLE_EXPECTED_FIRES = {
+    "Daily Med": 732,
+    "Night Med": 732,
+    "Weekday Med": 156,
+    "Alternate Med": 366,
+    "Weekly Med": 53,
+    "Monthly Med": 36,
+    "Course Med": 1098,
+}
+
+
+class ReminderSimulator:
+    """Drives a ReminderEngine with a ManualClock.
+
+    Without a time zone the clock steps through naive local minutes. With a
+    tzinfo the simulation steps through UTC minutes and shows the engine the
+    local wall time, so DST gaps skip wall minutes and DST fall-back repeats
+    them, exactly as a device would experience.
+    """
+
+    def __init__(self, database, profile_id, tz=None):
+        self.db = database
+        self.profile_id = profile_id
+        self.tz = tz
+        self.clock = ManualClock()
+        self.engine = ReminderEngine(database, profile_id, self.clock)
+
+    def run(self, start, end):
+        fires = []
+        evaluations = 0
+        skipped = 0
+        repeated = 0
+
+        if self.tz:
+            instant = start.replace(tzinfo=self.tz).astimezone(timezone.utc)
+            end_instant = end.replace(tzinfo=self.tz).astimezone(timezone.utc)
+        else:
+            instant, end_instant = start, end
+
+        step = timedelta(minutes=1)
+        previous_wall = None
+        latest_wall = None
+        began = time.perf_counter()
+
+        while instant < end_instant:
+            if self.tz:
+                wall = instant.astimezone(self.tz).replace(tzinfo=None)
+            else:
+                wall = instant
+
+            if previous_wall is not None:
+                gap = wall - previous_wall
+                if gap > step:
+                    skipped += int(gap / step) - 1
+                if wall <= latest_wall:
+                    repeated += 1
+            previous_wall = wall
+            latest_wall = max(wall, latest_wall or wall)
+
+            self.clock.set(wall, instant.timestamp() if self.tz else None)
+            for due in self.engine.evaluate():
+                fires.append(FireDecision(
+                    wall, instant if self.tz else None,
+                    due.reminder_id, due.medicine, due.time, due.date,
+                ))
+            evaluations += 1
+            instant += step
+
+        elapsed = time.perf_counter() - began
+        return SimulationResult(fires, evaluations, elapsed, skipped, repeated)
+
+
+def build_sample_database(start, path=":memory:"):
+    db = Database(path)
+    profile_id = db.create_profile("Simulator", None, None, "#1E88E5", "S")
+    for medicine, dosage, schedule_type, times, days in SAMPLE_REMINDERS:
+        rule = build_rule(schedule_type, times.split(","), days, start=start)
+        db.add_reminder(profile_id, medicine, dosage, schedule_type, times, days, rule.to_string())
+    return db, profile_id
+
+
+def check_new_reminders(created):
+    """Create the sample reminders mid-day and expand the dose ledger: the
+    slots earlier that day were never due, so none may be counted missed.
+    Returns the number of missed doses."""
+    db, profile_id = build_sample_database(created)
+    DoseLedger(db).refresh(profile_id, created)
+    day = created.strftime("%Y-%m-%d")
+    missed = db.get_dose_status_counts(profile_id, day, day).get("missed", 0)
+    db.close()
+    return missed
+
+
+def unfired_occurrences(db, profile_id, result, start, end):
+    """Occurrences the stored rules schedule in [start, end) that never fired"""
+    fired = {(fire.reminder_id, fire.date, fire.time) for fire in result.fires}
+    unfired = []
+    for reminder in db.get_active_reminders(profile_id):
+        for occurrence in compile_rule(reminder[10]).occurrences_between(start, end):
+            key = (reminder[0], occurrence.strftime("%Y-%m-%d"), occurrence.strftime("%H:%M"))
+            if key not in fired:
+                unfired.append(key)
+    return unfired
+
+
+def summarize(result):
+    """Per-reminder fire counts and occurrences that fired more than once"""
+    per_reminder = Counter(fire.medicine for fire in result.fires)
+    per_occurrence = Counter((fire.reminder_id, fire.date, fire.time) for fire in result.fires)
+    duplicates = sorted(key for key, count in per_occurrence.items() if count > 1)
+    return per_reminder, duplicates
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay reminder scheduling faster than real time")
+    parser.add_argument("--db", help="database to replay (default: in-memory sample reminders)")
+    parser.add_argument("--profile", type=int, help="profile id in --db (default: last active)")
+    parser.add_argument("--start", default=SAMPLE_START, help="first simulated day (YYYY-MM-DD)")
+    parser.add_argument("--days", type=int, default=SAMPLE_DAYS, help="number of days to simulate")
+    parser.add_argument("--tz", help="IANA time zone to simulate DST changes in, e.g. Europe/London")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    start = datetime.strptime(args.start, "%Y-%m-%d")
+    end = start + timedelta(days=args.days)
+    if args.db:
+        db = Database(args.db)
+        profile_id = args.profile or db.get_last_active_profile()[0]
+    else:
+        db, profile_id = build_sample_database(start)
+
+    tz = None
+    if args.tz:
+        from zoneinfo import ZoneInfo
+        tz = ZoneInfo(args.tz)
+
+    result = ReminderSimulator(db, profile_id, tz).run(start, end)
+    per_reminder, duplicates = summarize(result)
+
+    print(f"Simulated {result.evaluations:,} minutes ({args.start} + {args.days} days) "
+          f"in {result.elapsed:.2f}s: {result.evaluations / result.elapsed:,.0f} evaluations/s")
+    if tz:
+        print(f"DST: {result.skipped_minutes} wall minutes skipped, "
+              f"{result.repeated_minutes} wall minutes repeated")
+    print(f"Fire decisions: {len(result.fires)}")
+    for medicine, count in sorted(per_reminder.items()):
+        print(f"  {medicine:<16} {count}")
+    if duplicates:
+        print(f"Occurrences fired more than once: {len(duplicates)}")
+        for reminder_id, date, fire_time in duplicates[:10]:
+            print(f"  reminder {reminder_id} on {date} at {fire_time}")
+    failed = bool(duplicates)
+
+    if not args.db:
+        # The sample reminders double as a regression check
+        unfired = unfired_occurrences(db, profile_id, result, start, end)
+        if unfired:
+            print(f"Occurrences that never fired: {len(unfired)}")
+            for reminder_id, date, fire_time in unfired[:10]:
+                print(f"  reminder {reminder_id} on {date} at {fire_time}")
+        if (args.start, args.days) == (SAMPLE_START, SAMPLE_DAYS):
+            for medicine, expected in SAMPLE_EXPECTED_FIRES.items():
+                if per_reminder[medicine] != expected:
+                    print(f"{medicine}: {per_reminder[medicine]} fires, expected {expected}")
+                    failed = True
+        missed = check_new_reminders(start + timedelta(hours=14))
+        if missed:
+            print(f"Reminders created at 14:00: {missed} earlier doses counted missed")
+        failed = failed or bool(unfired) or bool(missed)
+    db.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
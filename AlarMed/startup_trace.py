@@ -0,0 +1,159 @@
+"""
+AlarMed - Startup Trace
+Per-module import times and asset load times from launch to the first frame
+
+Off unless ALARMED_STARTUP_TRACE is set when the app starts:
+    ALARMED_STARTUP_TRACE=1 python main.py            # print the report
+    ALARMED_STARTUP_TRACE=trace.json python main.py   # also write it as JSON
+"""
+
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from importlib.util import resolve_name
+
+from config import STARTUP_FIRST_FRAME_TARGET_MS, STARTUP_IMPORT_BUDGET_MS
+
+TRACE_ENV = "ALARMED_STARTUP_TRACE"
+REPORT_TOP = 20
+
+
+class StartupTrace:
+    """Times every module import (self and cumulative) and every traced
+    asset until finish() is called at the first frame.
+
+    Imports are timed by wrapping builtins.__import__; a module counts once,
+    on the import that actually executed it. Self time excludes the
+    imports it triggered, so the self times add up to the total.
+    """
+
+    def __init__(self, output=None, clock=time.perf_counter):
+        self.output = output
+        self.clock = clock
+        self.started = clock()
+        self.imports = {}  # module -> [self_ms, total_ms]
+        self.assets = []  # (kind, name, at_ms, duration_ms)
+        self.first_frame_ms = None
+        self._local = threading.local()
+        self._original_import = None
+
+    def install(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+        return self
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        try:
+            module_name = resolve_name("." * level + name, (globals or {}).get("__package__")) if level else name
+        except (ImportError, ValueError):
+            module_name = name
+        if module_name in sys.modules or module_name in self.imports:
+            return original(name, globals, locals, fromlist, level)
+
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)  # Time spent in nested imports
+        started = self.clock()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            total = (self.clock() - started) * 1000
+            children = stack.pop()
+            if stack:
+                stack[-1] += total
+            self.imports[module_name] = [total - children, total]
+
+    @contextmanager
+    def asset(self, kind, name):
+        started = self.clock()
+        try:
+            yield
+        finally:
+            finished = self.clock()
+            self.assets.append((kind, name, (started - self.started) * 1000, (finished - started) * 1000))
+
+    def finish(self):
+        """Stop tracing at the first frame and report"""
+        self.uninstall()
+        self.first_frame_ms = (self.clock() - self.started) * 1000
+        report = self.report()
+        self.print_report(report)
+        if self.output:
+            with open(self.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=4)
+        return report
+
+    def report(self):
+        import_ms = sum(self_ms for self_ms, total_ms in self.imports.values())
+        imports = sorted(self.imports.items(), key=lambda item: item[1][0], reverse=True)
+        return {
+            "first_frame_ms": round(self.first_frame_ms, 1),
+            "import_ms": round(import_ms, 1),
+            "budget": {
+                "first_frame_ms": STARTUP_FIRST_FRAME_TARGET_MS,
+                "import_ms": STARTUP_IMPORT_BUDGET_MS,
+                "within": self.first_frame_ms <= STARTUP_FIRST_FRAME_TARGET_MS
+                and import_ms <= STARTUP_IMPORT_BUDGET_MS,
+            },
+            "imports": [
+                {"module": module, "self_ms": round(self_ms, 2), "total_ms": round(total_ms, 2)}
+                for module, (self_ms, total_ms) in imports
+            ],
+            "assets": [
+                {"kind": kind, "name": name, "at_ms": round(at_ms, 1), "ms": round(duration_ms, 2)}
+                for kind, name, at_ms, duration_ms in self.assets
+            ],
+        }
+
+    def print_report(self, report):
+        budget = report["budget"]
+        print(
+            f"Startup: first frame {report['first_frame_ms']:.0f}ms (target {budget['first_frame_ms']}ms), "
+            f"imports {report['import_ms']:.0f}ms (budget {budget['import_ms']}ms) - "
+            f"{'within budget' if budget['within'] else 'OVER BUDGET'}"
+        )
+        print(f"{len(report['imports'])} modules imported; slowest by self time:")
+        for entry in report["imports"][:REPORT_TOP]:
+            print(f"  {entry['self_ms']:8.1f}ms {entry['total_ms']:8.1f}ms  {entry['module']}")
+        for entry in report["assets"]:
+            print(f"  {entry['kind']:<6} {entry['name']}: {entry['ms']:.1f}ms at {entry['at_ms']:.0f}ms")
+
+
+_trace = None
+
+
+def install():
+    """Start tracing if ALARMED_STARTUP_TRACE is set; call before importing Kivy"""
+    global _trace
+    setting = os.environ.get(TRACE_ENV)
+    if _trace is None and setting:
+        _trace = StartupTrace(output=None if setting == "1" else setting).install()
+    return _trace
+
+
+@contextmanager
+def asset(kind, name):
+    """Time loading an asset (a no-op unless tracing)"""
+    if _trace is None or _trace.first_frame_ms is not None:
+        yield
+        return
+    with _trace.asset(kind, name):
+        yield
+
+
+def first_frame():
+    """Called once the first frame is on screen; ends the trace"""
+    if _trace is not None and _trace.first_frame_ms is None:
+        try:
+            _trace.finish()
+        except Exception as e:
+            print(f"Error writing startup trace: {e}")
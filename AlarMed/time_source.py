@@ -0,0 +1,52 @@
+"""
+AlarMed - Time Source
+Injectable clocks, so reminder logic can be driven faster than real time
+"""
+
+import time
+from datetime import datetime, timedelta
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class SystemClock:
+    """Wall-clock time of the device (local, naive)"""
+
+    def now(self):
+        return datetime.now()
+
+    def timestamp(self):
+        """Seconds since the epoch; unlike now(), never jumps at DST changes"""
+        return time.time()
+
+
+class ManualClock:
+    """Clock that only moves when told to; used by tests and the simulator"""
+
+    def __init__(self, start=None):
+        self._now = start or datetime.now().replace(second=0, microsecond=0)
+        self._timestamp = None
+
+    def now(self):
+        return self._now
+
+    def timestamp(self):
+        """The timestamp given to set(), or the wall time read as UTC"""
+        if self._timestamp is None:
+            return (self._now - EPOCH).total_seconds()
+        return self._timestamp
+
+    def set(self, when, timestamp=None):
+        """Move to wall time `when`; pass the real instant's timestamp to
+        simulate a time zone, whose wall time can jump at DST changes"""
+        self._now = when
+        self._timestamp = timestamp
+
+    def advance(self, delta=timedelta(minutes=1)):
+        self._now += delta
+        if self._timestamp is not None:
+            self._timestamp += delta.total_seconds()
+        return self._now
+
+
+system_clock = SystemClock()
@@ -0,0 +1,88 @@
+"""
+AlarMed - Time Codec
+Fast parsing and formatting of the app's fixed time formats
+
+Times are stored as "HH:MM" (24-hour) and shown as "hh:MM AM". There are
+only 1,440 minutes in a day, so every canonical string is precomputed once
+and parsing a canonical value is a single dict lookup. Anything else goes
+through a small hand-written parser instead of datetime.strptime.
+"""
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class TimeFormatError(ValueError):
+    """Raised when a string is not a valid time in the expected format"""
+
+
+def _ampm_string(minutes):
+    hour, minute = divmod(minutes, 60)
+    return f"{hour % 12 or 12:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+# Canonical strings for every minute of the day, and their reverse lookups
+_FORMAT_24H = tuple(f"{m // 60:02d}:{m % 60:02d}" for m in range(MINUTES_PER_DAY))
+_FORMAT_AMPM = tuple(_ampm_string(m) for m in range(MINUTES_PER_DAY))
+_PARSE_24H = {text: m for m, text in enumerate(_FORMAT_24H)}
+_PARSE_AMPM = {text: m for m, text in enumerate(_FORMAT_AMPM)}
+
+
+def format_24h(minutes):
+    """Canonical 24-hour string ("HH:MM") for minutes after midnight"""
+    return _FORMAT_24H[minutes]
+
+
+def format_ampm(minutes):
+    """Canonical 12-hour string ("hh:MM AM") for minutes after midnight"""
+    return _FORMAT_AMPM[minutes]
+
+
+def _clock_fields(text, original):
+    """Split "H:M" into two ints, allowing one or two digits per field"""
+    hour_text, sep, minute_text = text.partition(":")
+    if (not sep or not 0 < len(hour_text) <= 2 or not 0 < len(minute_text) <= 2
+            or not (hour_text + minute_text).isascii()
+            or not hour_text.isdigit() or not minute_text.isdigit()):
+        raise TimeFormatError(f"Invalid time: {original!r}")
+    return int(hour_text), int(minute_text)
+
+
+def parse_24h(text, strict=False):
+    """Minutes after midnight for a 24-hour time.
+
+    strict accepts only the canonical "HH:MM" form; otherwise surrounding
+    whitespace and single-digit fields ("8:5") are allowed too.
+    """
+    minutes = _PARSE_24H.get(text)
+    if minutes is not None:
+        return minutes
+    if strict or not isinstance(text, str):
+        raise TimeFormatError(f"Invalid time: {text!r}")
+
+    hour, minute = _clock_fields(text.strip(), text)
+    if hour > 23 or minute > 59:
+        raise TimeFormatError(f"Invalid time: {text!r}")
+    return hour * 60 + minute
+
+
+def parse_ampm(text, strict=False):
+    """Minutes after midnight for a 12-hour time such as "08:30 PM".
+
+    strict accepts only the canonical "hh:MM AM" form; otherwise case,
+    whitespace and single-digit fields are lenient ("8:30pm").
+    """
+    minutes = _PARSE_AMPM.get(text)
+    if minutes is not None:
+        return minutes
+    if strict or not isinstance(text, str):
+        raise TimeFormatError(f"Invalid time: {text!r}")
+
+    value = text.strip().upper()
+    suffix = value[-2:]
+    if suffix not in ("AM", "PM"):
+        raise TimeFormatError(f"Invalid time: {text!r}")
+    hour, minute = _clock_fields(value[:-2].rstrip(), text)
+    if not 1 <= hour <= 12 or minute > 59:
+        raise TimeFormatError(f"Invalid time: {text!r}")
+    return (hour % 12 + (12 if suffix == "PM" else 0)) * 60 + minute
+
@@ -0,0 +1,128 @@
+"""
+AlarMed - Dose Timeline
+Rolling window of upcoming doses generated from the compiled reminder rules
+"""
+
+import heapq
+from collections import deque, namedtuple
+from datetime import timedelta
+from itertools import islice
+
+from config import TIMELINE_HORIZON_HOURS
+from recurrence import compile_rule, rule_from_legacy
+from time_source import system_clock
+from timecodec import format_24h
+
+
+class UpcomingDose(namedtuple("UpcomingDose", ["when", "reminder_id", "medicine", "dosage"])):
+    """One scheduled dose inside the timeline window"""
+
+    __slots__ = ()
+
+    @property
+    def time(self):
+        return format_24h(self.when.hour * 60 + self.when.minute)
+
+
+class _Window:
+    """Cached doses for one profile, sorted by time"""
+
+    def __init__(self):
+        self.doses = deque()
+        self.rules = {}  # reminder_id -> (signature, rule, medicine, dosage)
+        self.version = None
+        self.start = None  # Doses after this moment...
+        self.end = None  # ...and before this one are in `doses`
+
+
+class DoseTimeline:
+    """Upcoming doses for the next `horizon_hours`, across midnight.
+
+    The window is kept between calls. As time passes, doses that are no
+    longer upcoming drop off the front and only the newly covered stretch
+    is generated at the back; when reminders change, only the changed
+    reminders are regenerated. Reading the next k doses is O(k).
+    """
+
+    def __init__(self, database, horizon_hours=TIMELINE_HORIZON_HOURS, clock=system_clock):
+        self.db = database
+        self.clock = clock
+        self.horizon = timedelta(hours=horizon_hours)
+        self._windows = {}
+
+    def upcoming(self, profile_id, limit=None, now=None):
+        """The next `limit` doses (all of them in the window if None)"""
+        window = self.refresh(profile_id, now)
+        return list(islice(window.doses, limit))
+
+    def count(self, profile_id, now=None):
+        return len(self.refresh(profile_id, now).doses)
+
+    def refresh(self, profile_id, now=None):
+        """Bring the profile's window up to `now`"""
+        now = now or self.clock.now()
+        window = self._windows.get(profile_id)
+        if window is None or now < window.start:
+            # First use, or the clock moved backwards: build from scratch
+            window = _Window()
+            window.start = window.end = now
+            self._windows[profile_id] = window
+
+        self._sync_reminders(profile_id, window)
+        self._advance(window, now)
+        return window
+
+    def invalidate(self, profile_id=None):
+        if profile_id is None:
+            self._windows.clear()
+        else:
+            self._windows.pop(profile_id, None)
+
+    def _sync_reminders(self, profile_id, window):
+        """Regenerate only the reminders added, changed or removed since last time"""
+        version = self.db.get_table_version("reminders")
+        if version == window.version:
+            return
+
+        rules = {}
+        for reminder in self.db.get_active_reminders(profile_id):
+            reminder_id, medicine, dosage = reminder[0], reminder[2], reminder[3]
+            rrule = reminder[10] or rule_from_legacy(*reminder[4:7], reminder[8]).to_string()
+            signature = (medicine, dosage, rrule)
+            previous = window.rules.get(reminder_id)
+            if previous and previous[0] == signature:
+                rules[reminder_id] = previous
+            else:
+                rules[reminder_id] = (signature, compile_rule(rrule), medicine, dosage)
+
+        changed = {rid for rid in window.rules.keys() | rules.keys() if window.rules.get(rid) is not rules.get(rid)}
+        window.rules = rules
+        window.version = version
+        if not changed:
+            return
+
+        kept = (dose for dose in window.doses if dose.reminder_id not in changed)
+        added = self._generate(
+            [(rid, rules[rid]) for rid in changed if rid in rules], window.start, window.end
+        )
+        window.doses = deque(heapq.merge(kept, added))
+
+    def _advance(self, window, now):
+        doses = window.doses
+        while doses and doses[0].when <= now:
+            doses.popleft()
+        window.start = now
+
+        end = now + self.horizon
+        if end > window.end:
+            doses.extend(self._generate(window.rules.items(), window.end, end))
+            window.end = end
+
+    def _generate(self, rules, start, end):
+        """Sorted doses of `rules` with start <= when < end"""
+        doses = []
+        for reminder_id, (signature, rule, medicine, dosage) in rules:
+            for when in rule.occurrences_between(start, end):
+                doses.append(UpcomingDose(when, reminder_id, medicine, dosage))
+        doses.sort()
+        return doses